@@ -0,0 +1,303 @@
+"""
+rss_feed.py
+
+Generates the podcast feed, RSS_FEED_PATH, from the episode data.
+
+Every episode whose audio file has been synced becomes an item, newest
+first:
+- the enclosure points at the audio file under SITE_ASSETS_BASE_URL, with
+  the length of the synced file
+- the guid is derived from the audio file's content digest, so it stays the
+  same when the episode's title or description is edited
+- the pubDate is the episode date at PUBLISH_TIME
+- the itunes:duration is the audio_info duration that update_file_attrs.py
+  stored in episode.yml, or is read from the audio file's MP3 headers when
+  there is none yet
+
+The episodes are read from the episode catalog, and audio digests from each
+episode directory's manifest, so only new or changed audio is hashed. The
+XML is streamed out with XMLGenerator, and the feed is only written when
+its content changed.
+
+Usage:
+    rss_feed.py - update the feed.
+    rss_feed.py --output <path> - write the feed somewhere else.
+"""
+
+import argparse
+import io
+import logging
+from datetime import datetime, time, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import NamedTuple
+from xml.sax.saxutils import XMLGenerator
+
+import coloredlogs
+
+from gitp_acolyte.ceremonial.spells.episode_data.catalog import (
+    EPISODE_CATALOG_PATH,
+    CatalogEpisode,
+    open_catalog,
+)
+from gitp_acolyte.constants import (
+    DATE_FORMAT,
+    LOGSEQ_ASSETS_FOLDER,
+    RSS_FEED_PATH,
+    SITE_ASSETS_BASE_URL,
+    SITE_URL,
+    get_relative_path,
+)
+from gitp_acolyte.utils.manifest import Manifest
+from gitp_acolyte.utils.media.mp3_info import Mp3FormatError, read_mp3_info
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+ITUNES_NAMESPACE = "http://www.itunes.com/dtds/podcast-1.0.dtd"
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+FEED_TITLE = "Ghost in the Patch"
+FEED_AUTHOR = "Codekiln"
+FEED_EMAIL = "codekiln@pm.me"
+FEED_LANGUAGE = "en-us"
+FEED_COPYRIGHT = "2024 Codekiln"
+FEED_SUBTITLE = (
+    "Synth animism. Casual live-patching and live-learning with the Arturia "
+    "Microfreak, and seeking out any spirits that live in my creation machines "
+    "that wish to speak."
+)
+FEED_SUMMARY = (
+    "Synth animism. Live-patching, learning, and listening for ghosts in the machine."
+)
+AUDIO_MIME_TYPE = "audio/mpeg"
+PUBLISH_TIME = time(15, 0, tzinfo=timezone.utc)
+GUID_PREFIX = "gitp-ceremony-"
+GUID_DIGEST_CHARS = 32
+INDENT = "  "
+
+
+class FeedItem(NamedTuple):
+    title: str
+    description: str
+    url: str
+    length: int
+    guid: str
+    pub_date: str
+    duration_seconds: int | None
+
+
+def format_duration(seconds: int) -> str:
+    """
+    The H:MM:SS form of a duration for itunes:duration.
+    """
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}"
+
+
+def audio_duration_seconds(episode: CatalogEpisode) -> int | None:
+    """
+    The duration of the episode's audio, from its audio_info or else from
+    the audio file's headers. None if the audio is not a readable MP3.
+    """
+    duration = episode.audio_duration_seconds
+    if duration is None:
+        audio_path = episode.episode_dir / episode.audio_file
+        try:
+            duration = read_mp3_info(audio_path).duration_seconds
+        except Mp3FormatError as e:
+            logger.warning(f"Could not read {get_relative_path(audio_path)}: {e}")
+            return None
+    return round(duration)
+
+
+def feed_item(episode: CatalogEpisode, manifest: Manifest) -> FeedItem:
+    """
+    The feed item of an episode whose audio file is present.
+    """
+    date = episode.episode_date.strftime(DATE_FORMAT)
+    stat = (episode.episode_dir / episode.audio_file).stat()
+    digest = manifest.digest(episode.audio_file, stat)
+    return FeedItem(
+        title=f"{FEED_TITLE} {date}",
+        description=episode.description or f"{episode.episode_title} {date}",
+        url=f"{SITE_ASSETS_BASE_URL}{date.replace('-', '/')}/{episode.audio_file}",
+        length=stat.st_size,
+        guid=GUID_PREFIX + digest[:GUID_DIGEST_CHARS],
+        pub_date=format_datetime(
+            datetime.combine(episode.episode_date.date(), PUBLISH_TIME)
+        ),
+        duration_seconds=audio_duration_seconds(episode),
+    )
+
+
+def feed_items(episodes: list[CatalogEpisode]) -> list[FeedItem]:
+    """
+    The feed items of the episodes with audio, newest first.
+    """
+    items = []
+    for episode in reversed(episodes):
+        if not episode.audio_present:
+            logger.warning(
+                f"Leaving {episode.episode_date.strftime(DATE_FORMAT)} out of the "
+                f"feed: its audio file '{episode.audio_file}' is missing"
+            )
+            continue
+        manifest = Manifest.load(episode.episode_dir)
+        items.append(feed_item(episode, manifest))
+        manifest.save()
+    return items
+
+
+class FeedWriter:
+    """
+    Streams an indented RSS document to a binary file.
+    """
+
+    def __init__(self, out):
+        self.xml = XMLGenerator(out, encoding="utf-8", short_empty_elements=True)
+        self.depth = 0
+
+    def _indent(self):
+        self.xml.ignorableWhitespace("\n" + INDENT * self.depth)
+
+    def start(self, name: str, attrs: dict | None = None):
+        if self.depth:
+            self._indent()
+        self.xml.startElement(name, attrs or {})
+        self.depth += 1
+
+    def end(self, name: str):
+        self.depth -= 1
+        self._indent()
+        self.xml.endElement(name)
+
+    def element(self, name: str, text: str = "", attrs: dict | None = None):
+        self._indent()
+        self.xml.startElement(name, attrs or {})
+        if text:
+            self.xml.characters(text)
+        self.xml.endElement(name)
+
+
+def write_feed(out, items: list[FeedItem]):
+    """
+    Writes the feed with the channel metadata and items to the binary file out.
+    """
+    writer = FeedWriter(out)
+    writer.xml.startDocument()
+    writer.start(
+        "rss",
+        {
+            "version": "2.0",
+            "xmlns:itunes": ITUNES_NAMESPACE,
+            "xmlns:atom": ATOM_NAMESPACE,
+        },
+    )
+    writer.start("channel")
+    writer.element("title", FEED_TITLE)
+    writer.element("link", SITE_URL)
+    writer.element(
+        "atom:link",
+        attrs={
+            "href": f"{SITE_URL}rss.xml",
+            "rel": "self",
+            "type": "application/rss+xml",
+        },
+    )
+    writer.element("language", FEED_LANGUAGE)
+    writer.element("copyright", FEED_COPYRIGHT)
+    writer.element("itunes:subtitle", FEED_SUBTITLE)
+    writer.element("itunes:author", FEED_AUTHOR)
+    writer.element("itunes:summary", FEED_SUMMARY)
+    writer.element("description", FEED_SUMMARY)
+    writer.start("itunes:owner")
+    writer.element("itunes:name", FEED_AUTHOR)
+    writer.element("itunes:email", FEED_EMAIL)
+    writer.end("itunes:owner")
+    writer.element("itunes:explicit", "no")
+    for item in items:
+        writer.start("item")
+        writer.element("title", item.title)
+        writer.element("itunes:author", FEED_AUTHOR)
+        writer.element("itunes:summary", item.description)
+        writer.element("description", item.description)
+        writer.element(
+            "enclosure",
+            attrs={
+                "url": item.url,
+                "length": str(item.length),
+                "type": AUDIO_MIME_TYPE,
+            },
+        )
+        writer.element("guid", item.guid, {"isPermaLink": "false"})
+        writer.element("pubDate", item.pub_date)
+        if item.duration_seconds is not None:
+            writer.element("itunes:duration", format_duration(item.duration_seconds))
+        writer.end("item")
+    writer.end("channel")
+    writer.end("rss")
+    writer.xml.endDocument()
+    out.write(b"\n")
+
+
+def render_feed(items: list[FeedItem]) -> bytes:
+    out = io.BytesIO()
+    write_feed(out, items)
+    return out.getvalue()
+
+
+def update_feed(
+    feed_path: Path = RSS_FEED_PATH,
+    assets_folder: Path = LOGSEQ_ASSETS_FOLDER,
+    catalog_path: Path = EPISODE_CATALOG_PATH,
+) -> bool:
+    """
+    Regenerates the feed from the episode data, and writes it if it changed.
+    Returns True if the feed was written.
+    """
+    with open_catalog(catalog_path, assets_folder) as catalog:
+        episodes = catalog.episodes()
+    feed = render_feed(feed_items(episodes))
+    try:
+        if feed_path.read_bytes() == feed:
+            logger.info(f"{get_relative_path(feed_path)} is up to date")
+            return False
+    except FileNotFoundError:
+        pass
+    feed_path.write_bytes(feed)
+    logger.info(f"Output written to {get_relative_path(feed_path)}")
+    return True
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description="Generate the podcast feed from the episode data."
+    )
+    parser.add_argument(
+        "--assets-dir",
+        type=Path,
+        default=LOGSEQ_ASSETS_FOLDER,
+        help=f"The garden assets directory. Default is {get_relative_path(LOGSEQ_ASSETS_FOLDER)}.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=RSS_FEED_PATH,
+        help=f"Where to write the feed. Default is {get_relative_path(RSS_FEED_PATH)}.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    update_feed(args.output, args.assets_dir)
+
+
+if __name__ == "__main__":
+    main()
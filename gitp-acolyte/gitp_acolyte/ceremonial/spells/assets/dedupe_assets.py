@@ -0,0 +1,190 @@
+"""
+dedupe_assets.py
+
+Finds garden assets with identical content across episodes, such as patch
+and MIDI files that were re-exported unchanged, and hardlinks them so each
+unique blob is stored once on disk.
+
+Hashing is incremental: each episode publishing directory's Manifest is
+refreshed, so only files whose size or mtime changed are hashed again.
+
+Git already stores identical blobs once in its object database and does not
+record hardlinks, so linking only saves space in a working tree. Episodes
+deliberately reuse the same patch file, so duplicate content is not an
+error in itself: --check hashes without writing any manifest, and fails
+only on duplicates that are not hardlinked yet, which is what --link would
+change.
+
+Usage:
+    dedupe_assets.py - report duplicate assets.
+    dedupe_assets.py --link - hardlink duplicate assets to the earliest copy.
+    dedupe_assets.py --check - report unlinked duplicates without writing anything, and exit with status 1 if there are any.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import coloredlogs
+
+from gitp_acolyte.ceremonial.spells.episode_data.create import (
+    find_episode_publishing_dirs,
+)
+from gitp_acolyte.constants import (
+    EPISODE_YAML_FILENAME,
+    LOGSEQ_ASSETS_FOLDER,
+    get_relative_path,
+)
+from gitp_acolyte.utils.manifest import Manifest
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+
+@dataclass
+class DuplicateGroup:
+    """
+    Asset files sharing one digest, in episode date order.
+    The first path is the canonical copy.
+    """
+
+    digest: str
+    size: int
+    paths: list[Path]
+
+    @property
+    def unlinked_paths(self) -> list[Path]:
+        """
+        The paths that are not yet hardlinks of the canonical copy.
+        """
+        canonical = self.paths[0]
+        return [path for path in self.paths[1:] if not path.samefile(canonical)]
+
+    @property
+    def reclaimable_bytes(self) -> int:
+        return self.size * len(self.unlinked_paths)
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description="Find and hardlink identical assets across episodes."
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--link",
+        action="store_true",
+        help="Replace duplicate assets with hardlinks to the earliest copy.",
+    )
+    mode.add_argument(
+        "--check",
+        action="store_true",
+        help="Write nothing, and exit with status 1 if any duplicate assets are not hardlinked yet.",
+    )
+    parser.add_argument(
+        "--assets-dir",
+        type=Path,
+        default=LOGSEQ_ASSETS_FOLDER,
+        help=f"The garden assets directory. Default is {get_relative_path(LOGSEQ_ASSETS_FOLDER)}.",
+    )
+    return parser.parse_args()
+
+
+def load_episode_manifests(assets_folder: Path, save: bool = True) -> list[Manifest]:
+    """
+    Loads and refreshes the manifest of every episode publishing directory,
+    saving the ones that changed unless save is False.
+    """
+    manifests = []
+    for _, episode_dir in find_episode_publishing_dirs(assets_folder):
+        manifest = Manifest.load(episode_dir)
+        manifest.refresh()
+        if save:
+            manifest.save()
+        manifests.append(manifest)
+    return manifests
+
+
+def find_duplicate_groups(manifests: list[Manifest]) -> list[DuplicateGroup]:
+    """
+    Groups the asset files of all manifests by digest and returns the groups
+    with more than one file.
+    """
+    groups: dict[str, DuplicateGroup] = {}
+    for manifest in manifests:
+        for name, entry in manifest.entries.items():
+            if name == EPISODE_YAML_FILENAME:
+                continue
+            group = groups.setdefault(
+                entry.digest, DuplicateGroup(entry.digest, entry.size, [])
+            )
+            group.paths.append(manifest.directory / name)
+    return [group for group in groups.values() if len(group.paths) > 1]
+
+
+def link_duplicates(group: DuplicateGroup, manifests_by_dir: dict[Path, Manifest]):
+    """
+    Atomically replaces every unlinked duplicate in group with a hardlink to
+    the canonical copy.
+    """
+    canonical = group.paths[0]
+    for path in group.unlinked_paths:
+        tmp_path = path.with_name(f".{path.name}.link")
+        tmp_path.unlink(missing_ok=True)
+        os.link(canonical, tmp_path)
+        os.replace(tmp_path, path)
+        manifests_by_dir[path.parent].record(path.name, path.stat(), group.digest)
+        logger.info(
+            f"Linked '{get_relative_path(path)}' to '{get_relative_path(canonical)}'"
+        )
+
+
+def log_duplicate_groups(groups: list[DuplicateGroup]):
+    for group in groups:
+        paths = ", ".join(f"'{get_relative_path(path)}'" for path in group.paths)
+        logger.info(f"{len(group.paths)} copies of {group.size} bytes: {paths}")
+
+
+def main():
+    args = get_args()
+    manifests = load_episode_manifests(args.assets_dir, save=not args.check)
+    groups = find_duplicate_groups(manifests)
+    unlinked_groups = [group for group in groups if group.unlinked_paths]
+    log_duplicate_groups(unlinked_groups)
+    reclaimable = sum(group.reclaimable_bytes for group in unlinked_groups)
+
+    if args.check:
+        if unlinked_groups:
+            logger.error(
+                f"{len(unlinked_groups)} duplicate asset group(s) are not "
+                "hardlinked; run dedupe_assets.py --link."
+            )
+            sys.exit(1)
+        logger.info("No unlinked duplicate assets found.")
+        return
+
+    if args.link:
+        manifests_by_dir = {manifest.directory: manifest for manifest in manifests}
+        for group in unlinked_groups:
+            link_duplicates(group, manifests_by_dir)
+        for manifest in manifests:
+            manifest.save()
+        logger.info(f"Reclaimed {reclaimable} bytes.")
+    elif unlinked_groups:
+        logger.warning(
+            f"{len(unlinked_groups)} duplicate asset group(s); "
+            f"{reclaimable} bytes reclaimable with --link."
+        )
+    else:
+        logger.info("No duplicate assets found.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+bench_episode_yaml.py
+
+Compares the pure-Python and libyaml paths of episode_yaml on the reference
+episode.yml, and times bulk loading a garden's worth of episode.yml files
+sequentially and with load_episode_yamls.
+
+Usage:
+    bench_episode_yaml.py [--iterations <n>] [--episodes <n>]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import coloredlogs
+import yaml
+
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    HAS_LIBYAML,
+    load_episode_yamls,
+    parse_yaml,
+    read_episode_yaml,
+    serialize_yaml,
+)
+from gitp_acolyte.ceremonial.spells.episode_reference.constants import (
+    DEFAULT_REFERENCE_EPISODE_YML_PATH,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+DEFAULT_ITERATIONS = 500
+DEFAULT_EPISODES = 500
+
+
+def time_per_call(fn, iterations: int) -> float:
+    """
+    Returns the mean seconds per call of fn over iterations calls.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def bench_single_document(iterations: int):
+    text = DEFAULT_REFERENCE_EPISODE_YML_PATH.read_text()
+    data = parse_yaml(text)
+    paths = [("python", yaml.SafeLoader, yaml.SafeDumper)]
+    if HAS_LIBYAML:
+        paths.append(("libyaml", yaml.CSafeLoader, yaml.CSafeDumper))
+    else:
+        logger.warning("PyYAML was built without libyaml; only timing pure Python")
+    for name, loader, dumper in paths:
+        load = time_per_call(lambda: parse_yaml(text, loader), iterations)
+        dump = time_per_call(lambda: serialize_yaml(data, dumper), iterations)
+        logger.info(f"{name:>7}: load {load * 1e6:8.1f} us, dump {dump * 1e6:8.1f} us")
+
+
+def bench_bulk_load(episodes: int):
+    text = DEFAULT_REFERENCE_EPISODE_YML_PATH.read_text()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(episodes):
+            path = Path(tmp) / f"{i:04d}" / "episode.yml"
+            path.parent.mkdir()
+            path.write_text(text)
+            paths.append(path)
+
+        start = time.perf_counter()
+        for path in paths:
+            read_episode_yaml(path)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_episode_yamls(paths)
+        pooled = time.perf_counter() - start
+    logger.info(
+        f"{episodes} files: sequential {sequential * 1e3:.1f} ms, "
+        f"load_episode_yamls {pooled * 1e3:.1f} ms"
+    )
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Benchmark episode.yml I/O.")
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=DEFAULT_ITERATIONS,
+        help="Loads and dumps of the reference episode.yml to time per path.",
+    )
+    parser.add_argument(
+        "--episodes",
+        type=int,
+        default=DEFAULT_EPISODES,
+        help="Number of episode.yml files to bulk load.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    bench_single_document(args.iterations)
+    bench_bulk_load(args.episodes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+"""
+catalog.py
+
+An index of every episode.yml under LOGSEQ_ASSETS_FOLDER, kept in a SQLite
+file in CACHE_DIR so that questions about all episodes are answered without
+parsing every episode.yml again.
+
+refresh() brings the catalog up to date incrementally: an episode.yml is
+only hashed when its size or mtime changed, and only parsed when its digest
+changed. Whether each episode's audio file is present is checked on every
+refresh, since the audio is synced without touching episode.yml.
+
+The patch name of each MicroFreak patch, from the patch_info that
+update_file_attrs.py reads from the patch headers, is indexed with its file
+name, and the duration of the audio is kept from its audio_info.
+
+Usage:
+    catalog.py - list every episode.
+    catalog.py --since <date> --until <date> - list the episodes in a date range.
+    catalog.py --file <name> - list the episodes with a patch or MIDI file matching a glob pattern.
+    catalog.py --patch <name> - list the episodes with a patch whose name matches a glob pattern.
+    catalog.py --missing-audio - list the episodes whose audio file is missing.
+    catalog.py --rebuild - rebuild the catalog from scratch first.
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+import coloredlogs
+import yaml
+
+from gitp_acolyte.ceremonial.spells.episode_data.create import (
+    find_episode_publishing_dirs,
+)
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    read_episode_yaml,
+)
+from gitp_acolyte.constants import (
+    CACHE_DIR,
+    DATE_FORMAT,
+    EPISODE_YAML_FILENAME,
+    LOGSEQ_ASSETS_FOLDER,
+)
+from gitp_acolyte.utils.hashing import hash_file
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+EPISODE_CATALOG_PATH = CACHE_DIR / "episode_catalog.sqlite3"
+CATALOG_SCHEMA_VERSION = 3
+PATCH_FILE_KIND = "patch"
+MIDI_FILE_KIND = "midi"
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    episode_date TEXT PRIMARY KEY,
+    episode_dir TEXT NOT NULL,
+    yaml_size INTEGER NOT NULL,
+    yaml_mtime_ns INTEGER NOT NULL,
+    yaml_digest TEXT NOT NULL,
+    episode_title TEXT NOT NULL,
+    audio_file TEXT NOT NULL,
+    description TEXT NOT NULL,
+    audio_present INTEGER NOT NULL,
+    audio_duration_seconds REAL
+);
+CREATE TABLE IF NOT EXISTS episode_files (
+    episode_date TEXT NOT NULL REFERENCES episodes (episode_date) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    patch_name TEXT,
+    PRIMARY KEY (episode_date, kind, position)
+);
+CREATE INDEX IF NOT EXISTS episode_files_by_name ON episode_files (file_name);
+CREATE INDEX IF NOT EXISTS episode_files_by_patch_name ON episode_files (patch_name);
+"""
+
+EPISODE_COLUMNS = (
+    "episode_date, episode_dir, episode_title, audio_file, description, "
+    "audio_present, audio_duration_seconds"
+)
+
+
+class CatalogEpisode(NamedTuple):
+    episode_date: datetime
+    episode_dir: Path
+    episode_title: str
+    audio_file: str
+    description: str
+    patch_files: list[str]
+    midi_files: list[str]
+    audio_present: bool
+    audio_duration_seconds: float | None
+
+
+class RefreshSummary(NamedTuple):
+    parsed: int
+    unchanged: int
+    removed: int
+
+
+def audio_is_present(episode_dir: Path, audio_file: str) -> bool:
+    return bool(audio_file) and (episode_dir / audio_file).is_file()
+
+
+def patch_name(info) -> str | None:
+    """
+    The patch name in one patch_info entry, if it has one.
+    """
+    return info.get("patch_name") if isinstance(info, dict) else None
+
+
+def file_names(value, yaml_path: Path, field: str) -> list[str]:
+    """
+    The file names in a patch_files or midi_files entry. A single name is
+    read as a list of one; entries that are not strings are logged and
+    skipped.
+    """
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list):
+        if value is not None:
+            logger.warning(f"Skipping {field} in {yaml_path}: not a list")
+        return []
+    names = []
+    for entry in value:
+        if isinstance(entry, str):
+            names.append(entry)
+        else:
+            logger.warning(f"Skipping {field} entry {entry!r} in {yaml_path}")
+    return names
+
+
+def audio_duration(info) -> float | None:
+    """
+    The duration in an audio_info entry, if it has one.
+    """
+    if not isinstance(info, dict):
+        return None
+    duration = info.get("duration_seconds")
+    if isinstance(duration, bool) or not isinstance(duration, (int, float)):
+        return None
+    return float(duration)
+
+
+class EpisodeCatalog:
+    """
+    The episode catalog database.
+    """
+
+    def __init__(self, path: Path = EPISODE_CATALOG_PATH):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        if self._schema_version() != CATALOG_SCHEMA_VERSION:
+            self.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _schema_version(self) -> int:
+        return self.connection.execute("PRAGMA user_version").fetchone()[0]
+
+    def clear(self):
+        """
+        Drops every table and recreates the schema.
+        """
+        with self.connection:
+            self.connection.executescript(
+                "DROP TABLE IF EXISTS episode_files; DROP TABLE IF EXISTS episodes;"
+            )
+            self.connection.executescript(CATALOG_SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {CATALOG_SCHEMA_VERSION}")
+
+    def refresh(self, assets_folder: Path = LOGSEQ_ASSETS_FOLDER) -> RefreshSummary:
+        """
+        Brings the catalog up to date with the episode.yml files under
+        assets_folder, in one transaction.
+        """
+        known = {
+            row[0]: row[1:]
+            for row in self.connection.execute(
+                "SELECT episode_date, yaml_size, yaml_mtime_ns, yaml_digest, "
+                "audio_file, audio_present FROM episodes"
+            )
+        }
+        parsed = unchanged = 0
+        seen = set()
+        with self.connection:
+            for episode_date, episode_dir in find_episode_publishing_dirs(
+                assets_folder
+            ):
+                yaml_path = episode_dir / EPISODE_YAML_FILENAME
+                try:
+                    stat = yaml_path.stat()
+                except FileNotFoundError:
+                    continue
+                key = episode_date.strftime(DATE_FORMAT)
+                seen.add(key)
+                if key in known:
+                    size, mtime_ns, digest, audio_file, audio_present = known[key]
+                    if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                        new_digest = hash_file(yaml_path)
+                        if new_digest != digest:
+                            self._index_episode(
+                                key, episode_dir, yaml_path, stat, new_digest
+                            )
+                            parsed += 1
+                            continue
+                        self.connection.execute(
+                            "UPDATE episodes SET yaml_size = ?, yaml_mtime_ns = ? "
+                            "WHERE episode_date = ?",
+                            (stat.st_size, stat.st_mtime_ns, key),
+                        )
+                    present = audio_is_present(episode_dir, audio_file)
+                    if present != bool(audio_present):
+                        self.connection.execute(
+                            "UPDATE episodes SET audio_present = ? WHERE episode_date = ?",
+                            (present, key),
+                        )
+                    unchanged += 1
+                    continue
+                self._index_episode(key, episode_dir, yaml_path, stat)
+                parsed += 1
+
+            removed = [key for key in known if key not in seen]
+            self.connection.executemany(
+                "DELETE FROM episodes WHERE episode_date = ?",
+                [(key,) for key in removed],
+            )
+        summary = RefreshSummary(parsed, unchanged, len(removed))
+        logger.debug(f"Catalog refreshed: {summary}")
+        return summary
+
+    def _index_episode(
+        self,
+        key: str,
+        episode_dir: Path,
+        yaml_path: Path,
+        stat: os.stat_result,
+        digest: str | None = None,
+    ):
+        """
+        Parses one episode.yml and replaces its rows. A file that is not
+        valid UTF-8 YAML, or not a mapping, is logged and indexed with empty
+        fields, so it is not parsed again until it changes.
+        """
+        digest = digest or hash_file(yaml_path)
+        try:
+            data = read_episode_yaml(yaml_path)
+        except (yaml.YAMLError, UnicodeDecodeError) as e:
+            logger.warning(f"Skipping unparseable {yaml_path}: {e}")
+            data = {}
+        audio_file = data.get("audio_file") or ""
+        self.connection.execute("DELETE FROM episodes WHERE episode_date = ?", (key,))
+        self.connection.execute(
+            "INSERT INTO episodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                str(episode_dir),
+                stat.st_size,
+                stat.st_mtime_ns,
+                digest,
+                data.get("episode_title") or "",
+                audio_file,
+                data.get("description") or "",
+                audio_is_present(episode_dir, audio_file),
+                audio_duration(data.get("audio_info")),
+            ),
+        )
+        patch_info = data.get("patch_info")
+        if not isinstance(patch_info, dict):
+            patch_info = {}
+        self.connection.executemany(
+            "INSERT INTO episode_files VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    key,
+                    kind,
+                    file_name,
+                    position,
+                    patch_name(patch_info.get(file_name)),
+                )
+                for kind, field in (
+                    (PATCH_FILE_KIND, "patch_files"),
+                    (MIDI_FILE_KIND, "midi_files"),
+                )
+                for position, file_name in enumerate(
+                    file_names(data.get(field), yaml_path, field)
+                )
+            ],
+        )
+
+    def _episodes(
+        self, where: str = "", parameters: tuple = ()
+    ) -> list[CatalogEpisode]:
+        rows = self.connection.execute(
+            f"SELECT {EPISODE_COLUMNS} FROM episodes {where} ORDER BY episode_date",
+            parameters,
+        ).fetchall()
+        files: dict[str, dict[str, list[str]]] = {}
+        for episode_date, kind, file_name in self.connection.execute(
+            "SELECT episode_date, kind, file_name FROM episode_files "
+            f"WHERE episode_date IN (SELECT episode_date FROM episodes {where}) "
+            "ORDER BY episode_date, kind, position",
+            parameters,
+        ):
+            files.setdefault(episode_date, {}).setdefault(kind, []).append(file_name)
+        return [
+            CatalogEpisode(
+                episode_date=datetime.strptime(episode_date, DATE_FORMAT),
+                episode_dir=Path(episode_dir),
+                episode_title=episode_title,
+                audio_file=audio_file,
+                description=description,
+                patch_files=files.get(episode_date, {}).get(PATCH_FILE_KIND, []),
+                midi_files=files.get(episode_date, {}).get(MIDI_FILE_KIND, []),
+                audio_present=bool(audio_present),
+                audio_duration_seconds=audio_duration_seconds,
+            )
+            for (
+                episode_date,
+                episode_dir,
+                episode_title,
+                audio_file,
+                description,
+                audio_present,
+                audio_duration_seconds,
+            ) in rows
+        ]
+
+    def episodes(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> list[CatalogEpisode]:
+        """
+        Returns the episodes dated within [since, until], in date order.
+        """
+        return self._episodes(
+            "WHERE episode_date BETWEEN ? AND ?",
+            (
+                since.strftime(DATE_FORMAT) if since else "0000-00-00",
+                until.strftime(DATE_FORMAT) if until else "9999-99-99",
+            ),
+        )
+
+    def episodes_with_file(self, pattern: str) -> list[CatalogEpisode]:
+        """
+        Returns the episodes with a patch or MIDI file name matching pattern,
+        a GLOB pattern such as "*.mid" or an exact file name.
+        """
+        return self._episodes(
+            "WHERE episode_date IN "
+            "(SELECT episode_date FROM episode_files WHERE file_name GLOB ?)",
+            (pattern,),
+        )
+
+    def episodes_with_patch(self, pattern: str) -> list[CatalogEpisode]:
+        """
+        Returns the episodes with a patch whose name on the synth matches
+        pattern, a GLOB pattern such as "TMF.24.12.*".
+        """
+        return self._episodes(
+            "WHERE episode_date IN "
+            "(SELECT episode_date FROM episode_files WHERE patch_name GLOB ?)",
+            (pattern,),
+        )
+
+    def episodes_missing_audio(self) -> list[CatalogEpisode]:
+        """
+        Returns the episodes whose audio file is not in their directory.
+        """
+        return self._episodes("WHERE NOT audio_present")
+
+
+def open_catalog(
+    path: Path = EPISODE_CATALOG_PATH, assets_folder: Path = LOGSEQ_ASSETS_FOLDER
+) -> EpisodeCatalog:
+    """
+    Opens the catalog and refreshes it.
+    """
+    catalog = EpisodeCatalog(path)
+    catalog.refresh(assets_folder)
+    return catalog
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Query the episode catalog.")
+    parser.add_argument(
+        "--since",
+        type=lambda s: datetime.strptime(s, DATE_FORMAT),
+        help=f"List the episodes on or after this date, in {DATE_FORMAT} format.",
+    )
+    parser.add_argument(
+        "--until",
+        type=lambda s: datetime.strptime(s, DATE_FORMAT),
+        help=f"List the episodes on or before this date, in {DATE_FORMAT} format.",
+    )
+    parser.add_argument(
+        "--file",
+        help="List the episodes with a patch or MIDI file matching this glob pattern.",
+    )
+    parser.add_argument(
+        "--patch",
+        help="List the episodes with a patch whose name matches this glob pattern.",
+    )
+    parser.add_argument(
+        "--missing-audio",
+        action="store_true",
+        help="List the episodes whose audio file is missing.",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild the catalog from scratch.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    with EpisodeCatalog() as catalog:
+        if args.rebuild:
+            catalog.clear()
+        catalog.refresh()
+        if args.file:
+            episodes = catalog.episodes_with_file(args.file)
+        elif args.patch:
+            episodes = catalog.episodes_with_patch(args.patch)
+        elif args.missing_audio:
+            episodes = catalog.episodes_missing_audio()
+        else:
+            episodes = catalog.episodes(args.since, args.until)
+    for episode in episodes:
+        files = ", ".join(episode.patch_files + episode.midi_files)
+        audio = episode.audio_file if episode.audio_present else "no audio"
+        logger.info(
+            f"{episode.episode_date.strftime(DATE_FORMAT)} {episode.episode_title}: "
+            f"{audio}; {files}"
+        )
+    logger.info(f"{len(episodes)} episode(s)")
+
+
+if __name__ == "__main__":
+    main()
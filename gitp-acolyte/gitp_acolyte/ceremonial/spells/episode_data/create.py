@@ -1,23 +1,27 @@
 import argparse
 import logging
+import os
+from datetime import datetime
 from pathlib import Path
 
 import coloredlogs
-import yaml
 
 from gitp_acolyte.ceremonial.spells.episode_data.args import (
     define_common_args,
     get_episode_date,
 )
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    update_episode_yaml,
+)
 from gitp_acolyte.constants import (
     DATE_FORMAT,
+    EPISODE_RECORDING_DIR_NAME_FORMAT,
     EPISODE_YAML_FILENAME,
     LOGSEQ_ASSETS_FOLDER,
     LOGSEQ_FOLDER,
     RECORDINGS_ROOT_FOLDER,
     REFERENCE_EPISODE_DIR,
     REPO_ROOT,
-    SHORT_DATE_FORMAT,
 )
 
 # Configure logging
@@ -60,12 +64,43 @@ def construct_episode_recording_dir_name(episode_date):
     Constructs the episode recording directory name.
     Should handle the date format so the directories are like "GitP.24.12.04 Project"
     """
-    episode_recording_dir_name = (
-        f"GitP.{episode_date.strftime(SHORT_DATE_FORMAT)} Project"
+    episode_recording_dir_name = episode_date.strftime(
+        EPISODE_RECORDING_DIR_NAME_FORMAT
     )
     return episode_recording_dir_name
 
 
+def parse_episode_recording_dir_name(episode_recording_dir_name) -> datetime | None:
+    """
+    The inverse of construct_episode_recording_dir_name.
+    Returns the episode date of a directory named like "GitP.24.12.04 Project",
+    or None if the name is not an episode recording directory name.
+    """
+    try:
+        return datetime.strptime(
+            episode_recording_dir_name, EPISODE_RECORDING_DIR_NAME_FORMAT
+        )
+    except ValueError:
+        return None
+
+
+def find_episode_recording_dirs(
+    recordings_root=RECORDINGS_ROOT_FOLDER,
+) -> list[tuple[datetime, Path]]:
+    """
+    Finds every episode recording directory directly under recordings_root.
+    Returns a list of (episode date, directory path) tuples sorted by date.
+    """
+    recordings_root = recordings_root.expanduser()
+    episode_recording_dirs = []
+    with os.scandir(recordings_root) as entries:
+        for entry in entries:
+            episode_date = parse_episode_recording_dir_name(entry.name)
+            if episode_date is not None and entry.is_dir():
+                episode_recording_dirs.append((episode_date, Path(entry.path)))
+    return sorted(episode_recording_dirs)
+
+
 def construct_path_to_episode_recording_dir(episode_date):
     """
     Constructs the path to the episode recording directory.
@@ -106,6 +141,26 @@ def construct_path_to_episode_publishing_dir(episode_date, args):
     return episode_publishing_dir
 
 
+def find_episode_publishing_dirs(
+    assets_folder=LOGSEQ_ASSETS_FOLDER,
+) -> list[tuple[datetime, Path]]:
+    """
+    Finds every episode publishing directory, i.e. every
+    Ceremony/YYYY/MM/DD directory under assets_folder.
+    Returns a list of (episode date, directory path) tuples sorted by date.
+    """
+    episode_publishing_dirs = []
+    for day_dir in (assets_folder / "Ceremony").glob("[0-9]*/[0-9]*/[0-9]*"):
+        year, month, day = day_dir.relative_to(assets_folder / "Ceremony").parts
+        try:
+            episode_date = datetime.strptime(f"{year}-{month}-{day}", DATE_FORMAT)
+        except ValueError:
+            continue
+        if day_dir.is_dir():
+            episode_publishing_dirs.append((episode_date, day_dir))
+    return sorted(episode_publishing_dirs)
+
+
 def ensure_episode_publishing_dir(episode_date, args):
     """
     Ensures the episode publishing directory exists.
@@ -141,30 +196,13 @@ def ensure_episode_yaml(episode_date, args):
     Ensures that episode.yml exists in the episode publishing directory
     """
     episode_yaml_path = path_to_episode_publishing_yml(episode_date, args)
-
-    if episode_yaml_path.exists() and args.recreate:
-        episode_yaml_path.unlink()
-        logger.info(
-            f"--recreate: Removed existing episode.yml file: {episode_yaml_path}"
-        )
-
-    if not episode_yaml_path.exists():
-        episode_data = {"episode_date": episode_date.strftime(DATE_FORMAT)}
-        with episode_yaml_path.open("w") as file:
-            yaml.dump(episode_data, file)
-        return True
-    else:
-        with episode_yaml_path.open("r") as file:
-            episode_data = yaml.safe_load(file)
-
-        if "episode_date" not in episode_data or episode_data[
-            "episode_date"
-        ] != episode_date.strftime(DATE_FORMAT):
-            episode_data["episode_date"] = episode_date.strftime(DATE_FORMAT)
-            with episode_yaml_path.open("w") as file:
-                yaml.dump(episode_data, file)
-            return True
-    return False
+    episode_data = {"episode_date": episode_date.strftime(DATE_FORMAT)}
+    updated = update_episode_yaml(
+        episode_yaml_path, episode_data, replace=args.recreate
+    )
+    if updated and args.recreate:
+        logger.info(f"--recreate: Replaced episode.yml file: {episode_yaml_path}")
+    return updated
 
 
 def recording_dir_exists(episode_date, args) -> tuple[Path, bool]:
@@ -0,0 +1,181 @@
+"""
+episode_yaml.py
+
+Reading and writing episode.yml files.
+
+The libyaml C loader and dumper are used when PyYAML was built with them,
+falling back to the pure-Python ones otherwise; both produce the same
+documents. Whole-garden operations can load many files at once with
+load_episode_yamls, which overlaps the file reads on a thread pool.
+
+Every write goes through update_episode_yaml, so pipeline stages can update
+the same episode concurrently: it holds an advisory lock on the episode
+directory, merges its fields into the current document, skips the write if
+the file would not change, and otherwise replaces the file atomically.
+"""
+
+import fcntl
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import coloredlogs
+import yaml
+from pydantic import BaseModel
+
+from gitp_acolyte.ceremonial.spells.episode_reference.episode_schema import (
+    PodcastEpisodePublicationData,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+HAS_LIBYAML = yaml.__with_libyaml__
+SafeLoader = yaml.CSafeLoader if HAS_LIBYAML else yaml.SafeLoader
+SafeDumper = yaml.CSafeDumper if HAS_LIBYAML else yaml.SafeDumper
+DEFAULT_LOAD_WORKERS = 8
+
+
+class NotAMappingError(yaml.YAMLError):
+    """
+    Raised when an episode.yml document is valid YAML but not a mapping,
+    e.g. a list or a scalar.
+    """
+
+
+def parse_yaml(text: str, loader=SafeLoader) -> dict:
+    """
+    Parses an episode.yml document; an empty document is an empty dict.
+    Raises yaml.YAMLError if it is not valid YAML, and NotAMappingError, a
+    yaml.YAMLError, if it is not a mapping.
+    """
+    data = yaml.load(text, Loader=loader)
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise NotAMappingError(
+            f"expected a mapping of episode fields, found a {type(data).__name__}"
+        )
+    return data
+
+
+def serialize_yaml(data: dict | BaseModel, dumper=SafeDumper) -> str:
+    """
+    Serializes episode data as an episode.yml document, with sorted keys and
+    block-style lists.
+    """
+    if isinstance(data, BaseModel):
+        data = data.model_dump()
+    return yaml.dump(data, Dumper=dumper, sort_keys=True, default_flow_style=False)
+
+
+def read_episode_yaml(path: Path) -> dict:
+    """
+    Returns the data in the episode.yml at path.
+    """
+    return parse_yaml(path.read_text())
+
+
+def validate_episode_data(data: dict) -> PodcastEpisodePublicationData:
+    """
+    Validates episode data read from an episode.yml.
+    Raises pydantic.ValidationError if fields are missing or malformed.
+    """
+    return PodcastEpisodePublicationData.model_validate(data)
+
+
+def load_episode(path: Path) -> PodcastEpisodePublicationData:
+    """
+    Reads and validates the episode.yml at path.
+    """
+    return validate_episode_data(read_episode_yaml(path))
+
+
+def load_episode_yamls(
+    paths: list[Path], max_workers: int = DEFAULT_LOAD_WORKERS
+) -> dict[Path, dict | Exception]:
+    """
+    Reads many episode.yml files on a thread pool.
+    Returns each path's data, or the exception reading or parsing it raised,
+    so that one broken file does not hide the others.
+    """
+
+    def read(path: Path) -> dict | Exception:
+        try:
+            return read_episode_yaml(path)
+        except (OSError, yaml.YAMLError) as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(paths, executor.map(read, paths)))
+
+
+@contextmanager
+def locked_episode_dir(episode_dir: Path):
+    """
+    Holds an exclusive advisory lock on the episode directory. The directory
+    itself is locked rather than a lock file, so nothing extra is left in
+    the published assets.
+    """
+    fd = os.open(episode_dir, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield fd
+    finally:
+        os.close(fd)
+
+
+def replace_file_contents(path: Path, content: bytes, dir_fd: int | None = None):
+    """
+    Writes content to a temporary file next to path, fsyncs it and renames
+    it over path, so readers see either the old or the new file.
+    """
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    if dir_fd is not None:
+        os.fsync(dir_fd)
+
+
+def update_episode_yaml(
+    path: Path, updates: dict | BaseModel, replace: bool = False
+) -> bool:
+    """
+    Merges updates into the episode.yml at path, creating it if needed, under
+    the episode directory's lock. With replace, the document is replaced by
+    updates instead. Returns True if the file was written, and False if it
+    already had exactly this content.
+    """
+    if isinstance(updates, BaseModel):
+        updates = updates.model_dump()
+    with locked_episode_dir(path.parent) as dir_fd:
+        try:
+            current = path.read_bytes()
+        except FileNotFoundError:
+            current = None
+        if replace or current is None:
+            data = dict(updates)
+        else:
+            data = {**parse_yaml(current.decode()), **updates}
+        content = serialize_yaml(data).encode()
+        if content == current:
+            return False
+        replace_file_contents(path, content, dir_fd)
+    return True
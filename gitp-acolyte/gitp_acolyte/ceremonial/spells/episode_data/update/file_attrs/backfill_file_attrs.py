@@ -0,0 +1,584 @@
+"""
+backfill_file_attrs.py
+
+Updates the file attributes of many episodes at once.
+
+Each episode's attributes are inferred locally as in update_file_attrs.py,
+and the missing descriptions are requested concurrently with AsyncOpenAI
+through a single client. Requests are bounded by a semaphore and by
+requests-per-minute and tokens-per-minute limits, and are retried with
+exponential backoff on 429 and 5xx responses and connection errors.
+A failed episode is reported without aborting the others.
+
+With coalescing, the listings of several episodes are packed into one
+structured-output request, sized to a token budget, and the descriptions
+are fanned back out to each episode.yml. This replaces a round trip and a
+copy of the system prompt per episode with a few requests.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import coloredlogs
+from openai import AsyncOpenAI
+
+from gitp_acolyte.ceremonial.spells.episode_data.create import (
+    find_episode_publishing_dirs,
+)
+from gitp_acolyte.ceremonial.spells.episode_data.update.file_attrs.update_file_attrs import (
+    BATCH_TELEMETRY_NAME,
+    DEFAULT_BATCH_TOKEN_BUDGET,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_PROMPT_TOKEN_BUDGET,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_TOKENS_PER_MINUTE,
+    OPENAI_MODEL,
+    TELEMETRY_NAME,
+    DescriptionRefusedError,
+    cache_description,
+    episode_files_fingerprint,
+    finish_update,
+    format_dated_directory_info,
+    get_batch_messages,
+    get_cached_description,
+    get_messages,
+    infer_local_episode_data,
+    is_up_to_date,
+    serialize_episode_dir_ai_info,
+)
+from gitp_acolyte.ceremonial.spells.episode_reference.episode_schema import (
+    EpisodeDescription,
+    EpisodeDescriptionBatch,
+    PodcastEpisodePublicationData,
+)
+from gitp_acolyte.constants import DATE_FORMAT, LOGSEQ_ASSETS_FOLDER
+from gitp_acolyte.utils.ai.client import (
+    DEFAULT_MAX_RETRIES,
+    async_parse_completion,
+    make_async_client,
+)
+from gitp_acolyte.utils.ai.tokens import estimate_tokens
+from gitp_acolyte.utils.manifest import Manifest
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+RATE_LIMIT_WINDOW_SECONDS = 60.0
+MAX_DESCRIPTION_TOKENS = 256
+
+
+@dataclass
+class EpisodeBackfillResult:
+    """
+    The outcome of updating one episode.
+    """
+
+    episode_date: datetime
+    updated: bool = False
+    requests: int = 0
+    error: str | None = None
+
+
+class RateLimiter:
+    """
+    Limits the requests and estimated tokens sent in any window of
+    RATE_LIMIT_WINDOW_SECONDS.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+        clock=time.monotonic,
+        sleep=asyncio.sleep,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._sent: deque[tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float):
+        while self._sent and now - self._sent[0][0] >= RATE_LIMIT_WINDOW_SECONDS:
+            _, tokens = self._sent.popleft()
+            self._tokens_in_window -= tokens
+
+    async def acquire(self, tokens: int):
+        """
+        Waits until a request of tokens tokens fits in both limits, then
+        records it. Waiters are served in order.
+        """
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._expire(now)
+                if (
+                    len(self._sent) < self.requests_per_minute
+                    and self._tokens_in_window + tokens <= self.tokens_per_minute
+                ):
+                    self._sent.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+                await self._sleep(self._sent[0][0] + RATE_LIMIT_WINDOW_SECONDS - now)
+
+
+def estimate_request_tokens(messages: list[dict]) -> int:
+    """
+    A rough estimate of the tokens a request uses, including its response.
+    """
+    return (
+        sum(estimate_tokens(message["content"]) for message in messages)
+        + MAX_DESCRIPTION_TOKENS
+    )
+
+
+async def request_description(
+    client: AsyncOpenAI,
+    dir_info: dict,
+    limiter: RateLimiter,
+    semaphore: asyncio.BoundedSemaphore,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET,
+) -> tuple[EpisodeDescription, int]:
+    """
+    Asks the model for the description of the episode in dir_info.
+    Returns the description and the number of requests it took.
+    """
+    messages = get_messages(serialize_episode_dir_ai_info(dir_info, token_budget))
+    tokens = estimate_request_tokens(messages)
+    requests = 0
+
+    async def before_attempt():
+        nonlocal requests
+        await limiter.acquire(tokens)
+        requests += 1
+
+    async with semaphore:
+        completion = await async_parse_completion(
+            client,
+            messages,
+            OPENAI_MODEL,
+            EpisodeDescription,
+            name=TELEMETRY_NAME,
+            max_retries=max_retries,
+            before_attempt=before_attempt,
+        )
+    message = completion.choices[0].message
+    if message.parsed is None:
+        raise DescriptionRefusedError(
+            f"The model did not return a description: {message.refusal}"
+        )
+    return message.parsed, requests
+
+
+@dataclass
+class PreparedEpisode:
+    """
+    An episode whose data has been inferred locally, waiting for its
+    description.
+    """
+
+    episode_date: datetime
+    episode_dir: Path
+    manifest: Manifest
+    fingerprint: str
+    episode_data: dict
+    dir_info: dict
+
+    @property
+    def needs_description(self) -> bool:
+        return "description" not in self.episode_data
+
+
+def prepare_episode(
+    episode_dir: Path, episode_date: datetime, args
+) -> PreparedEpisode | None:
+    """
+    Infers an episode's data locally, filling in the description if it is
+    cached or --offline is set.
+    Returns None if the episode is up to date. Episodes left without a
+    description by --offline are not: finish_update does not stamp them.
+    """
+    manifest = Manifest.load(episode_dir)
+    fingerprint = episode_files_fingerprint(manifest)
+    if is_up_to_date(manifest, fingerprint, args):
+        return None
+    episode_data, dir_info = infer_local_episode_data(episode_dir, episode_date)
+    prepared = PreparedEpisode(
+        episode_date, episode_dir, manifest, fingerprint, episode_data, dir_info
+    )
+    if prepared.needs_description:
+        description = "" if args.offline else get_cached_description(dir_info, args)
+        if description is not None:
+            episode_data["description"] = description
+    return prepared
+
+
+async def finish_episode(
+    prepared: PreparedEpisode, args, requests: int = 0
+) -> EpisodeBackfillResult:
+    """
+    Writes a prepared episode's episode.yml once it has a description.
+    """
+    await asyncio.to_thread(
+        finish_update,
+        PodcastEpisodePublicationData(**prepared.episode_data),
+        prepared.episode_dir,
+        prepared.manifest,
+        prepared.fingerprint,
+        args,
+    )
+    return EpisodeBackfillResult(prepared.episode_date, updated=True, requests=requests)
+
+
+async def backfill_episode(
+    episode_date: datetime,
+    episode_dir: Path,
+    args,
+    client: AsyncOpenAI,
+    limiter: RateLimiter,
+    semaphore: asyncio.BoundedSemaphore,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> EpisodeBackfillResult:
+    """
+    Updates one episode's file attributes.
+    Errors are returned rather than raised so one episode cannot abort the batch.
+    """
+    try:
+        prepared = await asyncio.to_thread(
+            prepare_episode, episode_dir, episode_date, args
+        )
+        if prepared is None:
+            return EpisodeBackfillResult(episode_date)
+        requests = 0
+        if prepared.needs_description:
+            requests = await describe_episode(
+                prepared, args, client, limiter, semaphore, max_retries
+            )
+        return await finish_episode(prepared, args, requests)
+    except Exception as e:
+        return EpisodeBackfillResult(episode_date, error=f"{type(e).__name__}: {e}")
+
+
+async def describe_episode(
+    prepared: PreparedEpisode,
+    args,
+    client: AsyncOpenAI,
+    limiter: RateLimiter,
+    semaphore: asyncio.BoundedSemaphore,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> int:
+    """
+    Asks the model for one episode's description, caches it and stores it in
+    the episode data. Returns the number of requests it took.
+    """
+    episode_description, requests = await request_description(
+        client,
+        prepared.dir_info,
+        limiter,
+        semaphore,
+        max_retries,
+        args.prompt_token_budget,
+    )
+    cache_description(prepared.dir_info, args, episode_description)
+    prepared.episode_data["description"] = episode_description.description
+    return requests
+
+
+def plan_batches(
+    dated_directory_infos: list[str], batch_token_budget: int
+) -> list[list[int]]:
+    """
+    Groups the indexes of dated_directory_infos into batches whose prompt,
+    with the batch prompts and room for each description, fits in
+    batch_token_budget. A listing too large for any batch gets its own.
+    """
+    base_tokens = (
+        estimate_request_tokens(get_batch_messages([])) - MAX_DESCRIPTION_TOKENS
+    )
+    batches: list[list[int]] = []
+    batch: list[int] = []
+    batch_tokens = base_tokens
+    for index, dated_directory_info in enumerate(dated_directory_infos):
+        tokens = estimate_tokens(dated_directory_info) + MAX_DESCRIPTION_TOKENS
+        if batch and batch_tokens + tokens > batch_token_budget:
+            batches.append(batch)
+            batch = []
+            batch_tokens = base_tokens
+        batch.append(index)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def request_descriptions_batch(
+    client: AsyncOpenAI,
+    dated_directory_infos: list[str],
+    limiter: RateLimiter,
+    semaphore: asyncio.BoundedSemaphore,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> tuple[dict[str, str], int]:
+    """
+    Asks the model for the descriptions of several episodes in one request.
+    Returns the descriptions by episode date and the number of requests it took.
+    """
+    messages = get_batch_messages(dated_directory_infos)
+    tokens = estimate_request_tokens(messages) + MAX_DESCRIPTION_TOKENS * (
+        len(dated_directory_infos) - 1
+    )
+    requests = 0
+
+    async def before_attempt():
+        nonlocal requests
+        await limiter.acquire(tokens)
+        requests += 1
+
+    async with semaphore:
+        completion = await async_parse_completion(
+            client,
+            messages,
+            OPENAI_MODEL,
+            EpisodeDescriptionBatch,
+            name=BATCH_TELEMETRY_NAME,
+            max_retries=max_retries,
+            before_attempt=before_attempt,
+        )
+    message = completion.choices[0].message
+    if message.parsed is None:
+        raise DescriptionRefusedError(
+            f"The model did not return descriptions: {message.refusal}"
+        )
+    descriptions = {
+        episode.episode_date: episode.description for episode in message.parsed.episodes
+    }
+    return descriptions, requests
+
+
+async def backfill_episodes_coalesced(
+    episode_publishing_dirs: list[tuple[datetime, Path]],
+    args,
+    client: AsyncOpenAI,
+    limiter: RateLimiter,
+    semaphore: asyncio.BoundedSemaphore,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    batch_token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+) -> list[EpisodeBackfillResult]:
+    """
+    Updates the file attributes of every episode, packing the listings of
+    the episodes that need a description into as few requests as
+    batch_token_budget allows. An episode missing from a response is asked
+    for on its own; the requests of a batch are counted on its first episode.
+    """
+    results: dict[datetime, EpisodeBackfillResult] = {}
+    outcomes = await asyncio.gather(
+        *(
+            asyncio.to_thread(prepare_episode, episode_dir, episode_date, args)
+            for episode_date, episode_dir in episode_publishing_dirs
+        ),
+        return_exceptions=True,
+    )
+    prepared_episodes = []
+    for (episode_date, _), outcome in zip(episode_publishing_dirs, outcomes):
+        if isinstance(outcome, Exception):
+            results[episode_date] = EpisodeBackfillResult(
+                episode_date, error=f"{type(outcome).__name__}: {outcome}"
+            )
+        elif outcome is None:
+            results[episode_date] = EpisodeBackfillResult(episode_date)
+        else:
+            prepared_episodes.append(outcome)
+
+    pending = [prepared for prepared in prepared_episodes if prepared.needs_description]
+    dated_directory_infos = [
+        format_dated_directory_info(
+            prepared.episode_date.strftime(DATE_FORMAT),
+            serialize_episode_dir_ai_info(prepared.dir_info, args.prompt_token_budget),
+        )
+        for prepared in pending
+    ]
+    index_batches = plan_batches(dated_directory_infos, batch_token_budget)
+    batches = [[pending[index] for index in batch] for batch in index_batches]
+    logger.info(
+        f"Requesting {len(pending)} description(s) in {len(batches)} request(s)"
+    )
+    batch_outcomes = await asyncio.gather(
+        *(
+            request_descriptions_batch(
+                client,
+                [dated_directory_infos[index] for index in batch],
+                limiter,
+                semaphore,
+                max_retries,
+            )
+            for batch in index_batches
+        ),
+        return_exceptions=True,
+    )
+
+    requests_by_date: dict[datetime, int] = {}
+    stragglers: set[datetime] = set()
+    for batch, outcome in zip(batches, batch_outcomes):
+        if isinstance(outcome, Exception):
+            for prepared in batch:
+                results[prepared.episode_date] = EpisodeBackfillResult(
+                    prepared.episode_date, error=f"{type(outcome).__name__}: {outcome}"
+                )
+            continue
+        descriptions, requests = outcome
+        requests_by_date[batch[0].episode_date] = requests
+        for prepared in batch:
+            description = descriptions.get(prepared.episode_date.strftime(DATE_FORMAT))
+            if description is None:
+                stragglers.add(prepared.episode_date)
+                continue
+            cache_description(
+                prepared.dir_info, args, EpisodeDescription(description=description)
+            )
+            prepared.episode_data["description"] = description
+
+    async def finish(prepared: PreparedEpisode) -> EpisodeBackfillResult:
+        try:
+            requests = requests_by_date.get(prepared.episode_date, 0)
+            if prepared.episode_date in stragglers:
+                logger.warning(
+                    f"{prepared.episode_date.strftime(DATE_FORMAT)} is missing from "
+                    "the response; requesting its description on its own"
+                )
+                requests += await describe_episode(
+                    prepared, args, client, limiter, semaphore, max_retries
+                )
+            return await finish_episode(prepared, args, requests)
+        except Exception as e:
+            return EpisodeBackfillResult(
+                prepared.episode_date, error=f"{type(e).__name__}: {e}"
+            )
+
+    finished = await asyncio.gather(
+        *(
+            finish(prepared)
+            for prepared in prepared_episodes
+            if prepared.episode_date not in results
+        )
+    )
+    for result in finished:
+        results[result.episode_date] = result
+    return [results[episode_date] for episode_date, _ in episode_publishing_dirs]
+
+
+def select_episode_publishing_dirs(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    assets_folder: Path = LOGSEQ_ASSETS_FOLDER,
+) -> list[tuple[datetime, Path]]:
+    """
+    Returns the (episode date, publishing directory) pairs under
+    assets_folder whose date is within [since, until].
+    """
+    return [
+        (episode_date, episode_dir)
+        for episode_date, episode_dir in find_episode_publishing_dirs(assets_folder)
+        if (since is None or episode_date >= since)
+        and (until is None or episode_date <= until)
+    ]
+
+
+async def backfill_episodes(
+    episode_publishing_dirs: list[tuple[datetime, Path]],
+    args,
+    client: AsyncOpenAI,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+    tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    coalesce: bool = False,
+    batch_token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+) -> list[EpisodeBackfillResult]:
+    """
+    Updates the file attributes of every episode concurrently, and logs a
+    summary. With coalesce, several episodes are described per request.
+    """
+    start = time.perf_counter()
+    semaphore = asyncio.BoundedSemaphore(concurrency)
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    if coalesce:
+        results = await backfill_episodes_coalesced(
+            episode_publishing_dirs,
+            args,
+            client,
+            limiter,
+            semaphore,
+            max_retries,
+            batch_token_budget,
+        )
+    else:
+        results = await asyncio.gather(
+            *(
+                backfill_episode(
+                    episode_date,
+                    episode_dir,
+                    args,
+                    client,
+                    limiter,
+                    semaphore,
+                    max_retries,
+                )
+                for episode_date, episode_dir in episode_publishing_dirs
+            )
+        )
+    log_backfill_summary(results, time.perf_counter() - start)
+    return results
+
+
+async def run_backfill(
+    episode_publishing_dirs: list[tuple[datetime, Path]], args
+) -> list[EpisodeBackfillResult]:
+    """
+    Runs backfill_episodes with one pooled client.
+    """
+    async with make_async_client() as client:
+        return await backfill_episodes(
+            episode_publishing_dirs,
+            args,
+            client,
+            concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+            max_retries=args.max_retries,
+            coalesce=args.coalesce,
+            batch_token_budget=args.batch_token_budget,
+        )
+
+
+def log_backfill_summary(results: list[EpisodeBackfillResult], seconds: float):
+    """
+    Logs one line per episode and the totals over all episodes.
+    """
+    for result in results:
+        episode = result.episode_date.strftime(DATE_FORMAT)
+        if result.error:
+            logger.error(f"{episode}: failed: {result.error}")
+        elif result.updated:
+            logger.info(f"{episode}: updated with {result.requests} request(s)")
+        else:
+            logger.info(f"{episode}: up to date")
+    updated = sum(1 for result in results if result.updated)
+    failed = sum(1 for result in results if result.error)
+    requests = sum(result.requests for result in results)
+    logger.info(
+        f"Updated {updated}, failed {failed} of {len(results)} episode(s) "
+        f"with {requests} request(s) in {seconds:.2f}s"
+    )
@@ -0,0 +1,90 @@
+"""
+infer_file_attrs.py
+
+Rule-based inference of the file attributes in episode.yml from the names of
+the files in the episode publishing directory:
+- audio_file: the file ending in EPISODE_PUBLISHING_MP3_FILE_EXTENSION, or
+  the name it will have once it is synced, derived from the other files
+- patch_files: the files ending in MICROFREAK_PATCH_FILE_EXTENSION
+- midi_files: the files ending in MIDI_FILE_EXTENSION
+- episode_date: the episode date
+- episode_title: the existing title, or DEFAULT_EPISODE_TITLE
+"""
+
+from datetime import datetime
+
+from gitp_acolyte.ceremonial.spells.recording.files.rec_file_constants import (
+    EPISODE_PUBLISHING_MP3_FILE_EXTENSION,
+    MICROFREAK_PATCH_FILE_EXTENSION,
+    MIDI_FILE_EXTENSION,
+)
+from gitp_acolyte.constants import DATE_FORMAT
+
+DEFAULT_EPISODE_TITLE = "Ceremony"
+DEFAULT_EPISODE_FILE_PREFIX = "GitP."
+EPISODE_FILE_DATE_FORMAT = "%Y.%m.%d"
+
+
+def infer_episode_file_stem(file_names: list[str], episode_date: datetime) -> str:
+    """
+    Returns the stem episode files share, e.g. "GitP.2024.12.04", taken from
+    the first file name that contains the episode date.
+    """
+    file_date = episode_date.strftime(EPISODE_FILE_DATE_FORMAT)
+    for file_name in sorted(file_names):
+        index = file_name.find(file_date)
+        if index != -1:
+            return file_name[: index + len(file_date)]
+    return f"{DEFAULT_EPISODE_FILE_PREFIX}{file_date}"
+
+
+def infer_audio_file(
+    file_names: list[str], episode_date: datetime, existing_audio_file: str = ""
+) -> str:
+    """
+    Returns the episode's audio file name.
+    If the audio has not been synced yet, the existing audio_file is kept, or
+    the name is derived from the other episode files.
+    """
+    audio_files = sorted(
+        file_name
+        for file_name in file_names
+        if file_name.endswith(EPISODE_PUBLISHING_MP3_FILE_EXTENSION)
+    )
+    file_date = episode_date.strftime(EPISODE_FILE_DATE_FORMAT)
+    dated_audio_files = [name for name in audio_files if file_date in name]
+    if dated_audio_files:
+        return dated_audio_files[0]
+    if audio_files:
+        return audio_files[0]
+    if existing_audio_file:
+        return existing_audio_file
+    stem = infer_episode_file_stem(file_names, episode_date)
+    return f"{stem}{EPISODE_PUBLISHING_MP3_FILE_EXTENSION}"
+
+
+def infer_file_attrs(
+    file_names: list[str], episode_date: datetime, existing: dict | None = None
+) -> dict:
+    """
+    Returns every episode.yml attribute except the description, inferred from
+    the file names in the episode publishing directory.
+    existing is the current episode.yml data, whose title and audio file are
+    kept where the files do not determine them.
+    """
+    existing = existing or {}
+    return {
+        "episode_title": existing.get("episode_title") or DEFAULT_EPISODE_TITLE,
+        "episode_date": episode_date.strftime(DATE_FORMAT),
+        "audio_file": infer_audio_file(
+            file_names, episode_date, existing.get("audio_file", "")
+        ),
+        "patch_files": sorted(
+            name
+            for name in file_names
+            if name.endswith(MICROFREAK_PATCH_FILE_EXTENSION)
+        ),
+        "midi_files": sorted(
+            name for name in file_names if name.endswith(MIDI_FILE_EXTENSION)
+        ),
+    }
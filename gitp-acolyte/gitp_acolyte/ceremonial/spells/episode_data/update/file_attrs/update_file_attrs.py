@@ -1,26 +1,43 @@
 """
 update_file_attrs.py
 
-Given a path to a path to the logseq directory for an episode, 
+Given a path to a path to the logseq directory for an episode,
 update the attributes in episode.yml that point to files in that directory.
 
-Uses AI to infer the files.
+The file attributes, date and title are inferred locally by rules in
+infer_file_attrs.py. AI is only used to write the description, and only
+when episode.yml does not already have one. Responses are cached on disk,
+keyed on the directory listing (without timestamps), the prompts, the model
+and the schema.
+
+The duration and bitrate of the audio file are read from its MP3 headers
+and stored as audio_info, and the tempo map, note count, pitch range and
+duration of each MIDI file are stored in midi_info, keyed by file name.
+The name, oscillator and filter type and save time of each MicroFreak patch
+are read from its zip headers and stored in patch_info; they are cached by
+the patch's content digest, so unchanged patches are never opened again.
 
 Usage:
     update_file_attrs.py <episode_date> - update the file attributes for the given episode date.
     update_file_attrs.py --reference - update the file attributes for the reference episode.
+    update_file_attrs.py <episode_date> --refresh - ignore any cached response.
+    update_file_attrs.py <episode_date> --no-cache - neither read nor write the response cache.
+    update_file_attrs.py <episode_date> --offline - never call the model.
+    update_file_attrs.py --all - update every episode, requesting descriptions concurrently.
+    update_file_attrs.py --since <date> --until <date> - update the episodes in a date range.
+    update_file_attrs.py --all --coalesce - describe several episodes per model request.
 """
 
 import argparse
+import asyncio
 import json
 import logging
+import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
 import coloredlogs
-import yaml
-from dotenv import load_dotenv
-from openai import OpenAI
 from openai.types.chat.parsed_chat_completion import ParsedChatCompletion
 
 from gitp_acolyte.ceremonial.spells.episode_data.args import (
@@ -30,14 +47,44 @@ from gitp_acolyte.ceremonial.spells.episode_data.args import (
 from gitp_acolyte.ceremonial.spells.episode_data.create import (
     ensure_episode_dir_and_yaml_exists,
 )
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    read_episode_yaml,
+    serialize_yaml,
+    update_episode_yaml,
+)
+from gitp_acolyte.ceremonial.spells.episode_data.update.file_attrs.infer_file_attrs import (
+    infer_file_attrs,
+)
+from gitp_acolyte.ceremonial.spells.recording.files.rec_file_constants import (
+    FILE_SUFFIXES_TO_SYNC,
+    MICROFREAK_PATCH_FILE_EXTENSION,
+    PEAKS_FILE_SUFFIX,
+)
 from gitp_acolyte.ceremonial.spells.episode_reference.episode_schema import (
+    EpisodeAudioInfo,
+    EpisodeDescription,
+    EpisodeMidiInfo,
+    EpisodePatchInfo,
     PodcastEpisodePublicationData,
 )
 from gitp_acolyte.constants import (
+    DATE_FORMAT,
     EPISODE_YAML_FILENAME,
     REFERENCE_EPISODE_DIR,
     get_relative_path,
 )
+from gitp_acolyte.utils.ai.client import (
+    DEFAULT_MAX_RETRIES,
+    CallTelemetry,
+    parse_completion,
+    record_telemetry,
+)
+from gitp_acolyte.utils.ai.response_cache import ResponseCache, make_cache_key
+from gitp_acolyte.utils.ai.tokens import estimate_tokens, token_budget_chars
+from gitp_acolyte.utils.manifest import Manifest
+from gitp_acolyte.utils.media.mfpz_info import MfpzFormatError, MfpzInfoCache
+from gitp_acolyte.utils.media.midi_info import read_midi_infos
+from gitp_acolyte.utils.media.mp3_info import Mp3FormatError, read_mp3_info
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -47,12 +94,107 @@ coloredlogs.install(
     fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 
+MANIFEST_STAMP = "update_file_attrs"
+# part of the manifest stamp: bump it when episode.yml gains fields read from
+# the episode's files, so episodes stamped before are updated again
+FILE_ATTRS_VERSION = 1
+TELEMETRY_NAME = "update_file_attrs"
+BATCH_TELEMETRY_NAME = "update_file_attrs_batch"
+OPENAI_MODEL = "gpt-4o-mini"
+VOLATILE_FILE_INFO_FIELDS = ("last_modified",)
+FILE_INFO_COLUMNS = ["file_name", "size", "last_modified"]
+IGNORED_FILE_NAMES = (EPISODE_YAML_FILENAME, "__init__.py")
+IGNORED_FILE_SUFFIXES = (".py", ".pyc", PEAKS_FILE_SUFFIX)
+DEFAULT_PROMPT_TOKEN_BUDGET = 2000
+DEFAULT_BATCH_TOKEN_BUDGET = 16000
+DEFAULT_CONCURRENCY = 4
+# the gpt-4o-mini limits of the lowest usage tier
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 200_000
+
+
+class DescriptionRefusedError(ValueError):
+    """
+    Raised when the model returns a refusal instead of a description.
+    """
+
 
 def get_args():
     parser = argparse.ArgumentParser(
         description="Update Episode yaml data attributes, inferring from the filesystem."
     )
-    parser = define_common_args()
+    define_common_args(parser)
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the AI response cache.",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Call the model even if a cached response exists, and cache the new response.",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Never call the model; the description is left as it is.",
+    )
+    parser.add_argument(
+        "--prompt-token-budget",
+        type=int,
+        default=DEFAULT_PROMPT_TOKEN_BUDGET,
+        help=f"The most tokens the directory listing may use in the prompt. Default is {DEFAULT_PROMPT_TOKEN_BUDGET}.",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Update every episode publishing directory instead of a single date.",
+    )
+    parser.add_argument(
+        "--since",
+        type=lambda s: datetime.strptime(s, DATE_FORMAT),
+        help=f"Update every episode on or after this date, in {DATE_FORMAT} format.",
+    )
+    parser.add_argument(
+        "--until",
+        type=lambda s: datetime.strptime(s, DATE_FORMAT),
+        help=f"Update every episode on or before this date, in {DATE_FORMAT} format.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"With --all, --since or --until, the maximum number of concurrent model requests. Default is {DEFAULT_CONCURRENCY}.",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=DEFAULT_REQUESTS_PER_MINUTE,
+        help=f"With --all, --since or --until, the maximum model requests per minute. Default is {DEFAULT_REQUESTS_PER_MINUTE}.",
+    )
+    parser.add_argument(
+        "--tpm",
+        type=int,
+        default=DEFAULT_TOKENS_PER_MINUTE,
+        help=f"With --all, --since or --until, the maximum estimated tokens per minute. Default is {DEFAULT_TOKENS_PER_MINUTE}.",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f"With --all, --since or --until, how often to retry a request after a 429 or 5xx response. Default is {DEFAULT_MAX_RETRIES}.",
+    )
+    parser.add_argument(
+        "--coalesce",
+        action="store_true",
+        help="With --all, --since or --until, describe several episodes per model request.",
+    )
+    parser.add_argument(
+        "--batch-token-budget",
+        type=int,
+        default=DEFAULT_BATCH_TOKEN_BUDGET,
+        help=f"With --coalesce, the most tokens a request may use, including the descriptions. Default is {DEFAULT_BATCH_TOKEN_BUDGET}.",
+    )
     return parser.parse_args()
 
 
@@ -67,96 +209,514 @@ def get_system_prompt() -> str:
         return f.read()
 
 
-def get_user_prompt(podcast_directory_info: str) -> str:
+def get_user_prompt_template() -> str:
     """
-    Load the user prompt from update_file_attrs_user_prompt.md
+    Load the user prompt template from update_file_attrs_user_prompt.md
     """
     script_dir = Path(__file__).parent
     prompt_path = script_dir / "update_file_attrs_user_prompt.md"
     logger.debug(f"Loading user prompt from {get_relative_path(prompt_path)}")
     with prompt_path.open() as f:
-        prompt = f.read()
-    return prompt.format(podcast_directory_info=podcast_directory_info)
+        return f.read()
 
 
-def call_openai(
-    podcast_directory_info: str,
-) -> ParsedChatCompletion[PodcastEpisodePublicationData]:
-    load_dotenv()
-    client = OpenAI()
+def get_user_prompt(podcast_directory_info: str) -> str:
+    """
+    Fill in the user prompt template with the directory info.
+    """
+    prompt = get_user_prompt_template()
+    return prompt.format(podcast_directory_info=podcast_directory_info)
+
 
+def get_messages(podcast_directory_info: str) -> list[dict]:
+    """
+    The chat messages asking the model to describe the episode directory.
+    """
     system_prompt = get_system_prompt()
     user_prompt = get_user_prompt(podcast_directory_info)
+    return [
+        {
+            "role": "system",
+            "content": system_prompt,
+        },
+        {
+            "role": "user",
+            "content": user_prompt,
+        },
+    ]
+
+
+def get_batch_system_prompt() -> str:
+    """
+    Load the system prompt for several episodes from update_file_attrs_batch_system_prompt.md
+    """
+    script_dir = Path(__file__).parent
+    prompt_path = script_dir / "update_file_attrs_batch_system_prompt.md"
+    logger.debug(f"Loading system prompt from {get_relative_path(prompt_path)}")
+    with prompt_path.open() as f:
+        return f.read()
+
+
+def get_batch_user_prompt_template() -> str:
+    """
+    Load the user prompt template for several episodes from update_file_attrs_batch_user_prompt.md
+    """
+    script_dir = Path(__file__).parent
+    prompt_path = script_dir / "update_file_attrs_batch_user_prompt.md"
+    logger.debug(f"Loading user prompt from {get_relative_path(prompt_path)}")
+    with prompt_path.open() as f:
+        return f.read()
+
+
+def format_dated_directory_info(episode_date: str, podcast_directory_info: str) -> str:
+    """
+    One episode's directory info in a batch prompt, labelled with its date.
+    """
+    return (
+        f'<PODCAST_DIRECTORY_INFO episode_date="{episode_date}">\n'
+        f"{podcast_directory_info}\n"
+        f"</PODCAST_DIRECTORY_INFO>"
+    )
+
+
+def get_batch_messages(dated_directory_infos: list[str]) -> list[dict]:
+    """
+    The chat messages asking the model to describe several episode
+    directories, each formatted with format_dated_directory_info.
+    """
+    user_prompt = get_batch_user_prompt_template().format(
+        podcast_directories_info="\n".join(dated_directory_infos)
+    )
+    return [
+        {
+            "role": "system",
+            "content": get_batch_system_prompt(),
+        },
+        {
+            "role": "user",
+            "content": user_prompt,
+        },
+    ]
 
+
+def call_openai(
+    podcast_directory_info: str,
+) -> ParsedChatCompletion[EpisodeDescription]:
     logger.debug("Calling OpenAI ...")
-    podcast_episode_publication_data: PodcastEpisodePublicationData = (
-        client.beta.chat.completions.parse(
-            messages=[
+    return parse_completion(
+        get_messages(podcast_directory_info),
+        OPENAI_MODEL,
+        EpisodeDescription,
+        name=TELEMETRY_NAME,
+    )
+
+
+def is_relevant_file_name(file_name: str) -> bool:
+    """
+    False for files that say nothing about the episode, such as episode.yml
+    itself, dotfiles (the manifest, partial transfers), Python files and
+    waveform peaks files.
+    """
+    return not (
+        file_name.startswith(".")
+        or file_name in IGNORED_FILE_NAMES
+        or file_name.endswith(IGNORED_FILE_SUFFIXES)
+    )
+
+
+def get_episode_dir_ai_info(pathlib_dir_obj: Path) -> dict:
+    """
+    Get directory information similar to `ls -la`.
+    Returns a dictionary with directory name, and for each relevant file, a
+    file name, the size of the file and the last modified date in a standard
+    ISO time format, sorted by file name. Each file is stat'ed once.
+    """
+    files = []
+    with os.scandir(pathlib_dir_obj) as entries:
+        for entry in entries:
+            if not entry.is_file() or not is_relevant_file_name(entry.name):
+                continue
+            stat = entry.stat()
+            files.append(
                 {
-                    "role": "system",
-                    "content": system_prompt,
-                },
+                    "file_name": entry.name,
+                    "size": stat.st_size,
+                    "last_modified": datetime.fromtimestamp(stat.st_mtime).isoformat(
+                        timespec="seconds"
+                    ),
+                }
+            )
+    files.sort(key=lambda file_info: file_info["file_name"])
+    return {"directory_name": pathlib_dir_obj.name, "files": files}
+
+
+def file_info_priority(file_info: dict) -> int:
+    """
+    Episode files (audio, patches, MIDI) sort before any other file, so they
+    are the last to be left out of a listing that exceeds its token budget.
+    """
+    return 0 if file_info["file_name"].endswith(tuple(FILE_SUFFIXES_TO_SYNC)) else 1
+
+
+def summarize_omitted_files(omitted: list[dict]) -> dict:
+    """
+    Summarizes the files left out of a listing by count, size and suffix.
+    """
+    suffixes: dict[str, int] = {}
+    for file_info in omitted:
+        suffix = Path(file_info["file_name"]).suffix or file_info["file_name"]
+        suffixes[suffix] = suffixes.get(suffix, 0) + 1
+    return {
+        "count": len(omitted),
+        "size": sum(file_info["size"] for file_info in omitted),
+        "suffixes": suffixes,
+    }
+
+
+def serialize_episode_dir_ai_info(
+    dir_info: dict, token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET
+) -> str:
+    """
+    Serialize the directory information to compact tabular JSON: one row of
+    FILE_INFO_COLUMNS per file. If the listing exceeds token_budget, the
+    rows that do not fit are replaced by a summary of the omitted files,
+    leaving out episode files last.
+    """
+    file_infos = sorted(dir_info["files"], key=file_info_priority)
+    rows = [
+        [file_info[column] for column in FILE_INFO_COLUMNS] for file_info in file_infos
+    ]
+    listing = {
+        "directory_name": dir_info["directory_name"],
+        "columns": FILE_INFO_COLUMNS,
+        "files": rows,
+    }
+    serialized = json.dumps(listing, separators=(",", ":"))
+    if estimate_tokens(serialized) > token_budget:
+        # reserve room for the summary, then keep the rows that fit
+        available_chars = token_budget_chars(token_budget) - len(
+            json.dumps(
                 {
-                    "role": "user",
-                    "content": user_prompt,
+                    **listing,
+                    "files": [],
+                    "omitted_files": summarize_omitted_files(file_infos),
                 },
-            ],
-            model="gpt-4o-mini",
-            response_format=PodcastEpisodePublicationData,
+                separators=(",", ":"),
+            )
+        )
+        kept = 0
+        for row in rows:
+            available_chars -= len(json.dumps(row, separators=(",", ":"))) + 1
+            if available_chars < 0:
+                break
+            kept += 1
+        listing["files"] = rows[:kept]
+        listing["omitted_files"] = summarize_omitted_files(file_infos[kept:])
+        serialized = json.dumps(listing, separators=(",", ":"))
+        logger.info(
+            f"Left {len(rows) - kept} of {len(rows)} files out of the listing "
+            f"to fit the {token_budget} token budget."
         )
+    logger.debug(
+        f"Directory listing is ~{estimate_tokens(serialized)} tokens: {serialized}"
     )
-    # podcast_ep_info = podcast_episode_publication_data.choices[0].message.model_dump()['parsed']
-    return podcast_episode_publication_data
+    return serialized
 
 
-def get_episode_dir_ai_info(pathlib_dir_obj: Path) -> dict:
+def strip_volatile_file_info(dir_info: dict) -> dict:
     """
-    Get directory information similar to `ls -la`.
-    Returns a dictionary with directory name, and for each file, a file name,
-    the size of the file, the created and last modified date in a standard ISO time format.
-    """
-    dir_info = {"directory_name": pathlib_dir_obj.name, "files": []}
-    for file in pathlib_dir_obj.iterdir():
-        if file.is_file():
-            file_info = {
-                "file_name": file.name,
-                "size": file.stat().st_size,
-                "created": datetime.fromtimestamp(file.stat().st_ctime).isoformat(),
-                "last_modified": datetime.fromtimestamp(
-                    file.stat().st_mtime
-                ).isoformat(),
+    Returns a copy of dir_info without the timestamps, which change on every
+    checkout or copy without changing what the model would infer.
+    """
+    return {
+        **dir_info,
+        "files": [
+            {
+                key: value
+                for key, value in file_info.items()
+                if key not in VOLATILE_FILE_INFO_FIELDS
             }
-            dir_info["files"].append(file_info)
-    return dir_info
+            for file_info in dir_info["files"]
+        ],
+    }
 
 
-def serialize_episode_dir_ai_info(dir_info: dict) -> str:
+def make_file_attrs_cache_key(
+    dir_info: dict, token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET
+) -> str:
+    """
+    The response cache key for dir_info: covers everything that determines
+    the model's response.
+    """
+    return make_cache_key(
+        strip_volatile_file_info(dir_info),
+        token_budget,
+        get_system_prompt(),
+        get_user_prompt_template(),
+        OPENAI_MODEL,
+        EpisodeDescription.model_json_schema(),
+    )
+
+
+def get_cached_description(dir_info: dict, args) -> str | None:
+    """
+    Returns the cached description for dir_info, or None if there is none
+    or the cache is bypassed with --no-cache or --refresh.
+    """
+    if args.no_cache or args.refresh:
+        return None
+    cached = ResponseCache().get(
+        make_file_attrs_cache_key(dir_info, args.prompt_token_budget),
+        EpisodeDescription,
+    )
+    if cached is None:
+        return None
+    record_telemetry(
+        CallTelemetry(name=TELEMETRY_NAME, model=OPENAI_MODEL, cache_hit=True)
+    )
+    logger.info("Using cached description; use --refresh to call the model.")
+    return cached.description
+
+
+def cache_description(dir_info: dict, args, episode_description: EpisodeDescription):
     """
-    Serialize the directory information to a string.
+    Stores the model's description for dir_info unless --no-cache is set.
     """
-    serialized_episode_directory_info = json.dumps(dir_info, indent=4)
-    logger.debug(f"{serialized_episode_directory_info=}")
-    return serialized_episode_directory_info
+    if not args.no_cache:
+        ResponseCache().put(
+            make_file_attrs_cache_key(dir_info, args.prompt_token_budget),
+            episode_description,
+        )
+
 
+def infer_episode_description(dir_info: dict, args) -> str:
+    """
+    Returns the episode description written by the model for dir_info,
+    from the response cache if possible and otherwise by calling the model.
+    Raises DescriptionRefusedError if the model refuses.
+    """
+    cached_description = get_cached_description(dir_info, args)
+    if cached_description is not None:
+        return cached_description
 
-def update_file_attrs(episode_dir, args):
+    serialized_dir_info = serialize_episode_dir_ai_info(
+        dir_info, args.prompt_token_budget
+    )
+    completion: ParsedChatCompletion[EpisodeDescription] = call_openai(
+        serialized_dir_info
+    )
+    message = completion.choices[0].message
+    if message.parsed is None:
+        raise DescriptionRefusedError(
+            f"The model did not return a description: {message.refusal}"
+        )
+    cache_description(dir_info, args, message.parsed)
+    return message.parsed.description
+
+
+def load_existing_episode_data(episode_dir: Path) -> dict:
+    """
+    Returns the data currently in the episode's episode.yml, if any.
+    """
+    yaml_path = episode_dir / EPISODE_YAML_FILENAME
+    if not yaml_path.exists():
+        return {}
+    return read_episode_yaml(yaml_path)
+
+
+def infer_local_episode_data(
+    episode_dir: Path, episode_date: datetime
+) -> tuple[dict, dict]:
+    """
+    Infers the file attributes locally, keeping the existing description.
+    Returns the episode data without a description if there is none yet,
+    and the directory info to ask the model for one.
+    """
+    existing = load_existing_episode_data(episode_dir)
     dir_info = get_episode_dir_ai_info(episode_dir)
-    serialized_dir_info = serialize_episode_dir_ai_info(dir_info)
-    podcast_episode_publication_data: ParsedChatCompletion[
-        PodcastEpisodePublicationData
-    ] = call_openai(serialized_dir_info)
-    write_episode_yaml(podcast_episode_publication_data, episode_dir, args)
+    file_names = [file_info["file_name"] for file_info in dir_info["files"]]
+    episode_data = infer_file_attrs(file_names, episode_date, existing)
+    logger.debug(f"Inferred file attributes: {episode_data}")
+    if existing.get("description"):
+        episode_data["description"] = existing["description"]
+    return episode_data, dir_info
+
+
+def build_episode_publication_data(
+    episode_dir: Path, episode_date: datetime, args
+) -> PodcastEpisodePublicationData:
+    """
+    Infers the file attributes locally and fills in the description: the
+    existing one is kept, and otherwise the model writes one unless
+    args.offline is set.
+    """
+    episode_data, dir_info = infer_local_episode_data(episode_dir, episode_date)
+    if "description" not in episode_data:
+        episode_data["description"] = (
+            "" if args.offline else infer_episode_description(dir_info, args)
+        )
+    return PodcastEpisodePublicationData(**episode_data)
+
+
+def episode_files_fingerprint(manifest: Manifest) -> str:
+    """
+    Refreshes the episode directory's manifest and returns a fingerprint of
+    every file that the episode.yml attributes are inferred from, and of
+    FILE_ATTRS_VERSION.
+    """
+    manifest.refresh()
+    files_fingerprint = manifest.fingerprint(exclude=(EPISODE_YAML_FILENAME,))
+    return f"{FILE_ATTRS_VERSION}:{files_fingerprint}"
+
+
+def is_up_to_date(manifest: Manifest, fingerprint: str, args) -> bool:
+    """
+    True if no file and not FILE_ATTRS_VERSION changed since the file
+    attributes were last updated, and neither --recreate nor --refresh asks
+    to update them anyway.
+    """
+    return (
+        not args.recreate
+        and not args.refresh
+        and manifest.stamps.get(MANIFEST_STAMP) == fingerprint
+    )
+
+
+def description_was_skipped(
+    podcast_episode_publication_data: PodcastEpisodePublicationData, args
+) -> bool:
+    """
+    True if the episode has no description because --offline kept the model
+    from writing one, so a later online run still has to update it.
+    """
+    return args.offline and not podcast_episode_publication_data.description
+
+
+def finish_update(
+    podcast_episode_publication_data: PodcastEpisodePublicationData,
+    episode_dir: Path,
+    manifest: Manifest,
+    fingerprint: str,
+    args,
+):
+    """
+    Writes episode.yml and stamps the manifest with the fingerprint of the
+    files it was inferred from. An episode whose description was skipped
+    offline is left unstamped, so it is not up to date for the next run.
+    """
+    write_episode_yaml(podcast_episode_publication_data, episode_dir, manifest, args)
+    manifest.refresh()
+    if description_was_skipped(podcast_episode_publication_data, args):
+        manifest.unstamp(MANIFEST_STAMP)
+    else:
+        manifest.stamp(MANIFEST_STAMP, fingerprint)
+    manifest.save()
+
+
+def update_file_attrs(episode_dir, episode_date, args):
+    manifest = Manifest.load(episode_dir)
+    fingerprint = episode_files_fingerprint(manifest)
+    if is_up_to_date(manifest, fingerprint, args):
+        logger.info(
+            "No files changed since the file attributes were last updated; "
+            "use --recreate to update them anyway."
+        )
+        return
+
+    podcast_episode_publication_data = build_episode_publication_data(
+        episode_dir, episode_date, args
+    )
+    finish_update(
+        podcast_episode_publication_data, episode_dir, manifest, fingerprint, args
+    )
+
+
+def read_episode_audio_info(
+    episode_dir: Path, audio_file: str
+) -> EpisodeAudioInfo | None:
+    """
+    Reads the stream parameters of the episode's audio file from its headers.
+    Returns None if there is no audio file or it is not a readable MP3.
+    """
+    if not audio_file:
+        return None
+    audio_path = episode_dir / audio_file
+    try:
+        mp3_info = read_mp3_info(audio_path)
+    except FileNotFoundError:
+        return None
+    except Mp3FormatError as e:
+        logger.warning(f"Could not read {get_relative_path(audio_path)}: {e}")
+        return None
+    return EpisodeAudioInfo(**mp3_info._asdict())
+
+
+def read_episode_midi_info(
+    episode_dir: Path, midi_files: list[str]
+) -> dict[str, EpisodeMidiInfo]:
+    """
+    Reads every MIDI file of the episode in one pass over a thread pool.
+    Returns the info of each readable file by file name.
+    """
+    midi_infos = read_midi_infos([episode_dir / midi_file for midi_file in midi_files])
+    episode_midi_info = {}
+    for path, midi_info in midi_infos.items():
+        if isinstance(midi_info, FileNotFoundError):
+            continue
+        if isinstance(midi_info, Exception):
+            logger.warning(f"Could not read {get_relative_path(path)}: {midi_info}")
+            continue
+        episode_midi_info[path.name] = EpisodeMidiInfo(
+            **{
+                **midi_info._asdict(),
+                "tempo_map": [change._asdict() for change in midi_info.tempo_map],
+                "time_signatures": [
+                    change._asdict() for change in midi_info.time_signatures
+                ],
+            }
+        )
+    return episode_midi_info
+
+
+def read_episode_patch_info(
+    episode_dir: Path,
+    patch_files: list[str],
+    manifest: Manifest,
+    cache: MfpzInfoCache | None = None,
+) -> dict[str, EpisodePatchInfo]:
+    """
+    Reads the header information of every MicroFreak patch of the episode,
+    from the cache when the manifest's digest of the patch is known to it.
+    Returns the info of each readable patch by file name.
+    """
+    cache = cache or MfpzInfoCache()
+    episode_patch_info = {}
+    for patch_file in patch_files:
+        if not patch_file.lower().endswith(MICROFREAK_PATCH_FILE_EXTENSION):
+            continue
+        patch_path = episode_dir / patch_file
+        try:
+            mfpz_info = cache.read(patch_path, manifest.digest(patch_file))
+        except FileNotFoundError:
+            continue
+        except (OSError, MfpzFormatError) as e:
+            logger.warning(f"Could not read {get_relative_path(patch_path)}: {e}")
+            continue
+        episode_patch_info[patch_file] = EpisodePatchInfo(**mfpz_info._asdict())
+    return episode_patch_info
 
 
 def write_episode_yaml(
-    podcast_episode_publication_data: ParsedChatCompletion[
-        PodcastEpisodePublicationData
-    ],
+    podcast_episode_publication_data: PodcastEpisodePublicationData,
     episode_dir: Path,
+    manifest: Manifest,
     args,
 ):
     """
-    Write the episode data to the episode.yml file.
+    Merge the episode data and the audio, MIDI and patch info into the
+    episode.yml file, keeping any fields written by other stages.
+    The info fields are always written, as None or {} when nothing could be
+    read, so the info of a removed or unreadable file does not linger.
     If args.reference is True, write to the reference episode directory.
     """
     if args.reference:
@@ -164,40 +724,82 @@ def write_episode_yaml(
     else:
         yaml_path = episode_dir / EPISODE_YAML_FILENAME
 
-    with yaml_path.open("w") as f:
-        pydantic_serialized_to_yaml_string = serialize_pydantic_to_yaml(
-            podcast_episode_publication_data
-        )
-        f.write(pydantic_serialized_to_yaml_string)
-
-    logger.debug(f"Written episode data to {get_relative_path(yaml_path)}")
+    episode_dict = podcast_episode_publication_data.model_dump()
+    logger.debug(
+        f"podcast_episode_publication_data: {json.dumps(episode_dict, indent=4)}"
+    )
+    audio_info = read_episode_audio_info(
+        episode_dir, podcast_episode_publication_data.audio_file
+    )
+    logger.debug(f"Audio info: {audio_info}")
+    episode_dict["audio_info"] = audio_info and audio_info.model_dump()
+    midi_info = read_episode_midi_info(
+        episode_dir, podcast_episode_publication_data.midi_files
+    )
+    episode_dict["midi_info"] = {
+        midi_file: info.model_dump() for midi_file, info in midi_info.items()
+    }
+    patch_info = read_episode_patch_info(
+        episode_dir, podcast_episode_publication_data.patch_files, manifest
+    )
+    episode_dict["patch_info"] = {
+        patch_file: info.model_dump() for patch_file, info in patch_info.items()
+    }
+    if update_episode_yaml(yaml_path, episode_dict):
+        logger.debug(f"Written episode data to {get_relative_path(yaml_path)}")
+    else:
+        logger.debug(f"{get_relative_path(yaml_path)} is already up to date")
 
 
 def serialize_pydantic_to_yaml(
-    podcast_episode_publication_data: ParsedChatCompletion[
-        PodcastEpisodePublicationData
-    ],
+    podcast_episode_publication_data: PodcastEpisodePublicationData,
 ) -> str:
     """
     Serialize the PodcastEpisodePublicationData to a YAML string.
     """
-    data_dict = podcast_episode_publication_data.model_dump()
-    data_dict_str = json.dumps(data_dict, indent=4)
+    episode_dict = podcast_episode_publication_data.model_dump()
+    data_dict_str = json.dumps(episode_dict, indent=4)
     logger.debug(f"podcast_episode_publication_data: {data_dict_str}")
 
-    parsed_response_json = podcast_episode_publication_data.choices[0].message.content
-    episode_dict = json.loads(parsed_response_json)
-    yaml_string = yaml.dump(episode_dict, sort_keys=True, default_flow_style=False)
-    return yaml_string
+    return serialize_yaml(episode_dict)
+
+
+def main_backfill(args):
+    """
+    Updates every episode selected by --all, --since and --until.
+    """
+    # imported here because backfill_file_attrs builds on the functions in this module
+    from gitp_acolyte.ceremonial.spells.episode_data.update.file_attrs.backfill_file_attrs import (
+        run_backfill,
+        select_episode_publishing_dirs,
+    )
+
+    if args.reference:
+        logger.error("--reference cannot be combined with --all, --since or --until.")
+        sys.exit(1)
+    episode_publishing_dirs = select_episode_publishing_dirs(args.since, args.until)
+    if not episode_publishing_dirs:
+        logger.warning("No episode publishing directories found.")
+        return
+    results = asyncio.run(run_backfill(episode_publishing_dirs, args))
+    if any(result.error for result in results):
+        sys.exit(1)
 
 
 def main():
     args = get_args()
+    if args.all or args.since or args.until:
+        main_backfill(args)
+        return
     episode_date = get_episode_date(args)
     logger.debug(f"Episode date: {episode_date}")
     episode_dir, _ = ensure_episode_dir_and_yaml_exists(episode_date, args)
     logger.debug(f"Episode directory: {get_relative_path(episode_dir)}")
-    update_file_attrs(episode_dir, args)
+    try:
+        update_file_attrs(episode_dir, episode_date, args)
+    except DescriptionRefusedError as e:
+        logger.error(e)
+        sys.exit(1)
     logger.info("File attributes updated successfully.")
 
 
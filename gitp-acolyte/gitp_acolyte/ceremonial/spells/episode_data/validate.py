@@ -0,0 +1,253 @@
+"""
+validate.py
+
+Validates every episode.yml under LOGSEQ_ASSETS_FOLDER/Ceremony:
+- it parses and matches PodcastEpisodePublicationData
+- its episode_date matches the Ceremony/YYYY/MM/DD directory it is in
+- its audio_file, patch_files and midi_files exist next to it
+
+Episodes are checked in a process pool and the result is written as a JSON
+report, so that CI can catch a bad episode.yml before create_episode_page
+stops on it.
+
+Usage:
+    validate.py - print the report and exit with status 1 if any episode is invalid.
+    validate.py --output <path> - write the report to a file instead.
+    validate.py --ignore-missing-audio - do not report missing audio files.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+import coloredlogs
+import yaml
+from pydantic import ValidationError
+
+from gitp_acolyte.ceremonial.spells.episode_data.create import (
+    find_episode_publishing_dirs,
+)
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    read_episode_yaml,
+    validate_episode_data,
+)
+from gitp_acolyte.constants import (
+    DATE_FORMAT,
+    EPISODE_YAML_FILENAME,
+    LOGSEQ_ASSETS_FOLDER,
+    get_relative_path,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+# episodes sent to a worker process at a time
+VALIDATION_CHUNK_SIZE = 32
+
+
+@dataclass
+class EpisodeProblem:
+    """
+    One thing wrong with an episode.yml. check is one of "yaml", "schema",
+    "date" or "missing_file".
+    """
+
+    check: str
+    message: str
+    field: str | None = None
+
+
+@dataclass
+class EpisodeValidation:
+    episode_date: str
+    path: str
+    problems: list[EpisodeProblem] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return not self.problems
+
+
+def check_referenced_files(
+    episode_dir: Path, data: dict, ignore_missing_audio: bool
+) -> list[EpisodeProblem]:
+    """
+    Reports every audio, patch and MIDI file named in data that is not in
+    episode_dir. Fields of the wrong type are left to the schema check.
+    """
+    names = {path.name for path in episode_dir.iterdir()}
+    problems = []
+    referenced = [("audio_file", data.get("audio_file"))]
+    for field_name in ("patch_files", "midi_files"):
+        file_names = data.get(field_name)
+        if isinstance(file_names, list):
+            referenced += [(field_name, name) for name in file_names]
+    for field_name, file_name in referenced:
+        if field_name == "audio_file" and ignore_missing_audio:
+            continue
+        if not file_name:
+            problems.append(
+                EpisodeProblem(
+                    "missing_file", f"{field_name} entry is empty", field_name
+                )
+            )
+        elif not isinstance(file_name, str):
+            continue
+        elif file_name not in names:
+            problems.append(
+                EpisodeProblem("missing_file", f"{file_name} not found", field_name)
+            )
+    return problems
+
+
+def validate_episode_dir(
+    episode_date: datetime, episode_dir: Path, ignore_missing_audio: bool = False
+) -> EpisodeValidation:
+    """
+    Validates the episode.yml in one episode publishing directory.
+    """
+    yaml_path = episode_dir / EPISODE_YAML_FILENAME
+    result = EpisodeValidation(episode_date.strftime(DATE_FORMAT), str(yaml_path))
+    try:
+        data = read_episode_yaml(yaml_path)
+    except FileNotFoundError:
+        result.problems.append(EpisodeProblem("yaml", "episode.yml is missing"))
+        return result
+    except yaml.YAMLError as e:
+        result.problems.append(EpisodeProblem("yaml", str(e)))
+        return result
+    except UnicodeDecodeError as e:
+        result.problems.append(
+            EpisodeProblem("yaml", f"episode.yml is not valid UTF-8: {e}")
+        )
+        return result
+
+    try:
+        validate_episode_data(data)
+    except ValidationError as e:
+        for error in e.errors():
+            result.problems.append(
+                EpisodeProblem(
+                    "schema",
+                    error["msg"],
+                    ".".join(str(part) for part in error["loc"]),
+                )
+            )
+
+    if data.get("episode_date") != result.episode_date:
+        result.problems.append(
+            EpisodeProblem(
+                "date",
+                f"episode_date {data.get('episode_date')!r} does not match "
+                f"the directory date {result.episode_date}",
+                "episode_date",
+            )
+        )
+    result.problems += check_referenced_files(episode_dir, data, ignore_missing_audio)
+    return result
+
+
+def _validate_episode_dir(
+    episode: tuple[datetime, Path], ignore_missing_audio: bool
+) -> EpisodeValidation:
+    return validate_episode_dir(*episode, ignore_missing_audio)
+
+
+def validate_episodes(
+    episode_publishing_dirs: list[tuple[datetime, Path]],
+    ignore_missing_audio: bool = False,
+    processes: int | None = None,
+) -> list[EpisodeValidation]:
+    """
+    Validates each episode publishing directory in a process pool.
+    Returns the results in the order given.
+    """
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(
+            executor.map(
+                partial(
+                    _validate_episode_dir, ignore_missing_audio=ignore_missing_audio
+                ),
+                episode_publishing_dirs,
+                chunksize=VALIDATION_CHUNK_SIZE,
+            )
+        )
+
+
+def build_report(results: list[EpisodeValidation], seconds: float) -> dict:
+    """
+    The JSON report: totals, and the problems of every invalid episode.
+    """
+    invalid = [result for result in results if not result.valid]
+    return {
+        "checked": len(results),
+        "invalid": len(invalid),
+        "seconds": round(seconds, 3),
+        "episodes": [asdict(result) for result in invalid],
+    }
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description="Validate every episode.yml in the garden."
+    )
+    parser.add_argument(
+        "--assets-dir",
+        type=Path,
+        default=LOGSEQ_ASSETS_FOLDER,
+        help=f"The garden assets directory. Default is {get_relative_path(LOGSEQ_ASSETS_FOLDER)}.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Write the JSON report to this file instead of standard output.",
+    )
+    parser.add_argument(
+        "--ignore-missing-audio",
+        action="store_true",
+        help="Do not report episodes whose audio file is missing or empty.",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help="Number of worker processes. Default is the number of CPUs.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    start = time.perf_counter()
+    results = validate_episodes(
+        find_episode_publishing_dirs(args.assets_dir),
+        args.ignore_missing_audio,
+        args.processes,
+    )
+    report = build_report(results, time.perf_counter() - start)
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(report_json + "\n")
+    else:
+        print(report_json)
+    logger.info(
+        f"{report['invalid']} of {report['checked']} episode(s) invalid "
+        f"in {report['seconds']}s"
+    )
+    if report["invalid"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+aggregate_pages.py
+
+Generates the garden pages that list episodes:
+- Ceremony: the years with episodes, and the latest episode
+- Ceremony/YYYY: the months of the year and their episodes
+- Ceremony/YYYY/MM: the episodes of the month
+- Ghost in the Patch: the latest episode
+- contents: the sidebar links to the latest episode and the years
+
+Each generated part of a page is a top-level block with a
+"generated:: <section>" property, so the rest of the page can be edited by
+hand. A section is replaced only when its content changed, and a page is
+only written when one of its sections changed, so adding an episode touches
+its month and year pages, and the latest episode blocks, but no other page.
+
+The episodes are read from the episode catalog, which only parses the
+episode.yml files that changed since the last run.
+
+Usage:
+    aggregate_pages.py - update the aggregate pages.
+"""
+
+import argparse
+import logging
+from datetime import datetime
+from itertools import groupby
+from pathlib import Path
+from typing import NamedTuple
+
+import coloredlogs
+
+from gitp_acolyte.ceremonial.spells.episode_data.catalog import (
+    EPISODE_CATALOG_PATH,
+    CatalogEpisode,
+    open_catalog,
+)
+from gitp_acolyte.constants import (
+    LOGSEQ_ASSETS_FOLDER,
+    LOGSEQ_PAGES_FOLDER,
+    get_relative_path,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+SECTION_PROPERTY = "generated"
+CEREMONY_PAGE = "Ceremony"
+HOME_PAGE = "Ghost in the Patch"
+CONTENTS_PAGE = "contents"
+LATEST_EPISODE_SECTION = "latest-episode"
+YEARS_SECTION = "ceremony-years"
+MONTHS_SECTION = "ceremony-months"
+EPISODES_SECTION = "ceremony-episodes"
+CONTENTS_SECTION = "contents-ceremonies"
+NEW_PAGE_HEADER = "public:: true\n\n"
+
+
+class Section(NamedTuple):
+    name: str
+    lines: list[str]
+
+
+class AggregateSummary(NamedTuple):
+    written: int
+    unchanged: int
+
+
+def page_file_name(page_name: str) -> str:
+    """
+    The file name Logseq stores a page in; namespaces are separated by ___.
+    """
+    return page_name.replace("/", "___") + ".md"
+
+
+def year_page_name(date: datetime) -> str:
+    return f"{CEREMONY_PAGE}/{date:%Y}"
+
+
+def month_page_name(date: datetime) -> str:
+    return f"{CEREMONY_PAGE}/{date:%Y/%m}"
+
+
+def episode_link(episode: CatalogEpisode) -> str:
+    return (
+        f"[[{CEREMONY_PAGE}/{episode.episode_date:%Y/%m/%d}]] {episode.episode_title}"
+    )
+
+
+def section_block(name: str, heading: str, items: list[tuple[int, str]]) -> Section:
+    """
+    A top-level block with the heading, marked as the generated section name,
+    and a child block for each (depth, text) item.
+    """
+    lines = [f"- {heading}", f"  {SECTION_PROPERTY}:: {name}"]
+    lines += ["\t" * depth + f"- {text}" for depth, text in items]
+    return Section(name, lines)
+
+
+def latest_episode_section(episodes: list[CatalogEpisode]) -> Section:
+    latest = episodes[-1]
+    items = [(1, episode_link(latest))]
+    if latest.description:
+        items.append((2, " ".join(latest.description.split())))
+    return section_block(LATEST_EPISODE_SECTION, "## Latest ceremony", items)
+
+
+def build_sections(episodes: list[CatalogEpisode]) -> dict[str, list[Section]]:
+    """
+    Returns the generated sections of each aggregate page by page name, for
+    episodes in date order.
+    """
+    if not episodes:
+        return {}
+    latest = latest_episode_section(episodes)
+    by_year = [
+        (year, list(year_episodes))
+        for year, year_episodes in groupby(episodes, lambda e: e.episode_date.year)
+    ]
+    year_pages = [
+        (year_page_name(year_episodes[0].episode_date), len(year_episodes))
+        for year, year_episodes in reversed(by_year)
+    ]
+    pages = {
+        CEREMONY_PAGE: [
+            section_block(
+                YEARS_SECTION,
+                "## Ceremonies by year",
+                [(1, f"[[{page}]] ({count})") for page, count in year_pages],
+            ),
+            latest,
+        ],
+        HOME_PAGE: [latest],
+        CONTENTS_PAGE: [
+            section_block(
+                CONTENTS_SECTION,
+                f"[[{CEREMONY_PAGE}]]",
+                [(1, f"Latest: {episode_link(episodes[-1])}")]
+                + [(1, f"[[{page}]]") for page, _ in year_pages],
+            )
+        ],
+    }
+    for year, year_episodes in by_year:
+        items = []
+        for month, month_episodes in groupby(
+            year_episodes, lambda e: e.episode_date.month
+        ):
+            month_episodes = list(month_episodes)
+            month_page = month_page_name(month_episodes[0].episode_date)
+            items.append((1, f"[[{month_page}]]"))
+            items += [(2, episode_link(episode)) for episode in month_episodes]
+            pages[month_page] = [
+                section_block(
+                    EPISODES_SECTION,
+                    f"## Ceremonies in {month_episodes[0].episode_date:%B %Y}",
+                    [(1, episode_link(episode)) for episode in month_episodes],
+                )
+            ]
+        pages[year_page_name(year_episodes[0].episode_date)] = [
+            section_block(MONTHS_SECTION, f"## Ceremonies in {year}", items)
+        ]
+    return pages
+
+
+def find_section(lines: list[str], name: str) -> tuple[int, int] | None:
+    """
+    Returns the [start, end) line range of the top-level block marked as the
+    generated section name, if there is one.
+    """
+    marker = f"{SECTION_PROPERTY}:: {name}"
+    for start, line in enumerate(lines):
+        if not line.startswith("- "):
+            continue
+        end = start + 1
+        is_section = False
+        while end < len(lines) and lines[end][:1] in ("\t", " "):
+            is_section = is_section or lines[end].strip() == marker
+            end += 1
+        if is_section:
+            return start, end
+    return None
+
+
+def replace_section(text: str, section: Section) -> str:
+    """
+    Replaces the generated section in the page text, or appends it.
+    """
+    lines = text.splitlines()
+    found = find_section(lines, section.name)
+    if found is None:
+        lines += section.lines
+    else:
+        start, end = found
+        lines[start:end] = section.lines
+    return "\n".join(lines) + ("\n" if text.endswith("\n") or not text else "")
+
+
+def update_page(page_path: Path, sections: list[Section]) -> bool:
+    """
+    Replaces the generated sections of a page, creating it if needed.
+    Returns True if the page was written.
+    """
+    try:
+        current = page_path.read_text()
+    except FileNotFoundError:
+        current = None
+    text = NEW_PAGE_HEADER if current is None else current
+    for section in sections:
+        text = replace_section(text, section)
+    if text == current:
+        return False
+    page_path.write_text(text)
+    logger.info(f"Output written to {get_relative_path(page_path)}")
+    return True
+
+
+def update_aggregate_pages(
+    assets_folder: Path = LOGSEQ_ASSETS_FOLDER,
+    pages_folder: Path = LOGSEQ_PAGES_FOLDER,
+    catalog_path: Path = EPISODE_CATALOG_PATH,
+) -> AggregateSummary:
+    """
+    Updates the generated sections of every aggregate page.
+    """
+    with open_catalog(catalog_path, assets_folder) as catalog:
+        episodes = catalog.episodes()
+    written = unchanged = 0
+    for page_name, sections in build_sections(episodes).items():
+        if update_page(pages_folder / page_file_name(page_name), sections):
+            written += 1
+        else:
+            unchanged += 1
+    summary = AggregateSummary(written, unchanged)
+    logger.info(f"Aggregate pages: {summary}")
+    return summary
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description="Update the garden pages that list episodes."
+    )
+    parser.add_argument(
+        "--assets-dir",
+        type=Path,
+        default=LOGSEQ_ASSETS_FOLDER,
+        help=f"The garden assets directory. Default is {get_relative_path(LOGSEQ_ASSETS_FOLDER)}.",
+    )
+    parser.add_argument(
+        "--pages-dir",
+        type=Path,
+        default=LOGSEQ_PAGES_FOLDER,
+        help=f"The garden pages directory. Default is {get_relative_path(LOGSEQ_PAGES_FOLDER)}.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    update_aggregate_pages(args.assets_dir, args.pages_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
 import argparse
 import logging
-import os
+import sys
 from datetime import datetime
+from pathlib import Path
 
 import coloredlogs
 import yaml
-from jinja2 import Environment, FileSystemLoader
 
 from gitp_acolyte.ceremonial.spells.episode_data.args import (
     define_common_args,
@@ -14,11 +14,18 @@ from gitp_acolyte.ceremonial.spells.episode_data.args import (
 from gitp_acolyte.ceremonial.spells.episode_data.create import (
     path_to_episode_publishing_yml,
 )
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    read_episode_yaml,
+)
 from gitp_acolyte.ceremonial.spells.episode_reference.constants import (
     DEFAULT_REFERENCE_EPISODE_YML_PATH,
     DRAFT_REFERENCE_EPISODE_OUTPUT_PATH,
     REFERENCE_EPISODE_DATE,
 )
+from gitp_acolyte.ceremonial.spells.episode_page.templates import (
+    EPISODE_TEMPLATE_NAME,
+    get_jinja_environment,
+)
 from gitp_acolyte.constants import (
     EPISODE_YAML_FILENAME,
     GITHUB_USER_CONTENT_ASSETS_BASE_URL,
@@ -35,6 +42,12 @@ coloredlogs.install(
 )
 
 
+class EpisodeDataError(ValueError):
+    """
+    Raised when an episode.yml cannot be rendered into a page.
+    """
+
+
 def get_argparse_args():
     parser = argparse.ArgumentParser(description="Generate episode page.")
     define_common_args(parser)  # Use common argparse arguments
@@ -43,6 +56,11 @@ def get_argparse_args():
         action="store_true",
         help="Force overwrite if the episode page already exists.",
     )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Render every episode page whose episode.yml or template changed.",
+    )
     return parser.parse_args()
 
 
@@ -64,30 +82,52 @@ def get_episode_page_path(episode_date):
 def load_episode_yaml_and_ensure_context(episode_yaml_path):
     """
     Loads the episode YAML data from the given path.
+    Raises EpisodeDataError if it cannot be parsed or has no valid
+    episode_date.
     """
-    with open(episode_yaml_path, "r") as f:
-        data = yaml.safe_load(f)
-        # Derive date_created from episode_date to avoid duplication
-        if "episode_date" in data:
-            episode_dt = datetime.strptime(data["episode_date"], "%Y-%m-%d")
-            data["date_created"] = episode_dt.strftime("%Y-%m-%d %a")
-        else:
-            logger.error("episode_date not found in YAML.")
-            exit(1)
+    try:
+        data = read_episode_yaml(Path(episode_yaml_path))
+    except yaml.YAMLError as e:
+        raise EpisodeDataError(f"{episode_yaml_path} is not valid: {e}") from e
+    # Derive date_created from episode_date to avoid duplication
+    if "episode_date" not in data:
+        raise EpisodeDataError(f"episode_date not found in {episode_yaml_path}")
+    try:
+        episode_dt = datetime.strptime(str(data["episode_date"]), "%Y-%m-%d")
+    except ValueError:
+        raise EpisodeDataError(
+            f"episode_date {data['episode_date']!r} in {episode_yaml_path} "
+            "is not in %Y-%m-%d format"
+        ) from None
+    data["date_created"] = episode_dt.strftime("%Y-%m-%d %a")
+
+    # Add assets_base_url to the context
+    data["assets_base_url"] = GITHUB_USER_CONTENT_ASSETS_BASE_URL
+
+    logger.debug(f"Loaded episode YAML for date {episode_dt} from {episode_yaml_path}")
+    logger.debug(f"Episode Data: {data}")
+    return data
 
-        # Add assets_base_url to the context
-        data["assets_base_url"] = GITHUB_USER_CONTENT_ASSETS_BASE_URL
 
-        logger.debug(
-            f"Loaded episode YAML for date {episode_dt} from {episode_yaml_path}"
-        )
-        logger.debug(f"Episode Data: {data}")
-    return data
+def main_render_all(args):
+    """
+    Renders every episode page whose inputs changed since it was last rendered.
+    """
+    # imported here because render_pages builds on the functions in this module
+    from gitp_acolyte.ceremonial.spells.episode_page.render_pages import (
+        render_episode_pages,
+    )
+
+    summary = render_episode_pages(force=args.force)
+    if summary.failed:
+        sys.exit(1)
 
 
 def main():
     args = get_argparse_args()
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if args.all:
+        main_render_all(args)
+        return
 
     if args.reference:
         output_file = DRAFT_REFERENCE_EPISODE_OUTPUT_PATH
@@ -111,11 +151,15 @@ def main():
             exit(1)
 
     # Load episode YAML
-    data = load_episode_yaml_and_ensure_context(episode_yaml_path)
+    try:
+        data = load_episode_yaml_and_ensure_context(episode_yaml_path)
+    except EpisodeDataError as e:
+        logger.error(e)
+        sys.exit(1)
 
     # Setup Jinja environment
-    env = Environment(loader=FileSystemLoader(script_dir))
-    template = env.get_template("episode.jinja")
+    env = get_jinja_environment()
+    template = env.get_template(EPISODE_TEMPLATE_NAME)
     logger.debug("Jinja environment set up and template loaded")
 
     # Render template with data
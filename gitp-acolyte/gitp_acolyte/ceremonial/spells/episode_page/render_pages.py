@@ -0,0 +1,187 @@
+"""
+render_pages.py
+
+Renders every episode page in LOGSEQ_PAGES_FOLDER from its episode.yml with
+one Jinja environment.
+
+Each page's inputs are fingerprinted: the episode.yml digest, the template
+digest and the assets base URL. The fingerprint and the digest of the
+rendered page are kept in EPISODE_PAGES_STATE_PATH, so a page is only
+rendered again when its inputs changed, and only written when the output
+changed. A page edited by hand since it was rendered, or that was never
+rendered by this script and differs from its rendering, is left alone
+unless force is set.
+
+Usage:
+    create_episode_page.py --all - render the episode pages whose inputs changed.
+    create_episode_page.py --all --force - also overwrite pages edited by hand.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+import coloredlogs
+
+from gitp_acolyte.ceremonial.spells.episode_data.create import (
+    find_episode_publishing_dirs,
+)
+from gitp_acolyte.ceremonial.spells.episode_page.create_episode_page import (
+    get_episode_page_filename,
+    EpisodeDataError,
+    load_episode_yaml_and_ensure_context,
+)
+from gitp_acolyte.ceremonial.spells.episode_page.templates import (
+    EPISODE_TEMPLATE_NAME,
+    TEMPLATE_DIR,
+    get_jinja_environment,
+)
+from gitp_acolyte.constants import (
+    CACHE_DIR,
+    EPISODE_YAML_FILENAME,
+    GITHUB_USER_CONTENT_ASSETS_BASE_URL,
+    LOGSEQ_ASSETS_FOLDER,
+    LOGSEQ_PAGES_FOLDER,
+    get_relative_path,
+)
+from gitp_acolyte.utils.hashing import hash_bytes, hash_file
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+EPISODE_PAGES_STATE_PATH = CACHE_DIR / "episode_pages.json"
+EPISODE_PAGES_STATE_VERSION = 1
+
+
+class RenderedPage(NamedTuple):
+    inputs: str
+    output: str
+
+
+class RenderSummary(NamedTuple):
+    rendered: int
+    unchanged: int
+    skipped: int
+    failed: int = 0
+
+
+def load_render_state(state_path: Path) -> dict[str, RenderedPage]:
+    """
+    Returns the fingerprints recorded for each page file name.
+    """
+    try:
+        data = json.loads(state_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if data.get("version") != EPISODE_PAGES_STATE_VERSION:
+        return {}
+    return {name: RenderedPage(*entry) for name, entry in data["pages"].items()}
+
+
+def save_render_state(state_path: Path, state: dict[str, RenderedPage]):
+    """
+    Atomically writes the fingerprints recorded for each page file name.
+    """
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": EPISODE_PAGES_STATE_VERSION,
+        "pages": {name: list(entry) for name, entry in sorted(state.items())},
+    }
+    fd, tmp_name = tempfile.mkstemp(
+        dir=state_path.parent, prefix=f"{state_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=1)
+            f.write("\n")
+        os.replace(tmp_name, state_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def page_inputs_fingerprint(yaml_path: Path, template_digest: str) -> str:
+    """
+    The fingerprint of everything a page is rendered from.
+    """
+    return hash_bytes(
+        json.dumps(
+            [hash_file(yaml_path), template_digest, GITHUB_USER_CONTENT_ASSETS_BASE_URL]
+        ).encode()
+    )
+
+
+def render_episode_pages(
+    assets_folder: Path = LOGSEQ_ASSETS_FOLDER,
+    pages_folder: Path = LOGSEQ_PAGES_FOLDER,
+    state_path: Path = EPISODE_PAGES_STATE_PATH,
+    force: bool = False,
+) -> RenderSummary:
+    """
+    Renders the page of every episode with an episode.yml whose inputs
+    changed since it was last rendered, and writes the pages whose content
+    changed. An episode whose episode.yml cannot be rendered is logged and
+    counted as failed, and the others are still rendered.
+    """
+    env = get_jinja_environment()
+    template = env.get_template(EPISODE_TEMPLATE_NAME)
+    template_digest = hash_file(TEMPLATE_DIR / EPISODE_TEMPLATE_NAME)
+    state = load_render_state(state_path)
+    recorded_state = dict(state)
+    rendered = unchanged = skipped = failed = 0
+
+    for episode_date, episode_dir in find_episode_publishing_dirs(assets_folder):
+        yaml_path = episode_dir / EPISODE_YAML_FILENAME
+        if not yaml_path.exists():
+            continue
+        page_name = get_episode_page_filename(episode_date)
+        page_path = pages_folder / page_name
+        inputs = page_inputs_fingerprint(yaml_path, template_digest)
+        recorded = state.get(page_name)
+        if recorded and recorded.inputs == inputs and page_path.exists():
+            unchanged += 1
+            continue
+
+        try:
+            current = page_path.read_bytes()
+        except FileNotFoundError:
+            current = None
+        try:
+            data = load_episode_yaml_and_ensure_context(yaml_path)
+        except EpisodeDataError as e:
+            logger.error(f"Not rendering {get_relative_path(page_path)}: {e}")
+            failed += 1
+            continue
+        output = template.render(**data).encode()
+        if current == output:
+            unchanged += 1
+        elif (
+            current is not None
+            and not force
+            and (recorded is None or hash_bytes(current) != recorded.output)
+        ):
+            logger.warning(
+                f"Skipping {get_relative_path(page_path)}: it was edited since it "
+                "was last rendered. Use --force to overwrite it."
+            )
+            skipped += 1
+            continue
+        else:
+            page_path.write_bytes(output)
+            logger.info(f"Output written to {get_relative_path(page_path)}")
+            rendered += 1
+        state[page_name] = RenderedPage(inputs, hash_bytes(output))
+
+    if state != recorded_state:
+        save_render_state(state_path, state)
+    summary = RenderSummary(rendered, unchanged, skipped, failed)
+    logger.info(f"Episode pages: {summary}")
+    return summary
@@ -0,0 +1,144 @@
+"""
+templates.py
+
+The Jinja templates that episode pages are rendered from.
+
+The build step (make compile-templates) compiles every *.jinja template in
+TEMPLATE_DIR to a Python module, and that module to bytecode, in
+COMPILED_TEMPLATES_DIR, so rendering loads them with ModuleLoader instead of
+lexing and parsing the sources.
+The compiled modules are used only while they match the current template
+sources and Jinja version; otherwise, e.g. while editing a template, the
+sources are loaded with FileSystemLoader and a bytecode cache.
+
+Jinja is imported only when an environment is made, so commands that do not
+render do not pay for importing it.
+
+Usage:
+    templates.py - compile the templates if they changed.
+"""
+
+import compileall
+import json
+import logging
+import shutil
+from pathlib import Path
+
+import coloredlogs
+
+from gitp_acolyte.constants import CACHE_DIR, get_relative_path
+from gitp_acolyte.utils.hashing import hash_file
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+TEMPLATE_DIR = Path(__file__).resolve().parent
+TEMPLATE_SUFFIX = ".jinja"
+EPISODE_TEMPLATE_NAME = "episode.jinja"
+COMPILED_TEMPLATES_DIR = TEMPLATE_DIR / "compiled_templates"
+COMPILED_TEMPLATES_MANIFEST = "templates.json"
+JINJA_BYTECODE_CACHE_DIR = CACHE_DIR / "jinja"
+
+
+def template_digests(template_dir: Path = TEMPLATE_DIR) -> dict[str, str]:
+    """
+    Returns the digest of every template source in template_dir by name.
+    """
+    return {
+        path.name: hash_file(path)
+        for path in sorted(template_dir.glob(f"*{TEMPLATE_SUFFIX}"))
+    }
+
+
+def compiled_templates_manifest(template_dir: Path) -> dict:
+    import jinja2
+
+    return {
+        "jinja_version": jinja2.__version__,
+        "templates": template_digests(template_dir),
+    }
+
+
+def compiled_templates_are_current(
+    template_dir: Path = TEMPLATE_DIR, compiled_dir: Path = COMPILED_TEMPLATES_DIR
+) -> bool:
+    """
+    True if compiled_dir holds the templates in template_dir, compiled by
+    this version of Jinja.
+    """
+    try:
+        compiled = json.loads((compiled_dir / COMPILED_TEMPLATES_MANIFEST).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return compiled == compiled_templates_manifest(template_dir)
+
+
+def get_jinja_environment(
+    template_dir: Path = TEMPLATE_DIR, compiled_dir: Path = COMPILED_TEMPLATES_DIR
+):
+    """
+    Returns a Jinja environment for the episode page templates, loading the
+    compiled templates if they are current and the sources otherwise.
+    """
+    # imported here so that commands that do not render do not import Jinja
+    from jinja2 import (
+        Environment,
+        FileSystemBytecodeCache,
+        FileSystemLoader,
+        ModuleLoader,
+    )
+
+    if compiled_templates_are_current(template_dir, compiled_dir):
+        return Environment(loader=ModuleLoader(compiled_dir))
+    logger.debug("Compiled templates are missing or stale; loading the sources")
+    JINJA_BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(template_dir),
+        bytecode_cache=FileSystemBytecodeCache(JINJA_BYTECODE_CACHE_DIR),
+    )
+
+
+def compile_templates(
+    template_dir: Path = TEMPLATE_DIR, compiled_dir: Path = COMPILED_TEMPLATES_DIR
+) -> bool:
+    """
+    Compiles every template in template_dir into compiled_dir, unless they
+    are already current. The manifest is written last, so an interrupted
+    compile is treated as stale. Returns True if the templates were compiled.
+    """
+    from jinja2 import Environment, FileSystemLoader
+
+    if compiled_templates_are_current(template_dir, compiled_dir):
+        logger.info("Compiled templates are up to date.")
+        # so that make sees the manifest as newer than the sources again
+        (compiled_dir / COMPILED_TEMPLATES_MANIFEST).touch()
+        return False
+    shutil.rmtree(compiled_dir, ignore_errors=True)
+    compiled_dir.mkdir(parents=True)
+    env = Environment(loader=FileSystemLoader(template_dir))
+    env.compile_templates(
+        compiled_dir,
+        extensions=[TEMPLATE_SUFFIX.lstrip(".")],
+        zip=None,
+        ignore_errors=False,
+    )
+    # the Makefile sets PYTHONDONTWRITEBYTECODE, so write the bytecode here
+    compileall.compile_dir(compiled_dir, quiet=1)
+    (compiled_dir / COMPILED_TEMPLATES_MANIFEST).write_text(
+        json.dumps(compiled_templates_manifest(template_dir), indent=1) + "\n"
+    )
+    logger.info(f"Compiled templates to {get_relative_path(compiled_dir)}")
+    return True
+
+
+def main():
+    compile_templates()
+
+
+if __name__ == "__main__":
+    main()
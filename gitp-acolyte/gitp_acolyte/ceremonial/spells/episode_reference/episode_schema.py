@@ -29,3 +29,120 @@ class PodcastEpisodePublicationData(BaseModel):
         default_factory=list,
         description="Optional list of MIDI file names associated with this episode.",
     )
+
+
+class EpisodeDescription(BaseModel):
+    """
+    The prose part of an episode's data; everything else is inferred locally.
+    """
+
+    description: str = Field(
+        ...,
+        description="A text description of the episode content. Leave blank if not enough info to make a description is available.",
+    )
+
+
+class DatedEpisodeDescription(EpisodeDescription):
+    """
+    An episode description in a batch, keyed by its episode date.
+    """
+
+    episode_date: str = Field(
+        ..., description="The date of the episode in YYYY-MM-DD format, as given."
+    )
+
+
+class EpisodeDescriptionBatch(BaseModel):
+    """
+    The descriptions of several episodes written in one request.
+    """
+
+    episodes: List[DatedEpisodeDescription] = Field(
+        ..., description="One description for each episode, in the order given."
+    )
+
+
+class EpisodeAudioInfo(BaseModel):
+    """
+    The stream parameters of an episode's audio file, read from its headers.
+    Stored in episode.yml as audio_info; never asked of the model.
+    """
+
+    duration_seconds: float = Field(
+        ..., description="The length of the audio in seconds."
+    )
+    bitrate_kbps: int = Field(
+        ..., description="The bitrate in kbps; the average bitrate if vbr is true."
+    )
+    sample_rate: int = Field(..., description="The sample rate in Hz.")
+    channels: int = Field(..., description="The number of audio channels.")
+    byte_length: int = Field(..., description="The size of the audio file in bytes.")
+    vbr: bool = Field(..., description="Whether the audio has a variable bitrate.")
+
+
+class MidiTempoChange(BaseModel):
+    tick: int = Field(..., description="The tick the tempo starts at.")
+    bpm: float = Field(..., description="The tempo in beats per minute.")
+
+
+class MidiTimeSignatureChange(BaseModel):
+    tick: int = Field(..., description="The tick the time signature starts at.")
+    time_signature: str = Field(..., description="The time signature, e.g. 4/4.")
+
+
+class EpisodeMidiInfo(BaseModel):
+    """
+    What a MIDI file of an episode contains, read from the file.
+    Stored in episode.yml under midi_info, keyed by the file name; never
+    asked of the model.
+    """
+
+    format: int = Field(..., description="The Standard MIDI File format, 0 to 2.")
+    track_count: int = Field(..., description="The number of tracks.")
+    ticks_per_beat: int | None = Field(
+        ..., description="The ticks per quarter note, or None for SMPTE timing."
+    )
+    tempo_map: List[MidiTempoChange] = Field(
+        ..., description="The tempo changes in tick order, starting at tick 0."
+    )
+    time_signatures: List[MidiTimeSignatureChange] = Field(
+        ..., description="The time signature changes in tick order."
+    )
+    note_count: int = Field(..., description="The number of notes played.")
+    lowest_note: str | None = Field(
+        ..., description="The lowest note played, e.g. C2, if any."
+    )
+    highest_note: str | None = Field(
+        ..., description="The highest note played, e.g. G5, if any."
+    )
+    duration_seconds: float = Field(
+        ..., description="The time until the end of the longest track."
+    )
+
+
+class EpisodePatchInfo(BaseModel):
+    """
+    What a MicroFreak patch file of an episode holds, read from its zip
+    headers. Stored in episode.yml under patch_info, keyed by the file name;
+    never asked of the model.
+    """
+
+    patch_name: str = Field(..., description="The name of the patch on the synth.")
+    member_name: str = Field(
+        ..., description="The name of the preset inside the .mfpz archive."
+    )
+    modified: str = Field(
+        ..., description="When the preset was last saved, in ISO 8601 format."
+    )
+    size: int = Field(..., description="The size of the preset in bytes.")
+    compressed_size: int = Field(
+        ..., description="The size of the preset in the archive in bytes."
+    )
+    crc32: str = Field(..., description="The CRC-32 of the preset, in hex.")
+    oscillator_type_index: int | None = Field(
+        ...,
+        description="The position of the oscillator type in the synth's list, from 0.",
+    )
+    filter_type: str | None = Field(
+        ..., description="The filter type: LPF, BPF or HPF."
+    )
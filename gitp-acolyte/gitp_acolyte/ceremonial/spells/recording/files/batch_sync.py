@@ -0,0 +1,166 @@
+"""
+batch_sync.py
+
+Syncs the recording files of many episodes at once.
+
+Every "GitP.YY.MM.DD Project" directory under RECORDINGS_ROOT_FOLDER within
+the requested date range is mapped to its episode publishing directory, and
+the episodes are synced concurrently in a process pool.
+"""
+
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import coloredlogs
+
+from gitp_acolyte.ceremonial.spells.episode_data.create import (
+    construct_path_to_episode_publishing_dir,
+    find_episode_recording_dirs,
+)
+from gitp_acolyte.ceremonial.spells.recording.files.copy_engine import (
+    SyncSummary,
+    format_throughput,
+)
+from gitp_acolyte.ceremonial.spells.recording.files.pub_rec_files import sync_files
+from gitp_acolyte.ceremonial.spells.recording.files.rec_file_constants import (
+    DEFAULT_COPY_WORKERS,
+)
+from gitp_acolyte.constants import DATE_FORMAT, RECORDINGS_ROOT_FOLDER
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+
+@dataclass
+class EpisodeSyncResult:
+    """
+    The outcome of syncing one episode.
+    """
+
+    episode_date: datetime
+    summary: SyncSummary | None = None
+    error: str | None = None
+
+
+def select_episode_recording_dirs(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    recordings_root: Path = RECORDINGS_ROOT_FOLDER,
+) -> list[tuple[datetime, Path]]:
+    """
+    Returns the (episode date, recording directory) pairs under
+    recordings_root whose date is within [since, until].
+    """
+    return [
+        (episode_date, recording_dir)
+        for episode_date, recording_dir in find_episode_recording_dirs(recordings_root)
+        if (since is None or episode_date >= since)
+        and (until is None or episode_date <= until)
+    ]
+
+
+def sync_episode(
+    episode_date: datetime,
+    src_dir: Path,
+    dest_dir: Path,
+    dry_run: bool,
+    max_workers: int,
+    rehash: bool,
+    search_depth: int,
+) -> EpisodeSyncResult:
+    """
+    Syncs one episode; runs in a worker process.
+    Errors are returned rather than raised so one episode cannot abort the batch.
+    """
+    try:
+        if not dry_run:
+            dest_dir.mkdir(parents=True, exist_ok=True)
+        summary = sync_files(
+            src_dir,
+            dest_dir,
+            dry_run,
+            max_workers=max_workers,
+            rehash=rehash,
+            search_depth=search_depth,
+        )
+    except Exception as e:
+        return EpisodeSyncResult(episode_date, error=f"{type(e).__name__}: {e}")
+    if summary.failed:
+        failed_names = ", ".join(failure.src.name for failure in summary.failed)
+        return EpisodeSyncResult(
+            episode_date,
+            summary=summary,
+            error=f"{len(summary.failed)} file(s) failed to copy: {failed_names}",
+        )
+    return EpisodeSyncResult(episode_date, summary=summary)
+
+
+def sync_episodes(
+    episode_recording_dirs: list[tuple[datetime, Path]],
+    args,
+    dry_run: bool,
+    processes: int | None = None,
+    max_workers: int = DEFAULT_COPY_WORKERS,
+    rehash: bool = False,
+    search_depth: int = 0,
+) -> list[EpisodeSyncResult]:
+    """
+    Syncs each episode recording directory to its publishing directory in a
+    process pool, and logs an aggregated summary.
+    """
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            executor.submit(
+                sync_episode,
+                episode_date,
+                src_dir,
+                construct_path_to_episode_publishing_dir(episode_date, args),
+                dry_run,
+                max_workers,
+                rehash,
+                search_depth,
+            )
+            for episode_date, src_dir in episode_recording_dirs
+        ]
+        results = [future.result() for future in futures]
+    log_batch_summary(results, time.perf_counter() - start)
+    return results
+
+
+def log_batch_summary(results: list[EpisodeSyncResult], seconds: float):
+    """
+    Logs one line per episode and the totals over all episodes.
+    """
+    total_bytes = 0
+    total_copied = 0
+    total_skipped = 0
+    for result in results:
+        episode = result.episode_date.strftime(DATE_FORMAT)
+        summary = result.summary
+        if summary is not None:
+            # an episode whose copies partly failed still counts the others
+            total_bytes += summary.bytes_copied
+            total_copied += len(summary.copied)
+            total_skipped += summary.skipped
+        if result.error:
+            logger.error(f"{episode}: failed: {result.error}")
+            continue
+        logger.info(
+            f"{episode}: copied {len(summary.copied)}, skipped {summary.skipped}"
+        )
+    failed = sum(1 for result in results if result.error)
+    logger.info(
+        f"Synced {len(results) - failed} of {len(results)} episode(s): "
+        f"copied {total_copied} file(s), skipped {total_skipped}; "
+        f"{format_throughput(total_bytes, seconds)}"
+    )
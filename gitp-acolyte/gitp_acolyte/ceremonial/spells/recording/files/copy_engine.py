@@ -0,0 +1,288 @@
+"""
+copy_engine.py
+
+Copies recording files into the episode publishing directory.
+
+Each file is copied into a .partial file next to its destination using the
+kernel's zero-copy primitives (os.copy_file_range, then os.sendfile), falling
+back to a chunked userspace copy. Interrupted transfers resume from the last
+verified offset, and a finished transfer is checked against the source's
+digest before it is renamed into place atomically.
+The source file is never moved or modified.
+"""
+
+import logging
+import mmap
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import coloredlogs
+
+from gitp_acolyte.ceremonial.spells.recording.files.rec_file_constants import (
+    COPY_CHUNK_SIZE,
+    DEFAULT_COPY_WORKERS,
+    TRANSFER_CHUNK_SIZE,
+)
+from gitp_acolyte.utils.hashing import hash_fd
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+
+@dataclass(frozen=True)
+class CopyResult:
+    """
+    The outcome of copying a single file.
+    """
+
+    src: Path
+    dest: Path
+    bytes_copied: int
+    seconds: float
+    method: str
+    resumed_from: int = 0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_copied / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class CopyFailure:
+    """
+    A file whose copy failed, e.g. because it did not verify.
+    """
+
+    src: Path
+    dest: Path
+    error: OSError
+
+
+@dataclass
+class SyncSummary:
+    """
+    Aggregated results of a sync run.
+    """
+
+    copied: list[CopyResult] = field(default_factory=list)
+    failed: list[CopyFailure] = field(default_factory=list)
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_copied(self) -> int:
+        return sum(result.bytes_copied for result in self.copied)
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_copied / self.seconds if self.seconds > 0 else 0.0
+
+
+def format_throughput(num_bytes: int, seconds: float) -> str:
+    """
+    Formats a byte count and duration as e.g. "45.96 MB in 0.12s (383.00 MB/s)".
+    """
+    megabytes = num_bytes / 1_000_000
+    rate = megabytes / seconds if seconds > 0 else 0.0
+    return f"{megabytes:.2f} MB in {seconds:.2f}s ({rate:.2f} MB/s)"
+
+
+class TransferVerificationError(OSError):
+    """
+    Raised when a copied file's digest does not match its source.
+    """
+
+
+def partial_path_for(dest: Path) -> Path:
+    """
+    The hidden file a transfer to dest is written to until it is verified.
+    """
+    return dest.with_name(f".{dest.name}.partial")
+
+
+def _copy_with_copy_file_range(src_fd: int, dest_fd: int, offset: int, count: int):
+    end = offset + count
+    while offset < end:
+        sent = os.copy_file_range(src_fd, dest_fd, end - offset, offset, offset)
+        if sent == 0:
+            raise OSError(f"Source ended at offset {offset}")
+        offset += sent
+
+
+def _copy_with_sendfile(src_fd: int, dest_fd: int, offset: int, count: int):
+    end = offset + count
+    os.lseek(dest_fd, offset, os.SEEK_SET)
+    while offset < end:
+        sent = os.sendfile(dest_fd, src_fd, offset, end - offset)
+        if sent == 0:
+            raise OSError(f"Source ended at offset {offset}")
+        offset += sent
+
+
+def _copy_with_chunks(src_fd: int, dest_fd: int, offset: int, count: int):
+    end = offset + count
+    while offset < end:
+        data = os.pread(src_fd, min(COPY_CHUNK_SIZE, end - offset), offset)
+        if not data:
+            raise OSError(f"Source ended at offset {offset}")
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(dest_fd, view, offset)
+            view = view[written:]
+            offset += written
+
+
+_COPY_METHODS = [
+    ("copy_file_range", _copy_with_copy_file_range),
+    ("sendfile", _copy_with_sendfile),
+    ("chunked", _copy_with_chunks),
+]
+
+
+def _copy_fd(src_fd: int, dest_fd: int, offset: int, size: int) -> str:
+    """
+    Copies the bytes from offset to size from src_fd to dest_fd, one
+    TRANSFER_CHUNK_SIZE chunk at a time, with the fastest available method.
+    If the transfer is interrupted, dest_fd holds a valid prefix to resume from.
+    Returns the name of the method that was used.
+    """
+    methods = [
+        (method_name, copy_method)
+        for method_name, copy_method in _COPY_METHODS
+        if method_name == "chunked" or hasattr(os, method_name)
+    ]
+    while offset < size:
+        count = min(TRANSFER_CHUNK_SIZE, size - offset)
+        method_name, copy_method = methods[0]
+        try:
+            copy_method(src_fd, dest_fd, offset, count)
+        except OSError as e:
+            if len(methods) == 1:
+                raise
+            # e.g. EXDEV on older kernels, EINVAL/ENOSYS on unsupported filesystems;
+            # drop whatever this chunk wrote and retry it with the next method.
+            logger.debug(f"{method_name} unavailable ({e}); falling back")
+            os.ftruncate(dest_fd, offset)
+            methods.pop(0)
+            continue
+        offset += count
+    return methods[0][0]
+
+
+def _verified_prefix_length(src_fd: int, partial_fd: int, size: int) -> int:
+    """
+    Compares an existing partial transfer with the source one
+    TRANSFER_CHUNK_SIZE chunk at a time through memory maps, and returns the
+    offset up to which they match.
+    """
+    partial_size = min(os.fstat(partial_fd).st_size, size)
+    verified = 0
+    if partial_size == 0:
+        return verified
+    with mmap.mmap(src_fd, partial_size, access=mmap.ACCESS_READ) as src_map, mmap.mmap(
+        partial_fd, partial_size, access=mmap.ACCESS_READ
+    ) as partial_map:
+        while verified < partial_size:
+            end = min(verified + TRANSFER_CHUNK_SIZE, partial_size)
+            if src_map[verified:end] != partial_map[verified:end]:
+                break
+            verified = end
+    return verified
+
+
+def copy_file_atomic(
+    src: Path, dest: Path, expected_digest: str | None = None
+) -> CopyResult:
+    """
+    Copies src to dest without touching src.
+
+    The copy is written to a .partial file next to dest. If a previous
+    transfer was interrupted, the part of its .partial file that still
+    matches the source is kept and the transfer resumes from there.
+    Once complete, the .partial file is verified against a streaming hash of
+    the source (or against expected_digest, if the caller already hashed the
+    source), given the source's timestamps and renamed over dest.
+    Raises TransferVerificationError if the digests differ, e.g. because
+    the source changed during the transfer.
+    """
+    start = time.perf_counter()
+    partial_path = partial_path_for(dest)
+    with open(src, "rb") as src_file:
+        src_fd = src_file.fileno()
+        size = os.fstat(src_fd).st_size
+        partial_fd = os.open(partial_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            resumed_from = _verified_prefix_length(src_fd, partial_fd, size)
+            if resumed_from:
+                logger.info(
+                    f"Resuming transfer of '{src.name}' at byte {resumed_from} of {size}"
+                )
+            os.ftruncate(partial_fd, resumed_from)
+            method = _copy_fd(src_fd, partial_fd, resumed_from, size)
+            os.fsync(partial_fd)
+            if expected_digest is None:
+                expected_digest = hash_fd(src_fd, size)
+            digest = hash_fd(partial_fd, size)
+        finally:
+            os.close(partial_fd)
+
+    if digest != expected_digest:
+        partial_path.unlink(missing_ok=True)
+        raise TransferVerificationError(
+            f"Copy of '{src}' does not match its source; it may have changed during the transfer"
+        )
+    shutil.copystat(src, partial_path)
+    os.replace(partial_path, dest)
+    return CopyResult(
+        src=src,
+        dest=dest,
+        bytes_copied=size - resumed_from,
+        seconds=time.perf_counter() - start,
+        method=method,
+        resumed_from=resumed_from,
+    )
+
+
+def copy_files(
+    pairs: list[tuple[Path, Path]],
+    max_workers: int = DEFAULT_COPY_WORKERS,
+    expected_digests: dict[Path, str] | None = None,
+) -> tuple[list[CopyResult], list[CopyFailure]]:
+    """
+    Copies each (src, dest) pair with copy_file_atomic on a thread pool.
+    expected_digests optionally maps src paths to their already known digests.
+    Returns the results of the copies that succeeded and the failures of
+    those that raised an OSError, each in the order of pairs, so one failed
+    copy does not discard the others.
+    Raises ValueError if two pairs share a destination, since their copies
+    would race on the same .partial file.
+    """
+    if not pairs:
+        return [], []
+    dests = [dest for _, dest in pairs]
+    if len(set(dests)) != len(dests):
+        duplicates = sorted({str(dest) for dest in dests if dests.count(dest) > 1})
+        raise ValueError(f"More than one file would be copied to {duplicates}")
+    expected_digests = expected_digests or {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(copy_file_atomic, src, dest, expected_digests.get(src))
+            for src, dest in pairs
+        ]
+    results = []
+    failures = []
+    for (src, dest), future in zip(pairs, futures):
+        try:
+            results.append(future.result())
+        except OSError as e:
+            failures.append(CopyFailure(src, dest, e))
+    return results, failures
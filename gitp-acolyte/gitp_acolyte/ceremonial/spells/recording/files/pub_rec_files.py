@@ -1,8 +1,12 @@
 import argparse
 import logging
+import os
 import re
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
+from typing import NamedTuple
 
 import coloredlogs
 from gitp_acolyte.ceremonial.spells.episode_data.args import (
@@ -13,11 +17,21 @@ from gitp_acolyte.ceremonial.spells.episode_data.create import (
     episode_publishing_dir_exists,
     recording_dir_exists,
 )
+from gitp_acolyte.ceremonial.spells.recording.files.copy_engine import (
+    SyncSummary,
+    copy_files,
+    format_throughput,
+)
 from gitp_acolyte.ceremonial.spells.recording.files.rec_file_constants import (
+    DEFAULT_COPY_WORKERS,
+    DEFAULT_WATCH_POLL_INTERVAL,
+    DEFAULT_WATCH_SETTLE_SECONDS,
     FILE_SUFFIXES_TO_SYNC,
     REC_DIR_SUBDIRS_TO_SEARCH,
 )
-from gitp_acolyte.constants import get_relative_path
+from gitp_acolyte.constants import DATE_FORMAT, get_relative_path
+from gitp_acolyte.utils.hashing import hash_file
+from gitp_acolyte.utils.manifest import Manifest
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -44,33 +58,158 @@ def define_args():
         action="store_true",
         help="Simulate the file sync without making any changes.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_COPY_WORKERS,
+        help=f"Number of files to copy in parallel. Default is {DEFAULT_COPY_WORKERS}.",
+    )
+    parser.add_argument(
+        "--rehash",
+        action="store_true",
+        help="Hash every source file instead of trusting the manifest's record of the last sync.",
+    )
+    parser.add_argument(
+        "--search-depth",
+        type=int,
+        default=0,
+        help="Also search subdirectories of the recording directory this many levels deep. Default is 0.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the initial sync, keep watching the recording directory and sync files as they are exported.",
+    )
+    parser.add_argument(
+        "--settle-seconds",
+        type=float,
+        default=DEFAULT_WATCH_SETTLE_SECONDS,
+        help=f"With --watch, how long a file's size must stay unchanged before it is synced. Default is {DEFAULT_WATCH_SETTLE_SECONDS}.",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll the recording directory instead of using inotify.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_WATCH_POLL_INTERVAL,
+        help=f"With --watch, seconds between polls when inotify is unavailable. Default is {DEFAULT_WATCH_POLL_INTERVAL}.",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Sync every episode recording directory under the recordings root instead of a single date.",
+    )
+    parser.add_argument(
+        "--since",
+        type=lambda s: datetime.strptime(s, DATE_FORMAT),
+        help=f"Sync every episode recorded on or after this date, in {DATE_FORMAT} format.",
+    )
+    parser.add_argument(
+        "--until",
+        type=lambda s: datetime.strptime(s, DATE_FORMAT),
+        help=f"Sync every episode recorded on or before this date, in {DATE_FORMAT} format.",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="With --all, --since or --until, the number of episodes to sync in parallel. Default is the number of CPUs.",
+    )
+    args = parser.parse_args()
+    if args.watch and (args.all or args.since or args.until):
+        parser.error(
+            "--watch watches a single episode; it cannot be combined with --all, --since or --until."
+        )
+    return args
 
 
-def filter_files_to_publish(src_dir: Path) -> list[Path]:
+class RecordingFile(NamedTuple):
     """
-    Iterates through files in src_dir and any subdirectories in
-    REC_DIR_SUBDIRS_TO_SEARCH, and only returns files
-    whose file names end with any of the strings in FILE_SUFFIXES_TO_SYNC.
+    A file found in the recording directory, with the stat result fetched
+    while scanning so later stages never stat it again.
     """
 
-    def is_valid_file(file: Path) -> bool:
-        return file.is_file() and any(
-            file.name.endswith(suffix) for suffix in FILE_SUFFIXES_TO_SYNC
-        )
+    path: Path
+    stat: os.stat_result
 
-    files_to_sync = [item for item in src_dir.iterdir() if is_valid_file(item)]
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+
+def build_suffix_table(suffixes: list[str]) -> dict[str, tuple[str, ...]]:
+    """
+    Groups suffixes by their final extension, e.g.
+    {".mp3": (".mix.128kbps_CBR.mp3",), ".mid": (".mid",)}, so that a file
+    name is only compared against the suffixes sharing its extension.
+    """
+    table: dict[str, tuple[str, ...]] = {}
+    for suffix in suffixes:
+        extension = suffix[suffix.rfind(".") :]
+        table[extension] = table.get(extension, ()) + (suffix,)
+    return table
+
+
+FILE_SUFFIX_TABLE = build_suffix_table(FILE_SUFFIXES_TO_SYNC)
 
-    for subdir in REC_DIR_SUBDIRS_TO_SEARCH:
-        subdir_path = src_dir / subdir
-        if subdir_path.exists() and subdir_path.is_dir():
-            files_to_sync.extend(
-                item for item in subdir_path.iterdir() if is_valid_file(item)
-            )
 
+def has_suffix_to_sync(name: str) -> bool:
+    """
+    Whether name ends with any of the strings in FILE_SUFFIXES_TO_SYNC.
+    """
+    return name.endswith(FILE_SUFFIX_TABLE.get(name[name.rfind(".") :], ()))
+
+
+def discover_files_to_publish(
+    src_dir: Path, search_depth: int = 0
+) -> list[RecordingFile]:
+    """
+    Scans src_dir and any subdirectories in REC_DIR_SUBDIRS_TO_SEARCH in a
+    single os.scandir pass per directory, and returns a RecordingFile for
+    every file whose name ends with any of the strings in FILE_SUFFIXES_TO_SYNC.
+    With search_depth > 0, every other subdirectory is searched as well,
+    up to search_depth levels below src_dir.
+    """
+    files_to_sync = []
+    dirs_to_scan = [(src_dir, search_depth, True)]
+    while dirs_to_scan:
+        directory, depth, is_root = dirs_to_scan.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        if has_suffix_to_sync(entry.name):
+                            files_to_sync.append(
+                                RecordingFile(Path(entry.path), entry.stat())
+                            )
+                    elif is_root and entry.name in REC_DIR_SUBDIRS_TO_SEARCH:
+                        if entry.is_dir():
+                            dirs_to_scan.append(
+                                (Path(entry.path), max(depth - 1, 0), False)
+                            )
+                    elif depth > 0 and entry.is_dir(follow_symlinks=False):
+                        dirs_to_scan.append((Path(entry.path), depth - 1, False))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
     return files_to_sync
 
 
+def filter_files_to_publish(src_dir: Path, search_depth: int = 0) -> list[Path]:
+    """
+    Iterates through files in src_dir and any subdirectories in
+    REC_DIR_SUBDIRS_TO_SEARCH, and only returns files
+    whose file names end with any of the strings in FILE_SUFFIXES_TO_SYNC.
+    See discover_files_to_publish for search_depth.
+    """
+    return [
+        recording_file.path
+        for recording_file in discover_files_to_publish(src_dir, search_depth)
+    ]
+
+
 def sanitize_destination_filename(path: Path) -> Path:
     """
     Replaces emojis and other complex UTF-8 characters in the filename with underscores.
@@ -79,43 +218,206 @@ def sanitize_destination_filename(path: Path) -> Path:
     return path.with_name(sanitized_name)
 
 
-def sync_files(src_dir: Path, dest_dir: Path, dry_run: bool):
+def select_unique_destinations(
+    files_to_publish: list[RecordingFile], dest_dir: Path
+) -> list[tuple[RecordingFile, Path]]:
+    """
+    Pairs each file with its sanitized destination in dest_dir, keeping only
+    one file per destination name. When files in different directories
+    sanitize to the same name, the one nearest the recording directory wins,
+    then the first by path, and the others are skipped with a warning.
+    """
+    by_dest: dict[Path, list[RecordingFile]] = {}
+    for recording_file in files_to_publish:
+        dest_file = sanitize_destination_filename(dest_dir / recording_file.name)
+        by_dest.setdefault(dest_file, []).append(recording_file)
+    selected = []
+    for dest_file, candidates in by_dest.items():
+        candidates.sort(
+            key=lambda candidate: (len(candidate.path.parts), candidate.path)
+        )
+        for skipped in candidates[1:]:
+            logger.warning(
+                f"Not syncing '{skipped.path}'; '{candidates[0].path}' is also "
+                f"published as '{get_relative_path(dest_file)}'"
+            )
+        selected.append((candidates[0], dest_file))
+    return selected
+
+
+def sync_files(
+    src_dir: Path,
+    dest_dir: Path,
+    dry_run: bool,
+    max_workers: int = DEFAULT_COPY_WORKERS,
+    rehash: bool = False,
+    search_depth: int = 0,
+) -> SyncSummary:
     """
     Sync files from the source directory to the destination directory,
-    first filtering files with filter_files_to_publish. This function
-    will only write files to the destination directory if the file does not
-    yet exist in the destination directory or if the file in the destination
-    directory is older than the file in the source directory.
-    The directory structure is not preserved, so any files that are returned
-    from filter_files_to_publish will be copied to the destination directory.
-    """
-    files_to_publish = filter_files_to_publish(src_dir)
-    for file in files_to_publish:
-        dest_file = sanitize_destination_filename(dest_dir / file.name)
-        if not dest_file.exists():
-            if dry_run:
-                logger.info(f"Would copy '{file}' to '{get_relative_path(dest_file)}'")
-            else:
-                logger.debug(f"Copying '{file}' to '{get_relative_path(dest_file)}'")
-                file.replace(dest_file)
-        elif file.stat().st_mtime > dest_file.stat().st_mtime:
+    first discovering files with discover_files_to_publish. The directory
+    structure is not preserved, so any files that are returned
+    from discover_files_to_publish will be copied to the destination directory.
+
+    Whether a file needs copying is decided with the destination directory's
+    Manifest rather than by comparing mtimes: a source file whose size and
+    mtime match what was last synced is skipped with a stat and a lookup, as
+    long as the published file is still there with the size and mtime it was
+    recorded with (so a deleted or truncated copy is copied again), and
+    otherwise it is hashed and only copied if its digest differs from the
+    published file. With rehash, every source file is hashed again.
+    Source files are copied, never moved; the copies run in parallel on
+    max_workers threads.
+    """
+    files_to_publish = discover_files_to_publish(src_dir, search_depth)
+    return sync_recording_files(
+        files_to_publish, dest_dir, dry_run, max_workers=max_workers, rehash=rehash
+    )
+
+
+def sync_recording_files(
+    files_to_publish: list[RecordingFile],
+    dest_dir: Path,
+    dry_run: bool,
+    max_workers: int = DEFAULT_COPY_WORKERS,
+    rehash: bool = False,
+) -> SyncSummary:
+    """
+    Syncs already discovered recording files to the destination directory.
+    See sync_files.
+    """
+    start = time.perf_counter()
+    summary = SyncSummary()
+    manifest = Manifest.load(dest_dir)
+    if rehash:
+        manifest.sources.clear()
+
+    pairs_to_copy = []
+    digests = {}
+    for (file, src_stat), dest_file in select_unique_destinations(
+        files_to_publish, dest_dir
+    ):
+        try:
+            dest_stat = dest_file.stat()
+        except FileNotFoundError:
+            dest_stat = None
+        if (
+            dest_stat is not None
+            and manifest.is_synced_from(dest_file.name, src_stat)
+            and manifest.is_current(dest_file.name, dest_stat)
+        ):
+            summary.skipped += 1
+            logger.debug(
+                f"Skipping sync; '{get_relative_path(dest_file)}' is up to date with '{file}'"
+            )
+            continue
+
+        src_digest = hash_file(file)
+        if dest_stat is not None:
+            if manifest.digest(dest_file.name, dest_stat) == src_digest:
+                summary.skipped += 1
+                manifest.record_source(dest_file.name, src_stat)
+                logger.debug(
+                    f"Skipping sync; '{get_relative_path(dest_file)}' has the same content as '{file}'"
+                )
+                continue
             if dry_run:
                 logger.info(
-                    f"Would overwrite '{get_relative_path(dest_file)}' with newer file '{file}'"
+                    f"Would overwrite '{get_relative_path(dest_file)}' with changed file '{file}'"
                 )
             else:
                 logger.warning(
-                    f"Overwriting '{get_relative_path(dest_file)}' with newer file '{file}'"
+                    f"Overwriting '{get_relative_path(dest_file)}' with changed file '{file}'"
                 )
-                file.replace(dest_file)
+                pairs_to_copy.append((file, dest_file))
+        elif dry_run:
+            logger.info(f"Would copy '{file}' to '{get_relative_path(dest_file)}'")
         else:
-            logger.debug(
-                f"Skipping sync; '{get_relative_path(dest_file)}' is newer than source file '{file}'"
-            )
+            logger.debug(f"Copying '{file}' to '{get_relative_path(dest_file)}'")
+            pairs_to_copy.append((file, dest_file))
+        digests[dest_file] = (src_stat, src_digest)
+
+    try:
+        summary.copied, summary.failed = copy_files(
+            pairs_to_copy,
+            max_workers=max_workers,
+            expected_digests={src: digests[dest][1] for src, dest in pairs_to_copy},
+        )
+        for result in summary.copied:
+            # the copy preserves the source's size and mtime, so its stat stands
+            # in for the destination's
+            src_stat, src_digest = digests[result.dest]
+            manifest.record(result.dest.name, src_stat, src_digest)
+            manifest.record_source(result.dest.name, src_stat)
+    finally:
+        # save whatever was recorded even if the sync is interrupted, so the
+        # next run does not copy or hash those files again
+        if not dry_run:
+            manifest.save()
+
+    summary.seconds = time.perf_counter() - start
+    log_sync_summary(summary)
+    return summary
+
+
+def log_sync_summary(summary: SyncSummary):
+    """
+    Logs the throughput of each copied file and of the whole sync, and each
+    file that failed to copy.
+    """
+    for failure in summary.failed:
+        logger.error(
+            f"Failed to copy '{failure.src}' to '{get_relative_path(failure.dest)}': "
+            f"{failure.error}"
+        )
+    for result in summary.copied:
+        logger.info(
+            f"Copied '{get_relative_path(result.dest)}' via {result.method}: "
+            f"{format_throughput(result.bytes_copied, result.seconds)}"
+        )
+    if summary.copied:
+        logger.info(
+            f"Synced {len(summary.copied)} file(s), skipped {summary.skipped}: "
+            f"{format_throughput(summary.bytes_copied, summary.seconds)}"
+        )
+
+
+def main_batch(args):
+    """
+    Syncs every episode selected by --all, --since and --until.
+    """
+    # imported here because batch_sync builds on the sync functions in this module
+    from gitp_acolyte.ceremonial.spells.recording.files.batch_sync import (
+        select_episode_recording_dirs,
+        sync_episodes,
+    )
+
+    if args.reference:
+        logger.error("--reference cannot be combined with --all, --since or --until.")
+        sys.exit(1)
+    episode_recording_dirs = select_episode_recording_dirs(args.since, args.until)
+    if not episode_recording_dirs:
+        logger.warning("No episode recording directories found.")
+        return
+    results = sync_episodes(
+        episode_recording_dirs,
+        args,
+        args.dry_run,
+        processes=args.processes,
+        max_workers=args.workers,
+        rehash=args.rehash,
+        search_depth=args.search_depth,
+    )
+    if any(result.error for result in results):
+        sys.exit(1)
 
 
 def main():
     args = define_args()
+    if args.all or args.since or args.until:
+        main_batch(args)
+        return
+
     episode_date = get_episode_date(args)
     logger.debug(f"Episode date: {episode_date}")
 
@@ -133,7 +435,35 @@ def main():
     logger.debug(f"Source directory: '{src_dir}'")
     logger.debug(f"Destination directory: '{get_relative_path(dest_dir)}'")
 
-    sync_files(src_dir, dest_dir, args.dry_run)
+    summary = sync_files(
+        src_dir,
+        dest_dir,
+        args.dry_run,
+        max_workers=args.workers,
+        rehash=args.rehash,
+        search_depth=args.search_depth,
+    )
+    if summary.failed:
+        logger.error(
+            f"{len(summary.failed)} file(s) failed to copy; run again to retry them."
+        )
+        sys.exit(1)
+
+    if args.watch:
+        # imported here because watch builds on the sync functions in this module
+        from gitp_acolyte.ceremonial.spells.recording.files.watch import (
+            watch_and_sync,
+        )
+
+        watch_and_sync(
+            src_dir,
+            dest_dir,
+            args.dry_run,
+            max_workers=args.workers,
+            settle_seconds=args.settle_seconds,
+            poll_interval=args.poll_interval,
+            force_polling=args.poll,
+        )
 
     if args.dry_run:
         logger.info("Dry run complete. No files were synced.")
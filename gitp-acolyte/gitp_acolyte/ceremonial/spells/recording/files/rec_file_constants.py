@@ -9,3 +9,13 @@ FILE_SUFFIXES_TO_SYNC = [
     MICROFREAK_PATCH_FILE_EXTENSION,
     MIDI_FILE_EXTENSION,
 ]
+
+COPY_CHUNK_SIZE = 1024 * 1024
+TRANSFER_CHUNK_SIZE = 16 * 1024 * 1024
+DEFAULT_COPY_WORKERS = 4
+
+DEFAULT_WATCH_SETTLE_SECONDS = 3.0
+DEFAULT_WATCH_POLL_INTERVAL = 1.0
+
+WAV_FILE_EXTENSION = ".wav"
+PEAKS_FILE_SUFFIX = ".peaks.json"
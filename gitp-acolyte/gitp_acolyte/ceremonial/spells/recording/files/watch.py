@@ -0,0 +1,283 @@
+"""
+watch.py
+
+Watches an episode recording directory and syncs files as soon as they
+have finished exporting.
+
+Changes are detected with inotify where it is available (Linux), and by
+polling the directories with os.scandir otherwise (e.g. macOS, or network
+and cloud-synced folders that do not deliver inotify events).
+A file is synced once its size has stopped changing for settle_seconds,
+since Ableton and Google Drive write exports incrementally.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+
+import coloredlogs
+
+from gitp_acolyte.ceremonial.spells.recording.files.pub_rec_files import (
+    RecordingFile,
+    has_suffix_to_sync,
+    sync_recording_files,
+)
+from gitp_acolyte.ceremonial.spells.recording.files.rec_file_constants import (
+    DEFAULT_COPY_WORKERS,
+    DEFAULT_WATCH_POLL_INTERVAL,
+    DEFAULT_WATCH_SETTLE_SECONDS,
+    REC_DIR_SUBDIRS_TO_SEARCH,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+# from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+
+def watched_directories(src_dir: Path) -> list[Path]:
+    """
+    The recording directory and those of its REC_DIR_SUBDIRS_TO_SEARCH that exist.
+    """
+    directories = [src_dir]
+    for subdir in REC_DIR_SUBDIRS_TO_SEARCH:
+        if (src_dir / subdir).is_dir():
+            directories.append(src_dir / subdir)
+    return directories
+
+
+class InotifyWatcher:
+    """
+    Reports paths written in the watched directories using Linux inotify.
+    """
+
+    def __init__(self, src_dir: Path):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.src_dir = src_dir
+        self._watches: dict[int, Path] = {}
+        for directory in watched_directories(src_dir):
+            self._add_watch(directory)
+
+    def _add_watch(self, directory: Path):
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), INOTIFY_MASK
+        )
+        if wd < 0:
+            raise OSError(
+                ctypes.get_errno(), f"inotify_add_watch failed for {directory}"
+            )
+        self._watches[wd] = directory
+        logger.debug(f"Watching '{directory}' with inotify")
+
+    def wait(self, timeout: float) -> set[Path]:
+        """
+        Waits up to timeout seconds and returns the paths that had events.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        paths = set()
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, name_length = INOTIFY_EVENT_HEADER.unpack_from(buffer, offset)
+            offset += INOTIFY_EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset : offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            if mask & IN_ISDIR:
+                # e.g. the Gdrive folder being created after watching started
+                if directory == self.src_dir and name in REC_DIR_SUBDIRS_TO_SEARCH:
+                    self._add_watch(directory / name)
+                continue
+            paths.add(directory / name)
+        return paths
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """
+    Reports paths whose size or mtime changed between scans of the watched
+    directories.
+    """
+
+    def __init__(self, src_dir: Path, interval: float = DEFAULT_WATCH_POLL_INTERVAL):
+        self.src_dir = src_dir
+        self.interval = interval
+        self._snapshot = self._scan()
+        logger.debug(f"Polling '{src_dir}' every {interval}s")
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for directory in watched_directories(self.src_dir):
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            snapshot[Path(entry.path)] = (
+                                stat.st_size,
+                                stat.st_mtime_ns,
+                            )
+            except FileNotFoundError:
+                continue
+        return snapshot
+
+    def wait(self, timeout: float) -> set[Path]:
+        """
+        Sleeps for the polling interval (at most timeout seconds) and returns
+        the paths that changed since the last scan.
+        """
+        time.sleep(min(self.interval, timeout))
+        snapshot = self._scan()
+        changed = {
+            path for path, key in snapshot.items() if self._snapshot.get(path) != key
+        }
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(
+    src_dir: Path,
+    poll_interval: float = DEFAULT_WATCH_POLL_INTERVAL,
+    force_polling: bool = False,
+) -> InotifyWatcher | PollingWatcher:
+    """
+    Returns an InotifyWatcher, or a PollingWatcher if inotify is unavailable
+    or force_polling is set.
+    """
+    if not force_polling:
+        try:
+            return InotifyWatcher(src_dir)
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify is unavailable ({e}); falling back to polling")
+    return PollingWatcher(src_dir, poll_interval)
+
+
+class SizeStabilityTracker:
+    """
+    Debounces files that are still being written: a file is settled once its
+    size has not changed for settle_seconds.
+    """
+
+    def __init__(self, settle_seconds: float, clock=time.monotonic):
+        self.settle_seconds = settle_seconds
+        self._clock = clock
+        self._pending: dict[Path, tuple[int, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def observe(self, path: Path):
+        """
+        Notes that path changed; its settle timer restarts.
+        """
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            self._pending.pop(path, None)
+            return
+        self._pending[path] = (size, self._clock())
+
+    def settled(self) -> list[RecordingFile]:
+        """
+        Returns and stops tracking the files whose size has been stable for
+        settle_seconds.
+        """
+        now = self._clock()
+        settled = []
+        for path, (size, since) in list(self._pending.items()):
+            if now - since < self.settle_seconds:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                del self._pending[path]
+                continue
+            if stat.st_size != size:
+                self._pending[path] = (stat.st_size, now)
+                continue
+            del self._pending[path]
+            settled.append(RecordingFile(path, stat))
+        return settled
+
+
+def watch_and_sync(
+    src_dir: Path,
+    dest_dir: Path,
+    dry_run: bool,
+    max_workers: int = DEFAULT_COPY_WORKERS,
+    settle_seconds: float = DEFAULT_WATCH_SETTLE_SECONDS,
+    poll_interval: float = DEFAULT_WATCH_POLL_INTERVAL,
+    force_polling: bool = False,
+    stop: threading.Event | None = None,
+):
+    """
+    Syncs each file to publish from src_dir to dest_dir once it has settled,
+    until interrupted or until stop is set.
+    """
+    watcher = make_watcher(src_dir, poll_interval, force_polling)
+    tracker = SizeStabilityTracker(settle_seconds)
+    logger.info(f"Watching '{src_dir}' for exports; press Ctrl+C to stop.")
+    try:
+        while stop is None or not stop.is_set():
+            timeout = settle_seconds / 2 if len(tracker) else poll_interval
+            for path in watcher.wait(timeout):
+                if has_suffix_to_sync(path.name):
+                    tracker.observe(path)
+            settled = tracker.settled()
+            if settled:
+                try:
+                    summary = sync_recording_files(
+                        settled, dest_dir, dry_run, max_workers=max_workers
+                    )
+                except OSError as e:
+                    # e.g. a file that changed again while it was being copied;
+                    # watch it until it settles again and retry
+                    logger.warning(f"Sync failed, will retry: {e}")
+                    for recording_file in settled:
+                        tracker.observe(recording_file.path)
+                    continue
+                for failure in summary.failed:
+                    # the copies that failed verification, e.g. because the
+                    # file was still being written; retry them once they settle
+                    logger.warning(f"Will retry '{failure.src.name}' once it settles")
+                    tracker.observe(failure.src)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching.")
+    finally:
+        watcher.close()
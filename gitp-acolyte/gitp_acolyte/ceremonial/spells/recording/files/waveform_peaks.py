@@ -0,0 +1,196 @@
+"""
+waveform_peaks.py
+
+Analyzes the WAV render in an episode's recording directory, and writes its
+peak envelope and loudness to a peaks file in the episode publishing
+directory, for the episode page to reference.
+
+The render is the largest WAV file in the recording directory or its
+REC_DIR_SUBDIRS_TO_SEARCH subdirectories. The peaks file is named after it,
+with PEAKS_FILE_SUFFIX, and the levels and the peaks file name are stored in
+episode.yml under "waveform", from which episode.jinja shows the levels
+and links the peaks file. The render is only analyzed again when its
+size or mtime changed, which the publishing directory's manifest records.
+
+Needs the "analysis" extra, for NumPy.
+
+Usage:
+    waveform_peaks.py <episode_date> - write the peaks file for the given episode date.
+    waveform_peaks.py <episode_date> --force - analyze the render even if it is unchanged.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import coloredlogs
+
+from gitp_acolyte.ceremonial.spells.episode_data.args import (
+    define_common_args,
+    get_episode_date,
+)
+from gitp_acolyte.ceremonial.spells.episode_data.create import (
+    episode_publishing_dir_exists,
+    recording_dir_exists,
+)
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    update_episode_yaml,
+)
+from gitp_acolyte.ceremonial.spells.recording.files.pub_rec_files import (
+    RecordingFile,
+    sanitize_destination_filename,
+)
+from gitp_acolyte.ceremonial.spells.recording.files.rec_file_constants import (
+    PEAKS_FILE_SUFFIX,
+    REC_DIR_SUBDIRS_TO_SEARCH,
+    WAV_FILE_EXTENSION,
+)
+from gitp_acolyte.constants import EPISODE_YAML_FILENAME, get_relative_path
+from gitp_acolyte.utils.manifest import Manifest, stat_key
+from gitp_acolyte.utils.media.waveform import (
+    DEFAULT_PEAK_COUNT,
+    WavFormatError,
+    analyze_wav,
+    rounded_level,
+    write_peaks_file,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+MANIFEST_STAMP = "waveform_peaks"
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description="Write the peak envelope and loudness of an episode's WAV render."
+    )
+    define_common_args(parser)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Analyze the render even if it did not change since the last run.",
+    )
+    parser.add_argument(
+        "--peak-count",
+        type=int,
+        default=DEFAULT_PEAK_COUNT,
+        help=f"The most (min, max) pairs in the peak envelope. Default is {DEFAULT_PEAK_COUNT}.",
+    )
+    return parser.parse_args()
+
+
+def find_wav_render(src_dir: Path) -> RecordingFile | None:
+    """
+    Returns the largest WAV file in src_dir and its REC_DIR_SUBDIRS_TO_SEARCH
+    subdirectories, if there is one.
+    """
+    renders = []
+    for directory in [src_dir] + [src_dir / name for name in REC_DIR_SUBDIRS_TO_SEARCH]:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if (
+                        entry.name.lower().endswith(WAV_FILE_EXTENSION)
+                        and entry.is_file()
+                    ):
+                        renders.append(
+                            RecordingFile(directory / entry.name, entry.stat())
+                        )
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return max(renders, key=lambda render: render.stat.st_size, default=None)
+
+
+def render_stamp(render: RecordingFile, peak_count: int) -> str:
+    """
+    The manifest stamp of a render: its name, size and mtime, and the
+    resolution it was analyzed at.
+    """
+    size, mtime_ns = stat_key(render.stat)
+    return f"{render.name}:{size}:{mtime_ns}:{peak_count}"
+
+
+def update_waveform_peaks(
+    render: RecordingFile,
+    dest_dir: Path,
+    peak_count: int = DEFAULT_PEAK_COUNT,
+    force: bool = False,
+) -> bool:
+    """
+    Writes the peaks file of the render to dest_dir and stores its levels
+    in episode.yml, unless the render is unchanged since the last run.
+    Returns True if the render was analyzed.
+    """
+    peaks_path = sanitize_destination_filename(
+        dest_dir / (render.path.stem + PEAKS_FILE_SUFFIX)
+    )
+    manifest = Manifest.load(dest_dir)
+    stamp = render_stamp(render, peak_count)
+    if (
+        not force
+        and peaks_path.exists()
+        and manifest.stamps.get(MANIFEST_STAMP) == stamp
+    ):
+        logger.info(f"{get_relative_path(peaks_path)} is up to date")
+        return False
+
+    start = time.process_time()
+    analysis = analyze_wav(render.path, peak_count)
+    logger.info(
+        f"Analyzed {analysis.duration_seconds:.0f}s of audio in "
+        f"{time.process_time() - start:.2f}s of CPU"
+    )
+    write_peaks_file(peaks_path, analysis)
+    logger.info(f"Output written to {get_relative_path(peaks_path)}")
+    update_episode_yaml(
+        dest_dir / EPISODE_YAML_FILENAME,
+        {
+            "waveform": {
+                "peaks_file": peaks_path.name,
+                "peak_dbfs": rounded_level(analysis.peak_dbfs),
+                "rms_dbfs": rounded_level(analysis.rms_dbfs),
+                "integrated_loudness_db": rounded_level(
+                    analysis.integrated_loudness_db
+                ),
+            }
+        },
+    )
+    manifest.stamp(MANIFEST_STAMP, stamp)
+    manifest.save()
+    return True
+
+
+def main():
+    args = get_args()
+    episode_date = get_episode_date(args)
+    logger.debug(f"Episode date: {episode_date}")
+    src_dir, src_dir_exists = recording_dir_exists(episode_date, args)
+    if not src_dir_exists:
+        sys.exit(1)
+    dest_dir, dest_dir_exists = episode_publishing_dir_exists(episode_date, args)
+    if not dest_dir_exists:
+        sys.exit(1)
+
+    render = find_wav_render(src_dir)
+    if render is None:
+        logger.error(f"No WAV render found in '{src_dir}'")
+        sys.exit(1)
+    logger.debug(f"WAV render: '{render.path}'")
+    try:
+        update_waveform_peaks(render, dest_dir, args.peak_count, args.force)
+    except WavFormatError as e:
+        logger.error(f"Could not analyze '{render.path}': {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ CEREMONIAL_DIR = ACOLYTE_PACKAGE_DIR / "ceremonial"
 SPELLS_DIR = CEREMONIAL_DIR / "spells"
 REFERENCE_DIR = SPELLS_DIR / "episode_reference"
 REFERENCE_EPISODE_DIR = REFERENCE_DIR / "ref_ep_dir"
+CACHE_DIR = ACOLYTE_DIR / ".cache"
 
 LOGSEQ_FOLDER = REPO_ROOT / "gitp-garden"
 LOGSEQ_ASSETS_FOLDER = LOGSEQ_FOLDER / "assets"
@@ -19,14 +20,23 @@ LOGSEQ_PAGES_FOLDER = LOGSEQ_FOLDER / "pages"
 GITHUB_USER_CONTENT_ASSETS_BASE_URL = (
     "https://raw.githubusercontent.com/codekiln/gitpa/main/assets/Ceremony/"
 )
+SITE_URL = "https://codekiln.github.io/gitpa/"
+SITE_ASSETS_BASE_URL = f"{SITE_URL}assets/Ceremony/"
+RSS_FEED_PATH = LOGSEQ_ASSETS_FOLDER / "RSS.xml"
 
 DATE_FORMAT = "%Y-%m-%d"
 SHORT_DATE_FORMAT = "%y.%m.%d"
+EPISODE_RECORDING_DIR_NAME_FORMAT = f"GitP.{SHORT_DATE_FORMAT} Project"
 EPISODE_YAML_FILENAME = "episode.yml"
+MANIFEST_FILENAME = ".manifest.json"
 
 
 def get_relative_path(path: Path) -> Path:
     """
     Get the path relative to the repository root.
+    Paths outside of the repository are returned unchanged.
     """
-    return path.relative_to(REPO_ROOT)
+    try:
+        return path.relative_to(REPO_ROOT)
+    except ValueError:
+        return path
@@ -0,0 +1,292 @@
+"""
+client.py
+
+The shared LLM client layer.
+
+- get_client returns a process-wide OpenAI client whose HTTP connections are
+  pooled and kept alive, so calls after the first skip the TLS handshake.
+- create_completion, parse_completion and async_parse_completion make
+  calls through the SDK's public chat.completions.create and
+  beta.chat.completions.parse, retrying 429, 5xx and connection errors with
+  exponential backoff.
+- Every call, and every response served from a cache, is recorded as one
+  JSON line in AI_TELEMETRY_LOG with its latency, token usage and retries.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, TypeVar
+
+import coloredlogs
+import httpx
+from dotenv import load_dotenv
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI, OpenAI
+from openai.types.chat import ChatCompletion
+from openai.types.chat.parsed_chat_completion import ParsedChatCompletion
+from pydantic import BaseModel
+
+from gitp_acolyte.constants import CACHE_DIR
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+AI_TELEMETRY_LOG = CACHE_DIR / "ai_telemetry.jsonl"
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+HTTP_LIMITS = httpx.Limits(
+    max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0
+)
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+Completion = TypeVar("Completion", bound=ChatCompletion)
+
+_clients: dict[int, OpenAI] = {}
+_clients_lock = threading.Lock()
+
+
+@dataclass
+class CallTelemetry:
+    """
+    One model call, or one response served from a cache instead.
+    """
+
+    name: str
+    model: str
+    latency_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    retries: int = 0
+    cache_hit: bool = False
+    error: str | None = None
+    timestamp: str = field(
+        default_factory=lambda: datetime.now().isoformat(timespec="seconds")
+    )
+
+
+def record_telemetry(telemetry: CallTelemetry):
+    """
+    Appends telemetry to AI_TELEMETRY_LOG as one JSON line. Lines are short
+    enough for O_APPEND writes from several processes not to interleave.
+    """
+    log_path: Path = AI_TELEMETRY_LOG
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(asdict(telemetry)) + "\n"
+    fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line.encode())
+    finally:
+        os.close(fd)
+
+
+def get_client() -> OpenAI:
+    """
+    Returns this process's OpenAI client, creating it on first use.
+    Forked worker processes get their own client rather than sharing the
+    parent's sockets. Retries are made by create_completion, so the client
+    makes none.
+    """
+    pid = os.getpid()
+    with _clients_lock:
+        client = _clients.get(pid)
+        if client is None:
+            load_dotenv()
+            client = OpenAI(
+                http_client=httpx.Client(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS),
+                max_retries=0,
+            )
+            _clients[pid] = client
+    return client
+
+
+def make_async_client(**kwargs) -> AsyncOpenAI:
+    """
+    Returns a new AsyncOpenAI client with the same pooling and timeouts as
+    get_client. Async clients are bound to an event loop, so callers own and
+    close them, e.g. with `async with make_async_client() as client`.
+    """
+    load_dotenv()
+    return AsyncOpenAI(
+        http_client=httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS),
+        max_retries=0,
+        **kwargs,
+    )
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, APIConnectionError)
+
+
+def retry_delay(attempt: int, error: Exception) -> float:
+    """
+    The seconds to wait before retrying: the server's Retry-After if it sent
+    one, otherwise exponential backoff with full jitter.
+    """
+    if isinstance(error, APIStatusError):
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), BACKOFF_MAX_SECONDS)
+            except ValueError:
+                pass
+    return random.uniform(
+        0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+    )
+
+
+def _finish_call(
+    telemetry: CallTelemetry,
+    start: float,
+    completion: ChatCompletion | None = None,
+    error: Exception | None = None,
+):
+    telemetry.latency_seconds = round(time.perf_counter() - start, 3)
+    if completion is not None and completion.usage is not None:
+        telemetry.prompt_tokens = completion.usage.prompt_tokens
+        telemetry.completion_tokens = completion.usage.completion_tokens
+    if error is not None:
+        telemetry.error = f"{type(error).__name__}: {error}"
+    record_telemetry(telemetry)
+
+
+def call_with_retries(
+    call: Callable[[], Completion],
+    model: str,
+    name: str,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> Completion:
+    """
+    Makes call, retrying 429, 5xx and connection errors, and records its
+    telemetry under name.
+    """
+    telemetry = CallTelemetry(name=name, model=model)
+    start = time.perf_counter()
+    for attempt in range(max_retries + 1):
+        try:
+            completion = call()
+        except (APIStatusError, APIConnectionError) as e:
+            if attempt == max_retries or not is_retryable(e):
+                _finish_call(telemetry, start, error=e)
+                raise
+            delay = retry_delay(attempt, e)
+            logger.warning(f"{e}; retrying in {delay:.1f}s")
+            telemetry.retries += 1
+            time.sleep(delay)
+            continue
+        _finish_call(telemetry, start, completion)
+        return completion
+
+
+async def async_call_with_retries(
+    call: Callable[[], Awaitable[Completion]],
+    model: str,
+    name: str,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    before_attempt: Callable[[], Awaitable[None]] | None = None,
+) -> Completion:
+    """
+    The asyncio version of call_with_retries. before_attempt, e.g. a rate
+    limiter, is awaited before every attempt.
+    """
+    telemetry = CallTelemetry(name=name, model=model)
+    start = time.perf_counter()
+    for attempt in range(max_retries + 1):
+        if before_attempt is not None:
+            await before_attempt()
+        try:
+            completion = await call()
+        except (APIStatusError, APIConnectionError) as e:
+            if attempt == max_retries or not is_retryable(e):
+                _finish_call(telemetry, start, error=e)
+                raise
+            delay = retry_delay(attempt, e)
+            logger.warning(f"{e}; retrying in {delay:.1f}s")
+            telemetry.retries += 1
+            await asyncio.sleep(delay)
+            continue
+        _finish_call(telemetry, start, completion)
+        return completion
+
+
+def create_completion(
+    messages: list[dict],
+    model: str,
+    name: str,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    **kwargs,
+) -> ChatCompletion:
+    """
+    Makes a chat completion call with the shared client, retrying 429, 5xx
+    and connection errors, and records its telemetry under name.
+    """
+    client = get_client()
+    return call_with_retries(
+        lambda: client.chat.completions.create(
+            messages=messages, model=model, **kwargs
+        ),
+        model,
+        name,
+        max_retries,
+    )
+
+
+def parse_completion(
+    messages: list[dict],
+    model: str,
+    response_format: type[ResponseModel],
+    name: str,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> ParsedChatCompletion[ResponseModel]:
+    """
+    Makes a structured-output call with client.beta.chat.completions.parse
+    on the shared client, with the retries and telemetry of create_completion.
+    """
+    client = get_client()
+    return call_with_retries(
+        lambda: client.beta.chat.completions.parse(
+            messages=messages, model=model, response_format=response_format
+        ),
+        model,
+        name,
+        max_retries,
+    )
+
+
+async def async_parse_completion(
+    client: AsyncOpenAI,
+    messages: list[dict],
+    model: str,
+    response_format: type[ResponseModel],
+    name: str,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    before_attempt: Callable[[], Awaitable[None]] | None = None,
+) -> ParsedChatCompletion[ResponseModel]:
+    """
+    The asyncio version of parse_completion, using the given client. before_attempt,
+    e.g. a rate limiter, is awaited before every attempt.
+    """
+    return await async_call_with_retries(
+        lambda: client.beta.chat.completions.parse(
+            messages=messages, model=model, response_format=response_format
+        ),
+        model,
+        name,
+        max_retries,
+        before_attempt,
+    )
@@ -0,0 +1,155 @@
+"""
+response_cache.py
+
+An on-disk cache of parsed structured-output responses.
+
+Each entry is a JSON file named after its key, which callers derive with
+make_cache_key from everything that determines the response (inputs,
+prompts, model and response schema). An entry's mtime records when it was
+last used: entries unused for max_age_seconds expire, and the least
+recently used entries are evicted once the cache exceeds max_bytes.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import TypeVar
+
+import coloredlogs
+from pydantic import BaseModel, ValidationError
+
+from gitp_acolyte.constants import CACHE_DIR
+from gitp_acolyte.utils.hashing import hash_bytes
+
+# Configure logging
+logger = logging.getLogger(__name__)
+coloredlogs.install(
+    level="DEBUG",
+    logger=logger,
+    fmt="%(asctime)s - %(module)s - %(levelname)s - %(message)s",
+)
+
+AI_RESPONSE_CACHE_DIR = CACHE_DIR / "ai_responses"
+DEFAULT_MAX_CACHE_BYTES = 50 * 1024 * 1024
+DEFAULT_MAX_CACHE_AGE_SECONDS = 30 * 24 * 60 * 60
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+
+def make_cache_key(*parts) -> str:
+    """
+    Returns a digest of parts, which must be JSON serializable.
+    """
+    return hash_bytes(json.dumps(parts, sort_keys=True).encode())
+
+
+def remove_if_unchanged(path: Path, mtime_ns: int):
+    """
+    Removes the cache entry at path unless it was rewritten or used since
+    its mtime was mtime_ns, or it is already gone.
+    """
+    try:
+        if path.stat().st_mtime_ns != mtime_ns:
+            return
+    except FileNotFoundError:
+        return
+    path.unlink(missing_ok=True)
+
+
+class ResponseCache:
+    """
+    Parsed model responses stored as one JSON file per key.
+    """
+
+    def __init__(
+        self,
+        directory: Path = AI_RESPONSE_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+        max_age_seconds: float = DEFAULT_MAX_CACHE_AGE_SECONDS,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(
+        self, key: str, response_format: type[ResponseModel]
+    ) -> ResponseModel | None:
+        """
+        Returns the cached response for key, or None on a miss.
+        A hit marks the entry as recently used.
+        """
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            value = response_format.model_validate_json(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except ValidationError:
+            logger.warning(f"Discarding unreadable cache entry {path.name}")
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # evicted by another process since it was read
+            pass
+        logger.debug(f"Response cache hit: {key}")
+        return value
+
+    def put(self, key: str, value: BaseModel):
+        """
+        Atomically stores value under key, then evicts entries if needed.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(value.model_dump_json())
+            os.replace(tmp_name, self._path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict(keep=self._path(key))
+
+    def evict(self, keep: Path | None = None):
+        """
+        Removes expired entries, then the least recently used entries until
+        the cache fits in max_bytes, never removing keep.
+
+        Other processes may write, use or evict entries meanwhile, so an entry
+        that disappeared is skipped, and one whose mtime changed since it was
+        scanned was just written or used and is kept.
+        """
+        now = time.time()
+        entries = []
+        with os.scandir(self.directory) as dir_entries:
+            for entry in dir_entries:
+                if not entry.name.endswith(".json") or entry.path == str(keep):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime > self.max_age_seconds:
+                    remove_if_unchanged(Path(entry.path), stat.st_mtime_ns)
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, Path(entry.path)))
+        total_bytes = sum(size for _, size, _ in entries)
+        if keep is not None:
+            try:
+                total_bytes += keep.stat().st_size
+            except FileNotFoundError:
+                pass
+        for mtime_ns, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            remove_if_unchanged(path, mtime_ns)
+            total_bytes -= size
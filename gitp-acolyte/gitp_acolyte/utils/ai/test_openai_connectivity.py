@@ -1,15 +1,7 @@
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
+from gitp_acolyte.utils.ai.client import create_completion
 
 def test_openai_connectivity():
-    load_dotenv()
-    client = OpenAI(
-        # this is the default and can be omitted
-        # api_key=os.environ.get("OPENAI_API_KEY")
-    )
-
-    chat_completion = client.chat.completions.create(
+    chat_completion = create_completion(
         messages=[
             {
                 "role": "user",
@@ -17,6 +9,7 @@ def test_openai_connectivity():
             }
         ],
         model="gpt-4o-mini",
+        name="test_openai_connectivity",
     )
     print(chat_completion)
 
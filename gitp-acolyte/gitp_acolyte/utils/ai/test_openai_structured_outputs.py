@@ -1,13 +1,9 @@
 from pydantic import BaseModel
-from openai import OpenAI
-from dotenv import load_dotenv
+from gitp_acolyte.utils.ai.client import parse_completion
 
 
 
 def test_openai_structured_outputs():
-    load_dotenv()
-    client = OpenAI()
-
     class Step(BaseModel):
         explanation: str
         output: str
@@ -22,13 +18,14 @@ def test_openai_structured_outputs():
     print(f"{user_prompt=}")
 
     print("Calling OpenAI ...")
-    completion = client.beta.chat.completions.parse(
+    completion = parse_completion(
         model="gpt-4o-2024-08-06",
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ],
         response_format=MathReasoning,
+        name="test_openai_structured_outputs",
     )
 
     math_reasoning = completion.choices[0].message.parsed
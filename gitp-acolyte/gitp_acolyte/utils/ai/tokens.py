@@ -0,0 +1,23 @@
+"""
+tokens.py
+
+Rough token estimates for prompts, good enough for budgets and rate limits
+without depending on a tokenizer.
+"""
+
+# OpenAI's rule of thumb for English text and JSON
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Returns the approximate number of tokens in text.
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def token_budget_chars(tokens: int) -> int:
+    """
+    Returns the approximate number of characters that fit in tokens tokens.
+    """
+    return tokens * CHARS_PER_TOKEN
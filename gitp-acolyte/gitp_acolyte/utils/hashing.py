@@ -0,0 +1,50 @@
+import hashlib
+import mmap
+import os
+from pathlib import Path
+
+HASH_DIGEST_SIZE = 32
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def new_hash():
+    """
+    Returns a new BLAKE2b hash object; the hash used for all content digests.
+    """
+    return hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Returns the hex digest of data.
+    """
+    digest = new_hash()
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def hash_fd(fd: int, length: int | None = None) -> str:
+    """
+    Returns the hex digest of the first length bytes (default: all) of the
+    open file fd, streaming it through a read-only memory map.
+    """
+    if length is None:
+        length = os.fstat(fd).st_size
+    digest = new_hash()
+    if length == 0:
+        return digest.hexdigest()
+    with mmap.mmap(fd, length, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, "madvise"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        with memoryview(mapped) as view:
+            for offset in range(0, length, HASH_CHUNK_SIZE):
+                digest.update(view[offset : offset + HASH_CHUNK_SIZE])
+    return digest.hexdigest()
+
+
+def hash_file(path: Path) -> str:
+    """
+    Returns the hex digest of the contents of the file at path.
+    """
+    with path.open("rb") as f:
+        return hash_fd(f.fileno())
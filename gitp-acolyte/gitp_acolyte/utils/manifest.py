@@ -0,0 +1,208 @@
+"""
+manifest.py
+
+A per-directory manifest of file sizes, modification times and content digests.
+
+Each episode publishing directory keeps a MANIFEST_FILENAME file mapping
+file names to (size, mtime_ns, digest). A file is only re-hashed when its
+size or mtime changed, and a changed mtime with an unchanged digest (e.g.
+after a `git checkout`) is not treated as a content change.
+
+The manifest also records:
+- sources: the (size, mtime_ns) of the recording file each published file
+  was last synced from, so an unchanged source is skipped with one lookup.
+- stamps: named fingerprints that other spells use to tell whether
+  anything in the directory changed since they last ran.
+
+The stats and stamps only hold for the checkout they were recorded in, so
+the garden's .gitignore keeps manifests out of git.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+from gitp_acolyte.constants import MANIFEST_FILENAME
+from gitp_acolyte.utils.hashing import hash_file, new_hash
+
+MANIFEST_VERSION = 1
+
+
+class ManifestEntry(NamedTuple):
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+def stat_key(stat: os.stat_result) -> tuple[int, int]:
+    """
+    The part of a stat result the manifest compares.
+    """
+    return stat.st_size, stat.st_mtime_ns
+
+
+class Manifest:
+    """
+    The manifest of a single directory.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        entries: dict[str, ManifestEntry] | None = None,
+        sources: dict[str, tuple[int, int]] | None = None,
+        stamps: dict[str, str] | None = None,
+    ):
+        self.directory = directory
+        self.entries = entries or {}
+        self.sources = sources or {}
+        self.stamps = stamps or {}
+        self.dirty = False
+
+    @property
+    def path(self) -> Path:
+        return self.directory / MANIFEST_FILENAME
+
+    @classmethod
+    def load(cls, directory: Path) -> "Manifest":
+        """
+        Loads the manifest of directory, or returns an empty one if there is
+        none yet or it cannot be read.
+        """
+        try:
+            with (directory / MANIFEST_FILENAME).open() as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(directory)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(directory)
+        return cls(
+            directory,
+            entries={
+                name: ManifestEntry(*entry) for name, entry in data["files"].items()
+            },
+            sources={name: tuple(key) for name, key in data["sources"].items()},
+            stamps=data["stamps"],
+        )
+
+    def save(self) -> bool:
+        """
+        Atomically writes the manifest if it changed since it was loaded.
+        Returns True if the manifest was written.
+        """
+        if not self.dirty:
+            return False
+        data = {
+            "version": MANIFEST_VERSION,
+            "files": {
+                name: list(entry) for name, entry in sorted(self.entries.items())
+            },
+            "sources": {name: list(key) for name, key in sorted(self.sources.items())},
+            "stamps": dict(sorted(self.stamps.items())),
+        }
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.directory, prefix=f"{MANIFEST_FILENAME}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=1)
+                f.write("\n")
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.dirty = False
+        return True
+
+    def get(self, name: str) -> ManifestEntry | None:
+        return self.entries.get(name)
+
+    def is_current(self, name: str, stat: os.stat_result) -> bool:
+        """
+        Whether the entry for name matches stat without needing a re-hash.
+        """
+        entry = self.entries.get(name)
+        return entry is not None and (entry.size, entry.mtime_ns) == stat_key(stat)
+
+    def record(self, name: str, stat: os.stat_result, digest: str):
+        entry = ManifestEntry(stat.st_size, stat.st_mtime_ns, digest)
+        if self.entries.get(name) != entry:
+            self.entries[name] = entry
+            self.dirty = True
+
+    def forget(self, name: str):
+        if self.entries.pop(name, None) is not None:
+            self.dirty = True
+        if self.sources.pop(name, None) is not None:
+            self.dirty = True
+
+    def digest(self, name: str, stat: os.stat_result | None = None) -> str:
+        """
+        Returns the digest of the file name in the directory, hashing it only
+        if its size or mtime differ from the manifest entry.
+        """
+        if stat is None:
+            stat = (self.directory / name).stat()
+        if self.is_current(name, stat):
+            return self.entries[name].digest
+        digest = hash_file(self.directory / name)
+        self.record(name, stat, digest)
+        return digest
+
+    def is_synced_from(self, name: str, source_stat: os.stat_result) -> bool:
+        """
+        Whether name was last synced from a source with this size and mtime.
+        """
+        return self.sources.get(name) == stat_key(source_stat)
+
+    def record_source(self, name: str, source_stat: os.stat_result):
+        key = stat_key(source_stat)
+        if self.sources.get(name) != key:
+            self.sources[name] = key
+            self.dirty = True
+
+    def refresh(self) -> list[str]:
+        """
+        Brings the manifest up to date with the directory.
+        Only files whose size or mtime changed are hashed.
+        Returns the names of files that were added, removed, or whose
+        content changed.
+        """
+        changed = []
+        seen = set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+                seen.add(entry.name)
+                previous = self.entries.get(entry.name)
+                digest = self.digest(entry.name, entry.stat())
+                if previous is None or previous.digest != digest:
+                    changed.append(entry.name)
+        for name in list(self.entries):
+            if name not in seen:
+                self.forget(name)
+                changed.append(name)
+        return sorted(changed)
+
+    def fingerprint(self, exclude: tuple[str, ...] = ()) -> str:
+        """
+        A digest over the names and digests of all entries not in exclude.
+        """
+        digest = new_hash()
+        for name, entry in sorted(self.entries.items()):
+            if name in exclude:
+                continue
+            digest.update(f"{name}\0{entry.digest}\n".encode())
+        return digest.hexdigest()
+
+    def stamp(self, key: str, value: str):
+        if self.stamps.get(key) != value:
+            self.stamps[key] = value
+            self.dirty = True
+
+    def unstamp(self, key: str):
+        if self.stamps.pop(key, None) is not None:
+            self.dirty = True
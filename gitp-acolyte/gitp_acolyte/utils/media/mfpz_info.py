@@ -0,0 +1,371 @@
+"""
+mfpz_info.py
+
+Reads the name, oscillator and filter type and modification time of a
+MicroFreak patch file (.mfpz) without extracting it.
+
+A .mfpz file is a zip archive holding one member, a boost text archive of
+the preset. Only these parts of the file are read:
+- the end of central directory record and the central directory, at the
+  end of the file, for the member's name, sizes, CRC-32 and modification
+  time
+- the member's local header and its first HEADER_READ_SIZE compressed
+  bytes, which inflate to the archive header with the patch name and the
+  first parameter sections of the preset
+
+The preset is a sequence of 7-bit values: every group of eight starts with
+a byte holding the high bits of the seven bytes that follow. The unpacked
+bytes are sections ("#VCO", "#VCF", ...) of parameters, each a
+length-prefixed name, a "c" marker, the highest choice index (0 for a
+continuous parameter) and a 16-bit little-endian value scaled to
+0..MAX_PARAM_VALUE. A section ends with an empty name.
+
+Results are cached by the file's content digest in MFPZ_INFO_CACHE_DIR, one
+JSON file per digest, so unchanged patches are never opened again.
+"""
+
+import json
+import os
+import re
+import struct
+import tempfile
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from gitp_acolyte.constants import CACHE_DIR
+
+MFPZ_INFO_CACHE_DIR = CACHE_DIR / "mfpz_info"
+MFPZ_INFO_CACHE_VERSION = 1
+EOCD_SIGNATURE = b"PK\x05\x06"
+EOCD_SIZE = 22
+# the end of central directory record may be followed by a comment
+EOCD_SEARCH_SIZE = EOCD_SIZE + 0xFFFF
+CENTRAL_HEADER_SIGNATURE = b"PK\x01\x02"
+CENTRAL_HEADER_SIZE = 46
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+LOCAL_HEADER_SIZE = 30
+STORED = 0
+DEFLATED = 8
+HEADER_READ_SIZE = 512
+ARCHIVE_SIGNATURE = "serialization::archive"
+# the member name is the patch name after a slot prefix, e.g. "0_"
+MEMBER_NAME_PATTERN = re.compile(r"^\d+_(?P<patch_name>.+)$")
+SECTION_MARKER = 0x20
+PARAM_MARKER = 0x40
+CHOICE_MARKER = ord("c")
+MAX_PARAM_VALUE = 0x7FFF
+OSCILLATOR_SECTION = "VCO"
+FILTER_SECTION = "VCF"
+TYPE_PARAM = "Type"
+FILTER_TYPES = ("LPF", "BPF", "HPF")
+
+
+class MfpzFormatError(ValueError):
+    pass
+
+
+class MfpzInfo(NamedTuple):
+    patch_name: str
+    member_name: str
+    modified: str
+    size: int
+    compressed_size: int
+    crc32: str
+    # the position of the oscillator type in the MicroFreak's list, from 0
+    oscillator_type_index: int | None
+    filter_type: str | None
+
+
+class CentralDirectoryEntry(NamedTuple):
+    name: str
+    method: int
+    modified: datetime
+    crc32: int
+    compressed_size: int
+    size: int
+    local_header_offset: int
+
+
+def dos_datetime(dos_date: int, dos_time: int) -> datetime:
+    return datetime(
+        1980 + (dos_date >> 9),
+        (dos_date >> 5) & 0xF or 1,
+        dos_date & 0x1F or 1,
+        dos_time >> 11,
+        (dos_time >> 5) & 0x3F,
+        (dos_time & 0x1F) * 2,
+    )
+
+
+def read_central_directory(f, file_size: int) -> list[CentralDirectoryEntry]:
+    """
+    Reads the central directory from the end of the open zip file f.
+    """
+    tail_size = min(file_size, EOCD_SEARCH_SIZE)
+    f.seek(file_size - tail_size)
+    tail = f.read(tail_size)
+    eocd = tail.rfind(EOCD_SIGNATURE)
+    if eocd == -1 or eocd + EOCD_SIZE > len(tail):
+        raise MfpzFormatError("no zip end of central directory record")
+    entry_count, directory_size, directory_offset = struct.unpack_from(
+        "<HII", tail, eocd + 10
+    )
+    directory_start = file_size - tail_size
+    if directory_offset >= directory_start:
+        directory = tail[directory_offset - directory_start :][:directory_size]
+    else:
+        f.seek(directory_offset)
+        directory = f.read(directory_size)
+
+    entries = []
+    pos = 0
+    for _ in range(entry_count):
+        if directory[pos : pos + 4] != CENTRAL_HEADER_SIGNATURE:
+            raise MfpzFormatError("corrupt zip central directory")
+        (
+            method,
+            dos_time,
+            dos_date,
+            crc32,
+            compressed_size,
+            size,
+            name_length,
+            extra_length,
+            comment_length,
+        ) = struct.unpack_from("<HHHIIIHHH", directory, pos + 10)
+        local_header_offset = struct.unpack_from("<I", directory, pos + 42)[0]
+        name_start = pos + CENTRAL_HEADER_SIZE
+        entries.append(
+            CentralDirectoryEntry(
+                name=directory[name_start : name_start + name_length].decode(
+                    "utf-8", "replace"
+                ),
+                method=method,
+                modified=dos_datetime(dos_date, dos_time),
+                crc32=crc32,
+                compressed_size=compressed_size,
+                size=size,
+                local_header_offset=local_header_offset,
+            )
+        )
+        pos = name_start + name_length + extra_length + comment_length
+    return entries
+
+
+def read_member_head(f, entry: CentralDirectoryEntry, size: int) -> bytes:
+    """
+    Returns up to size bytes from the start of the member's data,
+    inflating only the compressed bytes needed for them.
+    """
+    f.seek(entry.local_header_offset)
+    header = f.read(LOCAL_HEADER_SIZE)
+    if header[:4] != LOCAL_HEADER_SIGNATURE:
+        raise MfpzFormatError("corrupt zip local header")
+    name_length, extra_length = struct.unpack_from("<HH", header, 26)
+    f.seek(name_length + extra_length, 1)
+    data = f.read(min(size, entry.compressed_size))
+    if entry.method == STORED:
+        return data
+    if entry.method != DEFLATED:
+        raise MfpzFormatError(f"unsupported zip compression method {entry.method}")
+    try:
+        return zlib.decompressobj(-zlib.MAX_WBITS).decompress(data)
+    except zlib.error as e:
+        raise MfpzFormatError(f"corrupt patch data: {e}") from None
+
+
+class ArchiveReader:
+    """
+    Reads the space-separated fields of the start of a boost text archive.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def field(self) -> str:
+        end = self.text.find(" ", self.pos)
+        if end == -1:
+            raise EOFError
+        value = self.text[self.pos : end]
+        self.pos = end + 1
+        return value
+
+    def integer(self) -> int:
+        value = self.field()
+        if not value.isdigit():
+            raise MfpzFormatError(f"expected a number in the patch, found {value!r}")
+        return int(value)
+
+    def string(self) -> str:
+        length = self.integer()
+        value = self.text[self.pos : self.pos + length]
+        self.pos += length + 1
+        return value
+
+
+def unpack_7bit(values: list[int]) -> bytes:
+    """
+    Unpacks groups of a high-bits byte followed by seven 7-bit bytes.
+    """
+    unpacked = bytearray()
+    for start in range(0, len(values), 8):
+        high_bits = values[start]
+        for i, value in enumerate(values[start + 1 : start + 8]):
+            unpacked.append(value | (0x80 if high_bits >> i & 1 else 0))
+    return bytes(unpacked)
+
+
+def parse_choice_params(preset: bytes) -> dict[tuple[str, str], int]:
+    """
+    The choice index of every choice parameter by (section, name), up to
+    the end of preset or the first part that cannot be parsed.
+    """
+    choices = {}
+    section = ""
+    pos = 0
+    while pos < len(preset):
+        marker = preset[pos]
+        if marker & 0xE0 == SECTION_MARKER:
+            length = marker - SECTION_MARKER
+            section = preset[pos + 1 : pos + 1 + length].decode("ascii", "replace")
+            pos += 1 + length
+            continue
+        if marker & 0xE0 != PARAM_MARKER:
+            break
+        length = marker - PARAM_MARKER
+        if not length:
+            pos += 1
+            continue
+        name_end = pos + 1 + length
+        if name_end + 4 > len(preset) or preset[name_end] != CHOICE_MARKER:
+            break
+        name = preset[pos + 1 : name_end].decode("ascii", "replace")
+        highest_choice = preset[name_end + 1]
+        value = int.from_bytes(preset[name_end + 2 : name_end + 4], "little")
+        if highest_choice:
+            choices[(section, name)] = round(value * highest_choice / MAX_PARAM_VALUE)
+        pos = name_end + 4
+    return choices
+
+
+def parse_archive_head(text: str) -> tuple[str, dict[tuple[str, str], int]]:
+    """
+    Parses the patch name and the choice parameters in the start of the
+    preset's boost text archive.
+    """
+    reader = ArchiveReader(text)
+    try:
+        if reader.string() != ARCHIVE_SIGNATURE:
+            raise MfpzFormatError("not a MicroFreak preset archive")
+        # the archive version, and the class and object ids of the preset
+        for _ in range(5):
+            reader.integer()
+        patch_name = reader.string()
+    except EOFError:
+        raise MfpzFormatError("truncated preset archive header") from None
+    values = []
+    try:
+        # the preset's fields up to its parameter bytes: e.g.
+        # "7 0 0 18 000000000000000000 0 0 51 4672"
+        for _ in range(3):
+            reader.integer()
+        reader.string()
+        for _ in range(3):
+            reader.integer()
+        count = reader.integer()
+        for _ in range(count):
+            values.append(reader.integer())
+    except EOFError:
+        # only the head of the archive was inflated
+        values = values[: len(values) // 8 * 8]
+    except MfpzFormatError:
+        values = []
+    return patch_name, parse_choice_params(unpack_7bit(values))
+
+
+def read_mfpz_info(path: Path) -> MfpzInfo:
+    """
+    Reads the header information of the patch file at path.
+    Raises MfpzFormatError if it is not a MicroFreak patch file.
+    """
+    with path.open("rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        entries = read_central_directory(f, file_size)
+        if not entries:
+            raise MfpzFormatError("empty patch file")
+        entry = entries[0]
+        head = read_member_head(f, entry, HEADER_READ_SIZE)
+    patch_name, choices = parse_archive_head(head.decode("latin-1"))
+    if not patch_name:
+        match = MEMBER_NAME_PATTERN.match(entry.name)
+        patch_name = match["patch_name"] if match else entry.name
+    filter_index = choices.get((FILTER_SECTION, TYPE_PARAM))
+    return MfpzInfo(
+        patch_name=patch_name,
+        member_name=entry.name,
+        modified=entry.modified.isoformat(),
+        size=entry.size,
+        compressed_size=entry.compressed_size,
+        crc32=f"{entry.crc32:08x}",
+        oscillator_type_index=choices.get((OSCILLATOR_SECTION, TYPE_PARAM)),
+        filter_type=(
+            FILTER_TYPES[filter_index]
+            if filter_index is not None and filter_index < len(FILTER_TYPES)
+            else None
+        ),
+    )
+
+
+class MfpzInfoCache:
+    """
+    Patch file info stored as one JSON file per content digest.
+    """
+
+    def __init__(self, directory: Path = MFPZ_INFO_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.json"
+
+    def get(self, digest: str) -> MfpzInfo | None:
+        try:
+            with self._path(digest).open() as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if data.get("version") != MFPZ_INFO_CACHE_VERSION:
+            return None
+        try:
+            return MfpzInfo(**data["info"])
+        except TypeError:
+            return None
+
+    def put(self, digest: str, info: MfpzInfo):
+        """
+        Atomically writes the info of the patch file with digest.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {"version": MFPZ_INFO_CACHE_VERSION, "info": info._asdict()}, f
+                )
+            os.replace(tmp_name, self._path(digest))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def read(self, path: Path, digest: str) -> MfpzInfo:
+        """
+        The info of the patch file at path, whose content digest is digest,
+        from the cache if possible.
+        """
+        info = self.get(digest)
+        if info is None:
+            info = read_mfpz_info(path)
+            self.put(digest, info)
+        return info
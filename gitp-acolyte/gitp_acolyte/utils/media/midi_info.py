@@ -0,0 +1,270 @@
+"""
+midi_info.py
+
+Reads the tempo map, time signatures, note count, pitch range and duration
+of Standard MIDI Files.
+
+Each file is read once and parsed through a memoryview, so the track chunks
+are never copied, and variable-length quantities are decoded in place byte
+by byte. Only the events that matter are interpreted: tempo and time
+signature meta events, and note-ons; every other event is skipped by its
+length.
+
+Many files are read with read_midi_infos, which spreads them over a thread
+pool so reading one file overlaps with parsing another.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+HEADER_CHUNK_ID = b"MThd"
+TRACK_CHUNK_ID = b"MTrk"
+CHUNK_HEADER_SIZE = 8
+META_EVENT = 0xFF
+SYSEX_EVENT = 0xF0
+SYSEX_ESCAPE_EVENT = 0xF7
+TEMPO_META_TYPE = 0x51
+TIME_SIGNATURE_META_TYPE = 0x58
+END_OF_TRACK_META_TYPE = 0x2F
+NOTE_ON_STATUS = 0x90
+# data bytes after a channel message status, by its high nibble
+CHANNEL_MESSAGE_LENGTHS = {
+    0x80: 2,
+    0x90: 2,
+    0xA0: 2,
+    0xB0: 2,
+    0xC0: 1,
+    0xD0: 1,
+    0xE0: 2,
+}
+# the tempo until the first tempo event: 120 BPM
+DEFAULT_TEMPO_US_PER_BEAT = 500_000
+NOTE_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+DEFAULT_READ_WORKERS = 8
+
+
+class MidiFormatError(ValueError):
+    pass
+
+
+class TempoChange(NamedTuple):
+    tick: int
+    bpm: float
+
+
+class TimeSignatureChange(NamedTuple):
+    tick: int
+    time_signature: str
+
+
+class TrackSummary(NamedTuple):
+    # (tick, microseconds per beat)
+    tempos: list[tuple[int, int]]
+    time_signatures: list[TimeSignatureChange]
+    note_count: int
+    lowest_note: int | None
+    highest_note: int | None
+    end_tick: int
+
+
+class MidiInfo(NamedTuple):
+    format: int
+    track_count: int
+    ticks_per_beat: int | None
+    tempo_map: list[TempoChange]
+    time_signatures: list[TimeSignatureChange]
+    note_count: int
+    lowest_note: str | None
+    highest_note: str | None
+    duration_seconds: float
+
+
+def note_name(note: int) -> str:
+    """
+    The scientific pitch name of a MIDI note number; 60 is C4.
+    """
+    return f"{NOTE_NAMES[note % 12]}{note // 12 - 1}"
+
+
+def read_vlq(data: memoryview, pos: int) -> tuple[int, int]:
+    """
+    Decodes the variable-length quantity at pos.
+    Returns the value and the position after it.
+    """
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos
+
+
+def parse_track(data: memoryview) -> TrackSummary:
+    """
+    Walks the events of one track chunk's data.
+    """
+    tempos = []
+    time_signatures = []
+    note_count = 0
+    lowest = highest = None
+    tick = 0
+    pos = 0
+    status = 0
+    end = len(data)
+    while pos < end:
+        delta, pos = read_vlq(data, pos)
+        tick += delta
+        byte = data[pos]
+        if byte & 0x80:
+            status = byte
+            pos += 1
+        elif not status:
+            raise MidiFormatError("running status without a previous status")
+        if status == META_EVENT:
+            meta_type = data[pos]
+            length, pos = read_vlq(data, pos + 1)
+            if meta_type == TEMPO_META_TYPE and length == 3:
+                tempo = int.from_bytes(data[pos : pos + 3], "big")
+                if tempo:
+                    tempos.append((tick, tempo))
+            elif meta_type == TIME_SIGNATURE_META_TYPE and length >= 2:
+                time_signatures.append(
+                    TimeSignatureChange(tick, f"{data[pos]}/{2 ** data[pos + 1]}")
+                )
+            elif meta_type == END_OF_TRACK_META_TYPE:
+                break
+            pos += length
+            # meta and sysex events cancel running status
+            status = 0
+        elif status in (SYSEX_EVENT, SYSEX_ESCAPE_EVENT):
+            length, pos = read_vlq(data, pos)
+            pos += length
+            status = 0
+        else:
+            kind = status & 0xF0
+            if kind == NOTE_ON_STATUS and data[pos + 1]:
+                note = data[pos]
+                note_count += 1
+                if lowest is None or note < lowest:
+                    lowest = note
+                if highest is None or note > highest:
+                    highest = note
+            pos += CHANNEL_MESSAGE_LENGTHS.get(kind, 0)
+    if pos > end:
+        raise MidiFormatError("truncated track")
+    return TrackSummary(tempos, time_signatures, note_count, lowest, highest, tick)
+
+
+def ticks_to_seconds(
+    ticks: int, tempos: list[tuple[int, int]], ticks_per_beat: int
+) -> float:
+    """
+    The time at ticks under the tempo map of (tick, microseconds per beat)
+    changes, sorted by tick.
+    """
+    seconds = 0.0
+    last_tick = 0
+    us_per_beat = DEFAULT_TEMPO_US_PER_BEAT
+    for tempo_tick, tempo in tempos:
+        if tempo_tick >= ticks:
+            break
+        seconds += (tempo_tick - last_tick) * us_per_beat / ticks_per_beat / 1e6
+        last_tick, us_per_beat = tempo_tick, tempo
+    return seconds + (ticks - last_tick) * us_per_beat / ticks_per_beat / 1e6
+
+
+def parse_midi(data: memoryview) -> MidiInfo:
+    """
+    Parses a Standard MIDI File.
+    Raises MidiFormatError if it is not one or a chunk is truncated.
+    """
+    if data[:4] != HEADER_CHUNK_ID or len(data) < 14:
+        raise MidiFormatError("not a Standard MIDI File")
+    header_length = int.from_bytes(data[4:8], "big")
+    smf_format = int.from_bytes(data[8:10], "big")
+    track_count = int.from_bytes(data[10:12], "big")
+    division = int.from_bytes(data[12:14], "big")
+    if not division & 0x7FFF or division & 0x8000 and not division & 0xFF:
+        raise MidiFormatError("invalid time division")
+
+    tracks = []
+    pos = CHUNK_HEADER_SIZE + header_length
+    while pos + CHUNK_HEADER_SIZE <= len(data):
+        chunk_id = data[pos : pos + 4]
+        length = int.from_bytes(data[pos + 4 : pos + 8], "big")
+        start = pos + CHUNK_HEADER_SIZE
+        pos = start + length
+        if chunk_id != TRACK_CHUNK_ID:
+            # unknown chunks must be skipped
+            continue
+        if pos > len(data):
+            raise MidiFormatError("truncated track chunk")
+        try:
+            tracks.append(parse_track(data[start:pos]))
+        except IndexError:
+            raise MidiFormatError("truncated event") from None
+
+    tempos = sorted(tempo for track in tracks for tempo in track.tempos)
+    end_tick = max((track.end_tick for track in tracks), default=0)
+    if division & 0x8000:
+        # SMPTE timing: negative frames per second and ticks per frame
+        frames_per_second = 256 - (division >> 8)
+        ticks_per_beat = None
+        duration = end_tick / (frames_per_second * (division & 0xFF))
+        tempo_map = []
+    else:
+        ticks_per_beat = division
+        duration = ticks_to_seconds(end_tick, tempos, ticks_per_beat)
+        if not tempos or tempos[0][0] > 0:
+            tempos.insert(0, (0, DEFAULT_TEMPO_US_PER_BEAT))
+        tempo_map = [
+            TempoChange(tick, round(60e6 / us_per_beat, 3))
+            for tick, us_per_beat in tempos
+        ]
+    lows = [track.lowest_note for track in tracks if track.lowest_note is not None]
+    highs = [track.highest_note for track in tracks if track.highest_note is not None]
+    return MidiInfo(
+        format=smf_format,
+        track_count=track_count,
+        ticks_per_beat=ticks_per_beat,
+        tempo_map=tempo_map,
+        # DAWs repeat the time signature in several tracks (or twice in one),
+        # so the same change can appear more than once
+        time_signatures=sorted(
+            {change for track in tracks for change in track.time_signatures}
+        ),
+        note_count=sum(track.note_count for track in tracks),
+        lowest_note=note_name(min(lows)) if lows else None,
+        highest_note=note_name(max(highs)) if highs else None,
+        duration_seconds=round(duration, 3),
+    )
+
+
+def read_midi_info(path: Path) -> MidiInfo:
+    """
+    Reads and parses the MIDI file at path.
+    """
+    return parse_midi(memoryview(path.read_bytes()))
+
+
+def read_midi_infos(
+    paths: list[Path], max_workers: int = DEFAULT_READ_WORKERS
+) -> dict[Path, MidiInfo | Exception]:
+    """
+    Reads many MIDI files on a thread pool, in a single pass.
+    Returns each path's MidiInfo, or the exception that reading it raised,
+    in the order of paths.
+    """
+
+    def read(path: Path) -> MidiInfo | Exception:
+        try:
+            return read_midi_info(path)
+        except (OSError, MidiFormatError) as e:
+            return e
+
+    if len(paths) <= 1:
+        return {path: read(path) for path in paths}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(paths, executor.map(read, paths)))
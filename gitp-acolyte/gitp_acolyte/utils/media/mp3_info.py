@@ -0,0 +1,215 @@
+"""
+mp3_info.py
+
+Reads the duration, bitrate and stream parameters of an MP3 file from its
+headers alone, without decoding any audio.
+
+The file is memory-mapped, and only the pages holding the ID3v2 tag header,
+the first MPEG audio frame and the ID3v1 tag are touched:
+- the ID3v2 tag at the start of the file is skipped using its header
+- the first frame header gives the MPEG version, layer, bitrate, sample rate
+  and channels
+- a Xing/Info or VBRI header in the first frame gives the frame count of a
+  VBR file, and so its exact duration
+- otherwise the file is CBR, and its duration is its audio bytes over its
+  bitrate
+"""
+
+import mmap
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+ID3V2_HEADER_SIZE = 10
+ID3V1_TAG_SIZE = 128
+# how far past the ID3v2 tag to look for the first frame, e.g. over padding
+FRAME_SEARCH_LIMIT = 64 * 1024
+
+MPEG_VERSIONS = {0b00: 2.5, 0b10: 2, 0b11: 1}
+LAYERS = {0b01: 3, 0b10: 2, 0b11: 1}
+# kbps by (MPEG version 1 or not, layer), indexed by the header's bitrate bits
+BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    2.5: (11025, 12000, 8000),
+}
+MONO_CHANNEL_MODE = 0b11
+XING_FRAMES_FLAG = 0x1
+VBRI_OFFSET = 4 + 32
+
+
+class Mp3FormatError(ValueError):
+    pass
+
+
+class FrameHeader(NamedTuple):
+    mpeg_version: float
+    layer: int
+    bitrate_kbps: int
+    sample_rate: int
+    padding: int
+    channels: int
+
+    @property
+    def samples_per_frame(self) -> int:
+        if self.layer == 1:
+            return 384
+        if self.layer == 3 and self.mpeg_version != 1:
+            return 576
+        return 1152
+
+    @property
+    def frame_length(self) -> int:
+        if self.layer == 1:
+            return (
+                12 * self.bitrate_kbps * 1000 // self.sample_rate + self.padding
+            ) * 4
+        return (
+            self.samples_per_frame // 8 * self.bitrate_kbps * 1000 // self.sample_rate
+            + self.padding
+        )
+
+    @property
+    def side_info_length(self) -> int:
+        """
+        The length of the Layer III side information after the header, where
+        a Xing/Info header starts.
+        """
+        if self.mpeg_version == 1:
+            return 17 if self.channels == 1 else 32
+        return 9 if self.channels == 1 else 17
+
+
+class Mp3Info(NamedTuple):
+    duration_seconds: float
+    bitrate_kbps: int
+    sample_rate: int
+    channels: int
+    byte_length: int
+    vbr: bool
+
+
+def id3v2_tag_length(data: bytes | mmap.mmap) -> int:
+    """
+    The length of the ID3v2 tag at the start of data, including its header
+    and footer, or 0 if there is none.
+    """
+    if data[:3] != b"ID3" or len(data) < ID3V2_HEADER_SIZE:
+        return 0
+    flags = data[5]
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = ID3V2_HEADER_SIZE if flags & 0x10 else 0
+    return ID3V2_HEADER_SIZE + size + footer
+
+
+def parse_frame_header(header: bytes) -> FrameHeader | None:
+    """
+    Parses a 4-byte MPEG audio frame header, or returns None if it is not one.
+    """
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = MPEG_VERSIONS.get((header[1] >> 3) & 0b11)
+    layer = LAYERS.get((header[1] >> 1) & 0b11)
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0b11
+    if (
+        version is None
+        or layer is None
+        or bitrate_index in (0, 0b1111)
+        or sample_rate_index == 0b11
+    ):
+        return None
+    return FrameHeader(
+        mpeg_version=version,
+        layer=layer,
+        bitrate_kbps=BITRATES[(version == 1, layer)][bitrate_index],
+        sample_rate=SAMPLE_RATES[version][sample_rate_index],
+        padding=(header[2] >> 1) & 1,
+        channels=1 if header[3] >> 6 == MONO_CHANNEL_MODE else 2,
+    )
+
+
+def find_first_frame(data: mmap.mmap, start: int) -> tuple[int, FrameHeader]:
+    """
+    Returns the offset and header of the first frame at or after start that
+    is followed by another valid frame header, to skip false syncs.
+    """
+    end = min(len(data), start + FRAME_SEARCH_LIMIT)
+    offset = data.find(b"\xff", start, end)
+    while offset != -1:
+        header = parse_frame_header(data[offset : offset + 4])
+        if header is not None:
+            next_offset = offset + header.frame_length
+            if next_offset + 4 > len(data) or parse_frame_header(
+                data[next_offset : next_offset + 4]
+            ):
+                return offset, header
+        offset = data.find(b"\xff", offset + 1, end)
+    raise Mp3FormatError("no MPEG audio frame found")
+
+
+def info_frame_count(
+    data: mmap.mmap, offset: int, header: FrameHeader
+) -> tuple[bytes, int] | None:
+    """
+    The tag ("Xing", "Info" or "VBRI") and frame count of the info header in
+    the frame at offset, if it has one with a frame count. Encoders write
+    "Info" instead of "Xing" for CBR files.
+    """
+    xing = offset + 4 + header.side_info_length
+    tag = data[xing : xing + 4]
+    if tag in (b"Xing", b"Info"):
+        flags = int.from_bytes(data[xing + 4 : xing + 8], "big")
+        if flags & XING_FRAMES_FLAG:
+            return tag, int.from_bytes(data[xing + 8 : xing + 12], "big")
+        return None
+    vbri = offset + VBRI_OFFSET
+    if data[vbri : vbri + 4] == b"VBRI":
+        return b"VBRI", int.from_bytes(data[vbri + 14 : vbri + 18], "big")
+    return None
+
+
+def read_mp3_info(path: Path) -> Mp3Info:
+    """
+    Reads the header information of the MP3 file at path.
+    Raises Mp3FormatError if it has no MPEG audio frames.
+    """
+    with path.open("rb") as f:
+        byte_length = os.fstat(f.fileno()).st_size
+        if byte_length == 0:
+            raise Mp3FormatError("empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset, header = find_first_frame(data, id3v2_tag_length(data))
+            info = info_frame_count(data, offset, header)
+            audio_end = byte_length
+            id3v1 = byte_length - ID3V1_TAG_SIZE
+            if id3v1 > offset and data[id3v1 : id3v1 + 3] == b"TAG":
+                audio_end -= ID3V1_TAG_SIZE
+    audio_bytes = audio_end - offset
+    if info and info[1]:
+        tag, frames = info
+        duration = frames * header.samples_per_frame / header.sample_rate
+        bitrate_kbps = round(audio_bytes * 8 / duration / 1000)
+        vbr = tag != b"Info"
+    else:
+        duration = audio_bytes * 8 / (header.bitrate_kbps * 1000)
+        bitrate_kbps = header.bitrate_kbps
+        vbr = False
+    return Mp3Info(
+        duration_seconds=round(duration, 3),
+        bitrate_kbps=bitrate_kbps,
+        sample_rate=header.sample_rate,
+        channels=header.channels,
+        byte_length=byte_length,
+        vbr=vbr,
+    )
@@ -0,0 +1,311 @@
+"""
+waveform.py
+
+Computes the peak envelope and loudness of a WAV render with NumPy.
+
+The data chunk is memory-mapped, never read into memory as a whole:
+- samples wider than 16 bits are viewed in place as their top 16 bits, an
+  unaligned strided int16 view, so a 24-bit render needs no conversion
+  (the bits dropped are below -96 dBFS)
+- the samples are processed in blocks of BLOCK_SUB_BLOCKS sub-blocks of
+  SUB_BLOCK_SECONDS, and only the minimum, maximum and sum of squares of
+  each sub-block are kept
+- the sub-blocks are then reduced to the peak envelope, the RMS level and
+  the integrated loudness
+
+The integrated loudness uses the 400 ms blocks and absolute and relative
+gates of ITU-R BS.1770, over the summed channel power of a stereo or mono
+render. There is no K-weighting pre-filter, which would need a recursive
+filter per sample.
+
+NumPy is an optional dependency, installed with the "analysis" extra.
+"""
+
+import json
+import math
+import struct
+from pathlib import Path
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+SUB_BLOCK_SECONDS = 0.1
+# sub-blocks per processing block, which bounds the memory used to ~10 s of audio
+BLOCK_SUB_BLOCKS = 100
+# sub-blocks per BS.1770 gating block of 400 ms, which overlap by 75%
+GATING_BLOCK_SUB_BLOCKS = 4
+ABSOLUTE_GATE_DB = -70.0
+RELATIVE_GATE_DB = -10.0
+LOUDNESS_OFFSET_DB = -0.691
+DEFAULT_PEAK_COUNT = 2000
+PEAKS_FILE_VERSION = 1
+PEAK_BITS = 8
+
+
+class WavFormatError(ValueError):
+    pass
+
+
+class WavFormat(NamedTuple):
+    format_tag: int
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    block_align: int
+    data_offset: int
+    data_length: int
+
+    @property
+    def frames(self) -> int:
+        return self.data_length // self.block_align
+
+
+class WaveformAnalysis(NamedTuple):
+    duration_seconds: float
+    sample_rate: int
+    channels: int
+    seconds_per_peak: float
+    # (min, max) pairs scaled to signed PEAK_BITS integers
+    peaks: "np.ndarray"
+    peak_dbfs: float
+    rms_dbfs: float
+    integrated_loudness_db: float | None
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError(
+            "Waveform analysis needs NumPy; install it with the 'analysis' extra."
+        )
+
+
+def read_wav_format(path: Path) -> WavFormat:
+    """
+    Reads the fmt chunk and the position of the data chunk of a WAV file,
+    seeking past every other chunk.
+    Raises WavFormatError if it is not a PCM or float WAV file.
+    """
+    with path.open("rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise WavFormatError("not a RIFF WAVE file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise WavFormatError("no data chunk")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"data":
+                if fmt is None:
+                    raise WavFormatError("data chunk before fmt chunk")
+                data_offset = f.tell()
+                # a render still being written may not have its sizes filled in
+                file_size = f.seek(0, 2)
+                return WavFormat(
+                    *fmt,
+                    data_offset=data_offset,
+                    data_length=min(size, file_size - data_offset),
+                )
+            if chunk_id == b"fmt ":
+                body = f.read(size)
+                if len(body) < 16:
+                    raise WavFormatError("truncated fmt chunk")
+                format_tag, channels, sample_rate, _, block_align, bits = (
+                    struct.unpack_from("<HHIIHH", body)
+                )
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    # the first two bytes of the sub-format GUID are the format tag
+                    format_tag = struct.unpack_from("<H", body, 24)[0]
+                fmt = (format_tag, channels, sample_rate, bits, block_align)
+            else:
+                f.seek(size, 1)
+            # chunks are padded to an even length
+            if size % 2:
+                f.seek(1, 1)
+
+
+def sample_view(path: Path, wav_format: WavFormat) -> tuple["np.ndarray", float, float]:
+    """
+    Maps the data chunk as a (frames, channels) array without copying it.
+    Returns the array, and the center and full scale of its values.
+    """
+    require_numpy()
+    sample_width = wav_format.bits_per_sample // 8
+    if wav_format.format_tag == WAVE_FORMAT_IEEE_FLOAT and sample_width in (4, 8):
+        dtype, byte_offset, center, full_scale = f"<f{sample_width}", 0, 0.0, 1.0
+    elif wav_format.format_tag != WAVE_FORMAT_PCM:
+        raise WavFormatError(f"unsupported format tag {wav_format.format_tag:#06x}")
+    elif sample_width == 1:
+        dtype, byte_offset, center, full_scale = np.uint8, 0, 128.0, 128.0
+    elif sample_width in (2, 3, 4):
+        # the top 16 bits of a little-endian sample are its last two bytes
+        dtype, byte_offset, center, full_scale = "<i2", sample_width - 2, 0.0, 32768.0
+    else:
+        raise WavFormatError(f"unsupported sample width {sample_width}")
+    if wav_format.frames == 0:
+        raise WavFormatError("no audio frames")
+    data = np.memmap(
+        path,
+        dtype=np.uint8,
+        mode="r",
+        offset=wav_format.data_offset,
+        shape=(wav_format.frames * wav_format.block_align,),
+    )
+    samples = np.ndarray(
+        shape=(wav_format.frames, wav_format.channels),
+        dtype=dtype,
+        buffer=data,
+        offset=byte_offset,
+        strides=(wav_format.block_align, sample_width),
+    )
+    return samples, center, full_scale
+
+
+def sub_block_stats(
+    samples: "np.ndarray", sub_block_frames: int, center: float
+) -> tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    The minimum and maximum value, the sum of squares over all channels and
+    the frame count of each sub-block of samples, with the values taken
+    about center. The last sub-block may be short.
+
+    Each block is gathered once into a reused contiguous buffer of the
+    samples' own type, where the minimum and maximum are found, and only
+    then converted into a reused float32 buffer for the sum of squares.
+    """
+    frames, channels = samples.shape
+    block_size = sub_block_frames * BLOCK_SUB_BLOCKS * channels
+    sub_block_size = sub_block_frames * channels
+    gathered = np.empty(block_size, dtype=samples.dtype)
+    values = np.empty(block_size, dtype=np.float32)
+    mins, maxs, squares, counts = [], [], [], []
+    for start in range(0, frames, sub_block_frames * BLOCK_SUB_BLOCKS):
+        block = samples[start : start + sub_block_frames * BLOCK_SUB_BLOCKS]
+        size = block.size
+        # a view of one strided run when the frames are packed
+        np.copyto(gathered[:size], block.reshape(-1))
+        np.copyto(values[:size], gathered[:size], casting="unsafe")
+        if center:
+            values[:size] -= center
+        full = size // sub_block_size * sub_block_size
+        bounds = [(0, full, sub_block_size)]
+        if full < size:
+            bounds.append((full, size, size - full))
+        for part_start, part_end, width in bounds:
+            if part_start == part_end:
+                continue
+            part = gathered[part_start:part_end].reshape(-1, width)
+            mins.append(part.min(axis=1))
+            maxs.append(part.max(axis=1))
+            part = values[part_start:part_end].reshape(-1, width)
+            # a batch of row-by-column products, which runs on BLAS
+            squares.append(np.matmul(part[:, None, :], part[:, :, None]).ravel())
+            counts.append(np.full(len(part), width // channels))
+    return (
+        np.concatenate(mins).astype(np.float32) - center,
+        np.concatenate(maxs).astype(np.float32) - center,
+        np.concatenate(squares).astype(np.float64),
+        np.concatenate(counts),
+    )
+
+
+def integrated_loudness(power: "np.ndarray") -> float | None:
+    """
+    The BS.1770 gated loudness of the per-sub-block power summed over the
+    channels, or None if the audio is shorter than a gating block or silent.
+    """
+    if len(power) < GATING_BLOCK_SUB_BLOCKS:
+        return None
+    power = np.lib.stride_tricks.sliding_window_view(
+        power, GATING_BLOCK_SUB_BLOCKS
+    ).mean(axis=1)
+    with np.errstate(divide="ignore"):
+        loudness = LOUDNESS_OFFSET_DB + 10 * np.log10(power)
+    gated = power[loudness > ABSOLUTE_GATE_DB]
+    if not len(gated):
+        return None
+    relative_gate = LOUDNESS_OFFSET_DB + 10 * math.log10(gated.mean())
+    gated = power[loudness > relative_gate + RELATIVE_GATE_DB]
+    return LOUDNESS_OFFSET_DB + 10 * math.log10(gated.mean())
+
+
+def decibels(power_ratio: float) -> float:
+    return 10 * math.log10(power_ratio) if power_ratio > 0 else -math.inf
+
+
+def analyze_wav(path: Path, peak_count: int = DEFAULT_PEAK_COUNT) -> WaveformAnalysis:
+    """
+    Computes the peak envelope, with at most peak_count (min, max) pairs, and
+    the loudness of the WAV file at path.
+    Raises WavFormatError if it is not a PCM or float WAV file.
+    """
+    require_numpy()
+    wav_format = read_wav_format(path)
+    samples, center, full_scale = sample_view(path, wav_format)
+    sub_block_frames = max(1, round(wav_format.sample_rate * SUB_BLOCK_SECONDS))
+    mins, maxs, squares, counts = sub_block_stats(samples, sub_block_frames, center)
+
+    sub_blocks_per_peak = math.ceil(len(mins) / peak_count)
+    starts = np.arange(0, len(mins), sub_blocks_per_peak)
+    envelope = np.stack(
+        [np.minimum.reduceat(mins, starts), np.maximum.reduceat(maxs, starts)],
+        axis=1,
+    )
+    envelope = envelope.astype(np.float64) / full_scale
+    peak_scale = 2 ** (PEAK_BITS - 1)
+    peaks = np.clip(np.rint(envelope * peak_scale), -peak_scale, peak_scale - 1)
+    # every channel has a weight of 1, so the power is the plain sum
+    power = squares / counts / full_scale**2
+    return WaveformAnalysis(
+        duration_seconds=round(wav_format.frames / wav_format.sample_rate, 3),
+        sample_rate=wav_format.sample_rate,
+        channels=wav_format.channels,
+        seconds_per_peak=round(
+            sub_blocks_per_peak * sub_block_frames / wav_format.sample_rate, 3
+        ),
+        peaks=peaks.astype(np.int8),
+        peak_dbfs=decibels(float(np.abs(envelope).max()) ** 2),
+        rms_dbfs=decibels(float(power @ counts) / counts.sum() / wav_format.channels),
+        integrated_loudness_db=integrated_loudness(power),
+    )
+
+
+def rounded_level(level_db: float | None) -> float | None:
+    """
+    A level rounded for storage, or None if there is none or it is -inf.
+    """
+    if level_db is None or not math.isfinite(level_db):
+        return None
+    return round(level_db, 2)
+
+
+def peaks_file_data(analysis: WaveformAnalysis) -> dict:
+    """
+    The contents of a peaks file: the stream parameters, the levels and the
+    envelope as a flat [min, max, min, max, ...] list. The levels of
+    silent audio are null.
+    """
+    return {
+        "version": PEAKS_FILE_VERSION,
+        "duration_seconds": analysis.duration_seconds,
+        "sample_rate": analysis.sample_rate,
+        "channels": analysis.channels,
+        "seconds_per_peak": analysis.seconds_per_peak,
+        "bits": PEAK_BITS,
+        "peak_dbfs": rounded_level(analysis.peak_dbfs),
+        "rms_dbfs": rounded_level(analysis.rms_dbfs),
+        "integrated_loudness_db": rounded_level(analysis.integrated_loudness_db),
+        "peaks": analysis.peaks.ravel().tolist(),
+    }
+
+
+def write_peaks_file(path: Path, analysis: WaveformAnalysis):
+    with path.open("w") as f:
+        json.dump(peaks_file_data(analysis), f, separators=(",", ":"))
+        f.write("\n")
@@ -0,0 +1,87 @@
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from gitp_acolyte.ceremonial.offering.rss_feed import update_feed
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    update_episode_yaml,
+)
+
+# a 128 kbps CBR MPEG-1 layer III frame at 44.1 kHz
+MP3_FRAME = b"\xff\xfb\x90\x44" + b"\x00" * 413
+
+
+def make_episode(assets_folder, episode_date, audio=None):
+    episode_dir = assets_folder / "Ceremony" / episode_date.strftime("%Y/%m/%d")
+    episode_dir.mkdir(parents=True)
+    audio_file = episode_date.strftime("GitP.%Y.%m.%d.mp3")
+    if audio is not None:
+        (episode_dir / audio_file).write_bytes(audio)
+    update_episode_yaml(
+        episode_dir / "episode.yml",
+        {
+            "episode_title": "Ceremony",
+            "episode_date": episode_date.strftime("%Y-%m-%d"),
+            "audio_file": audio_file,
+            "description": "",
+            "patch_files": [],
+            "midi_files": [],
+        },
+    )
+    return episode_dir
+
+
+def test_update_feed_builds_items_from_synced_audio(tmp_path):
+    assets_folder = tmp_path / "assets"
+    feed_path = assets_folder / "RSS.xml"
+    episode_dir = make_episode(assets_folder, datetime(2024, 12, 4), b"ID3" * 100)
+    make_episode(assets_folder, datetime(2025, 1, 3))
+
+    def update():
+        return update_feed(feed_path, assets_folder, tmp_path / "catalog.sqlite3")
+
+    def items():
+        return ET.parse(feed_path).getroot().findall("channel/item")
+
+    assert update()
+    assert not update()
+    [item] = items()
+    enclosure = item.find("enclosure")
+    assert enclosure.get("length") == "300"
+    assert enclosure.get("url") == (
+        "https://codekiln.github.io/gitpa/assets/Ceremony/2024/12/04/GitP.2024.12.04.mp3"
+    )
+    assert item.findtext("pubDate") == "Wed, 04 Dec 2024 15:00:00 +0000"
+    guid = item.findtext("guid")
+
+    update_episode_yaml(episode_dir / "episode.yml", {"description": "Sequencer."})
+    assert update()
+    [item] = items()
+    assert item.findtext("description") == "Sequencer."
+    assert item.findtext("guid") == guid
+
+    (episode_dir / "GitP.2024.12.04.mp3").write_bytes(b"ID3" * 200)
+    assert update()
+    [item] = items()
+    assert item.find("enclosure").get("length") == "600"
+    assert item.findtext("guid") != guid
+
+
+def test_feed_items_have_the_audio_duration(tmp_path):
+    assets_folder = tmp_path / "assets"
+    feed_path = assets_folder / "RSS.xml"
+    make_episode(assets_folder, datetime(2024, 11, 19), b"ID3" * 100)
+    make_episode(assets_folder, datetime(2024, 12, 4), MP3_FRAME * 1000)
+    episode_dir = make_episode(assets_folder, datetime(2025, 1, 3), MP3_FRAME)
+    update_episode_yaml(
+        episode_dir / "episode.yml", {"audio_info": {"duration_seconds": 3725.4}}
+    )
+
+    update_feed(feed_path, assets_folder, tmp_path / "catalog.sqlite3")
+
+    items = ET.parse(feed_path).getroot().findall("channel/item")
+    durations = [
+        item.findtext("{http://www.itunes.com/dtds/podcast-1.0.dtd}duration")
+        for item in items
+    ]
+    # stored in audio_info, read from the headers, and not a readable MP3
+    assert durations == ["1:02:05", "0:00:26", None]
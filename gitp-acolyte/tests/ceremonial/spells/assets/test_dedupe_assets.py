@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+from gitp_acolyte.ceremonial.spells.assets.dedupe_assets import (
+    find_duplicate_groups,
+    link_duplicates,
+    load_episode_manifests,
+    main,
+)
+from gitp_acolyte.constants import MANIFEST_FILENAME
+
+
+def make_episode_dir(assets_folder, date, files):
+    episode_dir = assets_folder / "Ceremony" / date
+    episode_dir.mkdir(parents=True)
+    (episode_dir / "episode.yml").write_text("episode_title: Ceremony\n")
+    for name, content in files.items():
+        (episode_dir / name).write_bytes(content)
+    return episode_dir
+
+
+def test_find_and_link_duplicates(tmp_path):
+    first = make_episode_dir(
+        tmp_path, "2024/11/19", {"A.mfpz": b"same patch", "B.mfpz": b"first only"}
+    )
+    second = make_episode_dir(
+        tmp_path, "2024/12/04", {"A.mfpz": b"same patch", "song.mid": b"midi"}
+    )
+
+    manifests = load_episode_manifests(tmp_path)
+    groups = find_duplicate_groups(manifests)
+    assert len(groups) == 1
+    assert groups[0].paths == [first / "A.mfpz", second / "A.mfpz"]
+    assert groups[0].reclaimable_bytes == len(b"same patch")
+
+    link_duplicates(groups[0], {manifest.directory: manifest for manifest in manifests})
+    assert (second / "A.mfpz").samefile(first / "A.mfpz")
+    assert (second / "A.mfpz").read_bytes() == b"same patch"
+
+    groups = find_duplicate_groups(load_episode_manifests(tmp_path))
+    assert groups[0].unlinked_paths == []
+
+
+def test_check_is_read_only_and_fails_only_on_unlinked_duplicates(
+    tmp_path, monkeypatch
+):
+    first = make_episode_dir(tmp_path, "2024/11/19", {"A.mfpz": b"same patch"})
+    second = make_episode_dir(tmp_path, "2024/12/04", {"A.mfpz": b"same patch"})
+    monkeypatch.setattr(
+        sys, "argv", ["dedupe_assets.py", "--check", "--assets-dir", str(tmp_path)]
+    )
+
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+    assert exit_info.value.code == 1
+
+    # a patch reused by several episodes is fine once it is linked
+    (second / "A.mfpz").unlink()
+    os.link(first / "A.mfpz", second / "A.mfpz")
+    main()
+
+    assert not (first / MANIFEST_FILENAME).exists()
+    assert not (second / MANIFEST_FILENAME).exists()
@@ -0,0 +1,127 @@
+from datetime import datetime
+
+import yaml
+from gitp_acolyte.ceremonial.spells.episode_data.catalog import (
+    EpisodeCatalog,
+    RefreshSummary,
+)
+
+
+def write_episode(assets_folder, episode_date, with_audio=False, **fields):
+    episode_dir = assets_folder / "Ceremony" / episode_date.strftime("%Y/%m/%d")
+    episode_dir.mkdir(parents=True, exist_ok=True)
+    date = episode_date.strftime("%Y.%m.%d")
+    data = {
+        "episode_title": "Ceremony",
+        "episode_date": episode_date.strftime("%Y-%m-%d"),
+        "audio_file": f"GitP.{date}.mix.128kbps_CBR.mp3",
+        "description": "",
+        "patch_files": [f"GitP.{date}.A.mfpz"],
+        "midi_files": [],
+        **fields,
+    }
+    (episode_dir / "episode.yml").write_text(yaml.dump(data))
+    if with_audio:
+        (episode_dir / data["audio_file"]).write_bytes(b"ID3")
+    return episode_dir
+
+
+def test_catalog_queries(tmp_path):
+    assets_folder = tmp_path / "assets"
+    write_episode(assets_folder, datetime(2024, 11, 19), with_audio=True)
+    write_episode(
+        assets_folder,
+        datetime(2024, 12, 4),
+        midi_files=["GP.2024.12.04.microfreak.mid"],
+        patch_info={"GitP.2024.12.04.A.mfpz": {"patch_name": "TMF.24.12.04.A"}},
+        audio_info={"duration_seconds": 1500.5},
+    )
+    write_episode(
+        assets_folder, datetime(2025, 1, 3), audio_info={"duration_seconds": "long"}
+    )
+
+    with EpisodeCatalog(tmp_path / "catalog.sqlite3") as catalog:
+        assert catalog.refresh(assets_folder) == RefreshSummary(3, 0, 0)
+
+        dates = [episode.episode_date for episode in catalog.episodes()]
+        assert dates == [
+            datetime(2024, 11, 19),
+            datetime(2024, 12, 4),
+            datetime(2025, 1, 3),
+        ]
+        december = catalog.episodes(datetime(2024, 12, 1), datetime(2024, 12, 31))
+        assert [episode.episode_date for episode in december] == [datetime(2024, 12, 4)]
+        assert december[0].midi_files == ["GP.2024.12.04.microfreak.mid"]
+        assert december[0].patch_files == ["GitP.2024.12.04.A.mfpz"]
+        durations = [episode.audio_duration_seconds for episode in catalog.episodes()]
+        assert durations == [None, 1500.5, None]
+
+        [with_patch] = catalog.episodes_with_file("GitP.2025.01.03.A.mfpz")
+        assert with_patch.episode_date == datetime(2025, 1, 3)
+        assert len(catalog.episodes_with_file("*.mid")) == 1
+        [with_patch_name] = catalog.episodes_with_patch("TMF.24.12.*")
+        assert with_patch_name.episode_date == datetime(2024, 12, 4)
+
+        missing = catalog.episodes_missing_audio()
+        assert [episode.episode_date for episode in missing] == [
+            datetime(2024, 12, 4),
+            datetime(2025, 1, 3),
+        ]
+
+
+def test_catalog_refreshes_incrementally(tmp_path):
+    assets_folder = tmp_path / "assets"
+    first = write_episode(assets_folder, datetime(2024, 11, 19))
+    second = write_episode(assets_folder, datetime(2024, 12, 4))
+    catalog_path = tmp_path / "catalog.sqlite3"
+
+    with EpisodeCatalog(catalog_path) as catalog:
+        catalog.refresh(assets_folder)
+
+    write_episode(assets_folder, datetime(2024, 11, 19), description="Updated.")
+    (second / "GitP.2024.12.04.mix.128kbps_CBR.mp3").write_bytes(b"ID3")
+    with EpisodeCatalog(catalog_path) as catalog:
+        assert catalog.refresh(assets_folder) == RefreshSummary(1, 1, 0)
+        assert catalog.episodes()[0].description == "Updated."
+        assert catalog.episodes_missing_audio()[0].episode_date == datetime(
+            2024, 11, 19
+        )
+
+        (first / "episode.yml").unlink()
+        assert catalog.refresh(assets_folder) == RefreshSummary(0, 1, 1)
+        assert catalog.episodes_with_file("GitP.2024.11.19.A.mfpz") == []
+
+
+def test_catalog_keeps_indexing_past_documents_that_are_not_mappings(tmp_path):
+    assets_folder = tmp_path / "assets"
+    broken = write_episode(assets_folder, datetime(2024, 11, 19))
+    (broken / "episode.yml").write_text("- foo\n")
+    write_episode(assets_folder, datetime(2024, 12, 4))
+
+    with EpisodeCatalog(tmp_path / "catalog.sqlite3") as catalog:
+        assert catalog.refresh(assets_folder) == RefreshSummary(2, 0, 0)
+        episodes = catalog.episodes()
+
+    assert [episode.episode_title for episode in episodes] == ["", "Ceremony"]
+
+
+def test_catalog_indexes_a_single_file_name_and_skips_entries_that_are_not_names(
+    tmp_path,
+):
+    assets_folder = tmp_path / "assets"
+    write_episode(
+        assets_folder,
+        datetime(2024, 11, 19),
+        patch_files="GitP.2024.11.19.A.mfpz",
+        midi_files=["GP.2024.11.19.microfreak.mid", 42, {"name": "x.mid"}],
+    )
+    broken = write_episode(assets_folder, datetime(2024, 12, 4))
+    (broken / "episode.yml").write_bytes(b"episode_title: \xff\n")
+
+    with EpisodeCatalog(tmp_path / "catalog.sqlite3") as catalog:
+        assert catalog.refresh(assets_folder) == RefreshSummary(2, 0, 0)
+        episodes = catalog.episodes()
+
+    assert episodes[0].patch_files == ["GitP.2024.11.19.A.mfpz"]
+    assert episodes[0].midi_files == ["GP.2024.11.19.microfreak.mid"]
+    assert episodes[1].episode_title == ""
@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import yaml
+from pydantic import ValidationError
+
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    load_episode,
+    NotAMappingError,
+    load_episode_yamls,
+    parse_yaml,
+    serialize_yaml,
+    update_episode_yaml,
+    validate_episode_data,
+)
+from gitp_acolyte.ceremonial.spells.episode_reference.constants import (
+    DEFAULT_REFERENCE_EPISODE_YML_PATH,
+)
+
+
+def test_libyaml_and_python_paths_agree():
+    if not yaml.__with_libyaml__:
+        pytest.skip("PyYAML was built without libyaml")
+    text = DEFAULT_REFERENCE_EPISODE_YML_PATH.read_text()
+    data = parse_yaml(text, yaml.SafeLoader)
+    assert parse_yaml(text, yaml.CSafeLoader) == data
+    assert serialize_yaml(data, yaml.CSafeDumper) == serialize_yaml(
+        data, yaml.SafeDumper
+    )
+
+
+def test_load_episode_validates_the_reference_episode():
+    episode = load_episode(DEFAULT_REFERENCE_EPISODE_YML_PATH)
+    assert parse_yaml(serialize_yaml(episode)) == episode.model_dump()
+    with pytest.raises(ValidationError):
+        validate_episode_data({"episode_date": "2024-12-04"})
+
+
+def test_load_episode_yamls_reports_broken_files(tmp_path):
+    good = tmp_path / "good.yml"
+    good.write_text("episode_date: '2024-12-04'\n")
+    empty = tmp_path / "empty.yml"
+    empty.write_text("")
+    broken = tmp_path / "broken.yml"
+    broken.write_text("episode_date: [unclosed\n")
+    missing = tmp_path / "missing.yml"
+
+    results = load_episode_yamls([good, empty, broken, missing], max_workers=2)
+
+    assert results[good] == {"episode_date": "2024-12-04"}
+    assert results[empty] == {}
+    assert isinstance(results[broken], yaml.YAMLError)
+    assert isinstance(results[missing], FileNotFoundError)
+
+
+@pytest.mark.parametrize("text", ["- foo\n", "just a string\n", "42\n"])
+def test_documents_that_are_not_mappings_are_rejected(tmp_path, text):
+    with pytest.raises(NotAMappingError):
+        parse_yaml(text)
+    path = tmp_path / "episode.yml"
+    path.write_text(text)
+    assert isinstance(load_episode_yamls([path])[path], yaml.YAMLError)
+    with pytest.raises(yaml.YAMLError):
+        update_episode_yaml(path, {"episode_date": "2024-12-04"})
+    assert path.read_text() == text
+
+
+def test_update_episode_yaml_merges_and_skips_identical_writes(tmp_path):
+    path = tmp_path / "episode.yml"
+    assert update_episode_yaml(path, {"episode_date": "2024-12-04"})
+    assert update_episode_yaml(path, {"audio_file": "GitP.2024.12.04.mp3"})
+    mtime_ns = path.stat().st_mtime_ns
+
+    assert not update_episode_yaml(path, {"episode_date": "2024-12-04"})
+    assert path.stat().st_mtime_ns == mtime_ns
+    assert parse_yaml(path.read_text()) == {
+        "audio_file": "GitP.2024.12.04.mp3",
+        "episode_date": "2024-12-04",
+    }
+
+    assert update_episode_yaml(path, {"episode_date": "2024-12-04"}, replace=True)
+    assert parse_yaml(path.read_text()) == {"episode_date": "2024-12-04"}
+    assert [p.name for p in tmp_path.iterdir()] == ["episode.yml"]
+
+
+def test_concurrent_updates_keep_every_field(tmp_path):
+    path = tmp_path / "episode.yml"
+    fields = [f"field_{i}" for i in range(16)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda f: update_episode_yaml(path, {f: f}), fields))
+    assert parse_yaml(path.read_text()) == {f: f for f in fields}
@@ -0,0 +1,112 @@
+from datetime import datetime
+
+from gitp_acolyte.ceremonial.spells.episode_data.create import (
+    find_episode_publishing_dirs,
+)
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import serialize_yaml
+from gitp_acolyte.ceremonial.spells.episode_data.validate import (
+    build_report,
+    validate_episodes,
+)
+
+
+def make_episode(assets_folder, date, files, episode_data=None):
+    episode_dir = assets_folder / "Ceremony" / date.strftime("%Y/%m/%d")
+    episode_dir.mkdir(parents=True)
+    for name in files:
+        (episode_dir / name).write_bytes(b"")
+    if episode_data:
+        (episode_dir / "episode.yml").write_text(serialize_yaml(episode_data))
+    return episode_dir
+
+
+def episode_fields(date, **overrides):
+    fields = {
+        "episode_title": "Ceremony",
+        "episode_date": date,
+        "audio_file": f"GitP.{date}.mp3",
+        "description": "",
+        "patch_files": [f"GitP.{date}.A.mfpz"],
+        "midi_files": [],
+    }
+    return {**fields, **overrides}
+
+
+def test_validate_episodes_reports_each_problem(tmp_path):
+    make_episode(
+        tmp_path,
+        datetime(2024, 11, 1),
+        ["GitP.2024-11-01.mp3", "GitP.2024-11-01.A.mfpz"],
+        episode_fields("2024-11-01"),
+    )
+    make_episode(
+        tmp_path,
+        datetime(2024, 11, 2),
+        ["GitP.2024-11-03.A.mfpz"],
+        episode_fields("2024-11-03", midi_files=["gone.mid"]),
+    )
+    make_episode(tmp_path, datetime(2024, 11, 4), [], {"episode_date": "2024-11-04"})
+    make_episode(tmp_path, datetime(2024, 11, 5), [])
+
+    results = validate_episodes(find_episode_publishing_dirs(tmp_path), processes=2)
+
+    problems = {
+        result.episode_date: sorted(
+            (problem.check, problem.field) for problem in result.problems
+        )
+        for result in results
+    }
+    assert problems["2024-11-01"] == []
+    assert problems["2024-11-02"] == [
+        ("date", "episode_date"),
+        ("missing_file", "audio_file"),
+        ("missing_file", "midi_files"),
+    ]
+    assert ("schema", "audio_file") in problems["2024-11-04"]
+    assert problems["2024-11-05"] == [("yaml", None)]
+
+    report = build_report(results, 0.0)
+    assert report["checked"] == 4 and report["invalid"] == 3
+
+    results = validate_episodes(
+        find_episode_publishing_dirs(tmp_path), ignore_missing_audio=True
+    )
+    assert [problem.field for problem in results[1].problems] == [
+        "episode_date",
+        "midi_files",
+    ]
+
+
+def test_validate_episodes_reports_malformed_documents(tmp_path):
+    not_a_mapping = make_episode(tmp_path, datetime(2024, 11, 1), [])
+    (not_a_mapping / "episode.yml").write_text("- foo\n")
+    not_utf8 = make_episode(tmp_path, datetime(2024, 11, 4), [])
+    (not_utf8 / "episode.yml").write_bytes(b"episode_title: Caf\xe9\n")
+    make_episode(
+        tmp_path,
+        datetime(2024, 11, 2),
+        [],
+        episode_fields("2024-11-02", patch_files=3, midi_files=[None]),
+    )
+    make_episode(
+        tmp_path,
+        datetime(2024, 11, 3),
+        ["GitP.2024-11-03.mp3"],
+        episode_fields("2024-11-03", patch_files=[""]),
+    )
+
+    results = validate_episodes(find_episode_publishing_dirs(tmp_path), processes=2)
+
+    assert [(problem.check, problem.field) for problem in results[0].problems] == [
+        ("yaml", None)
+    ]
+    checks = {(problem.check, problem.field) for problem in results[1].problems}
+    assert ("schema", "patch_files") in checks
+    assert ("schema", "midi_files.0") in checks
+    assert [(problem.field, problem.message) for problem in results[2].problems] == [
+        ("patch_files", "patch_files entry is empty")
+    ]
+    assert [(problem.check, problem.field) for problem in results[3].problems] == [
+        ("yaml", None)
+    ]
+    assert "UTF-8" in results[3].problems[0].message
@@ -0,0 +1,165 @@
+import asyncio
+import json
+from argparse import Namespace
+from datetime import datetime
+
+import yaml
+from gitp_acolyte.ceremonial.spells.episode_data.update.file_attrs import (
+    update_file_attrs,
+)
+from gitp_acolyte.ceremonial.spells.episode_data.update.file_attrs.backfill_file_attrs import (
+    RateLimiter,
+    backfill_episodes,
+    plan_batches,
+    select_episode_publishing_dirs,
+)
+from gitp_acolyte.utils.ai import client as ai_client
+from gitp_acolyte.utils.ai.response_cache import ResponseCache
+
+
+def make_episode_dir(assets_folder, episode_date):
+    episode_dir = assets_folder / "Ceremony" / episode_date.strftime("%Y/%m/%d")
+    episode_dir.mkdir(parents=True)
+    date = episode_date.strftime("%Y.%m.%d")
+    (episode_dir / f"GitP.{date}.A.mfpz").write_bytes(b"PK" + date.encode())
+    return episode_dir
+
+
+def run_backfill(assets_folder, server, offline=False, **kwargs):
+    args = Namespace(
+        recreate=False,
+        refresh=False,
+        no_cache=False,
+        offline=offline,
+        reference=False,
+        prompt_token_budget=2000,
+    )
+
+    async def backfill():
+        async with ai_client.make_async_client(
+            base_url=f"http://127.0.0.1:{server.server_port}/v1", api_key="test"
+        ) as client:
+            return await backfill_episodes(
+                select_episode_publishing_dirs(assets_folder=assets_folder),
+                args,
+                client,
+                **kwargs,
+            )
+
+    return asyncio.run(backfill())
+
+
+def test_backfill_retries_and_reports_each_episode(
+    tmp_path, stub_server, monkeypatch, telemetry_log
+):
+    monkeypatch.setattr(ai_client, "BACKOFF_BASE_SECONDS", 0)
+    monkeypatch.setattr(
+        update_file_attrs, "ResponseCache", lambda: ResponseCache(tmp_path / "cache")
+    )
+    assets_folder = tmp_path / "assets"
+    dates = [datetime(2024, 11, 19), datetime(2024, 12, 4), datetime(2025, 1, 3)]
+    episode_dirs = [make_episode_dir(assets_folder, date) for date in dates]
+    stub_server.failures = {
+        "GitP.2024.11.19": [500, 500, 500],
+        "GitP.2024.12.04": [429],
+    }
+
+    results = run_backfill(assets_folder, stub_server, max_retries=2)
+
+    assert [result.episode_date for result in results] == dates
+    failed, rate_limited, ok = results
+    assert "InternalServerError" in failed.error
+    assert not failed.updated
+    assert rate_limited.updated and rate_limited.requests == 2
+    assert ok.updated and ok.requests == 1
+    assert len(stub_server.requests) == 6
+    assert not (episode_dirs[0] / "episode.yml").exists()
+    with (episode_dirs[1] / "episode.yml").open() as f:
+        episode_data = yaml.safe_load(f)
+    assert episode_data["description"] == "A ceremony."
+    assert episode_data["patch_files"] == ["GitP.2024.12.04.A.mfpz"]
+    telemetry = [json.loads(line) for line in telemetry_log.read_text().splitlines()]
+    assert sorted(call["retries"] for call in telemetry) == [0, 1, 2]
+    assert sum(1 for call in telemetry if call["error"]) == 1
+
+    results = run_backfill(assets_folder, stub_server, max_retries=2)
+    assert [result.updated for result in results] == [True, False, False]
+    assert len(stub_server.requests) == 7
+
+
+def test_online_backfill_describes_episodes_backfilled_offline(
+    tmp_path, stub_server, monkeypatch
+):
+    monkeypatch.setattr(
+        update_file_attrs, "ResponseCache", lambda: ResponseCache(tmp_path / "cache")
+    )
+    assets_folder = tmp_path / "assets"
+    episode_dir = make_episode_dir(assets_folder, datetime(2024, 12, 4))
+
+    [result] = run_backfill(assets_folder, stub_server, offline=True)
+    assert result.updated
+    assert stub_server.requests == []
+
+    [result] = run_backfill(assets_folder, stub_server)
+    assert result.updated and result.requests == 1
+    with (episode_dir / "episode.yml").open() as f:
+        assert yaml.safe_load(f)["description"] == "A ceremony."
+
+
+def test_rate_limiter_waits_for_the_window():
+    now = [0.0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    async def acquire_all():
+        limiter = RateLimiter(
+            requests_per_minute=2,
+            tokens_per_minute=1000,
+            clock=lambda: now[0],
+            sleep=fake_sleep,
+        )
+        await limiter.acquire(100)
+        await limiter.acquire(100)
+        await limiter.acquire(100)
+        now[0] += 1
+        await limiter.acquire(901)
+
+    asyncio.run(acquire_all())
+    assert sleeps == [60.0, 59.0]
+
+
+def test_coalesced_backfill_fans_out_descriptions(tmp_path, stub_server, monkeypatch):
+    monkeypatch.setattr(
+        update_file_attrs, "ResponseCache", lambda: ResponseCache(tmp_path / "cache")
+    )
+    assets_folder = tmp_path / "assets"
+    dates = [datetime(2024, 11, day) for day in range(1, 8)]
+    episode_dirs = [make_episode_dir(assets_folder, date) for date in dates]
+    stub_server.omitted_dates = {"2024-11-03"}
+
+    results = run_backfill(
+        assets_folder, stub_server, coalesce=True, batch_token_budget=1200
+    )
+
+    assert all(result.updated for result in results)
+    batch_requests = len(stub_server.requests) - 1
+    assert 1 < batch_requests < len(dates)
+    assert sum(result.requests for result in results) == len(stub_server.requests)
+    for date, episode_dir in zip(dates, episode_dirs):
+        with (episode_dir / "episode.yml").open() as f:
+            description = yaml.safe_load(f)["description"]
+        if date == datetime(2024, 11, 3):
+            assert description == "A ceremony."
+        else:
+            assert description == f"Ceremony {date:%Y-%m-%d}."
+
+
+def test_plan_batches_fits_the_token_budget():
+    listings = ["x" * 400] * 10
+    batches = plan_batches(listings, 2000)
+    assert [index for batch in batches for index in batch] == list(range(10))
+    assert len(batches) > 1
+    assert plan_batches(["x" * 40000], 2000) == [[0]]
@@ -0,0 +1,280 @@
+import json
+import shutil
+from argparse import Namespace
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+import yaml
+from gitp_acolyte.ceremonial.spells.episode_data.update.file_attrs import (
+    update_file_attrs,
+)
+from gitp_acolyte.ceremonial.spells.episode_data.update.file_attrs.infer_file_attrs import (
+    infer_file_attrs,
+)
+from gitp_acolyte.ceremonial.spells.episode_reference.episode_schema import (
+    EpisodeDescription,
+)
+from gitp_acolyte.ceremonial.spells.episode_reference.constants import (
+    DEFAULT_REFERENCE_EPISODE_YML_PATH,
+    REFERENCE_EPISODE_DATE,
+)
+from gitp_acolyte.constants import REFERENCE_EPISODE_DIR
+from gitp_acolyte.utils.ai.response_cache import ResponseCache
+from gitp_acolyte.utils.manifest import Manifest
+from gitp_acolyte.utils.media.mfpz_info import MfpzInfoCache
+
+EPISODE_DESCRIPTION = EpisodeDescription(description="A ceremony of four patches.")
+
+
+def dir_info(modified):
+    return {
+        "directory_name": "04",
+        "files": [
+            {
+                "file_name": "GitP.2024.12.04.A.mfpz",
+                "size": 1465,
+                "last_modified": modified,
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def openai_calls(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_call_openai(podcast_directory_info):
+        calls.append(podcast_directory_info)
+        message = SimpleNamespace(parsed=EPISODE_DESCRIPTION, refusal=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    monkeypatch.setattr(update_file_attrs, "call_openai", fake_call_openai)
+    monkeypatch.setattr(
+        update_file_attrs, "ResponseCache", lambda: ResponseCache(tmp_path)
+    )
+    return calls
+
+
+def test_cached_response_ignores_timestamps(openai_calls):
+    args = Namespace(no_cache=False, refresh=False, prompt_token_budget=2000)
+    first = update_file_attrs.infer_episode_description(
+        dir_info("2024-12-04T10:00:00"), args
+    )
+    second = update_file_attrs.infer_episode_description(
+        dir_info("2025-01-01T00:00:00"), args
+    )
+    assert first == second == EPISODE_DESCRIPTION.description
+    assert len(openai_calls) == 1
+
+
+def test_refresh_and_no_cache_call_the_model(openai_calls):
+    info = dir_info("2024-12-04T10:00:00")
+    update_file_attrs.infer_episode_description(
+        info, Namespace(no_cache=True, refresh=False, prompt_token_budget=2000)
+    )
+    update_file_attrs.infer_episode_description(
+        info, Namespace(no_cache=False, refresh=True, prompt_token_budget=2000)
+    )
+    update_file_attrs.infer_episode_description(
+        info, Namespace(no_cache=False, refresh=False, prompt_token_budget=2000)
+    )
+    assert len(openai_calls) == 2
+
+
+def test_refusal_raises_instead_of_exiting(tmp_path, monkeypatch):
+    def refusing_call_openai(podcast_directory_info):
+        message = SimpleNamespace(parsed=None, refusal="No.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    monkeypatch.setattr(update_file_attrs, "call_openai", refusing_call_openai)
+    monkeypatch.setattr(
+        update_file_attrs, "ResponseCache", lambda: ResponseCache(tmp_path)
+    )
+    args = Namespace(no_cache=False, refresh=False, prompt_token_budget=2000)
+    with pytest.raises(update_file_attrs.DescriptionRefusedError):
+        update_file_attrs.infer_episode_description(
+            dir_info("2024-12-04T10:00:00"), args
+        )
+
+
+def test_infer_file_attrs_matches_reference_episode():
+    with DEFAULT_REFERENCE_EPISODE_YML_PATH.open() as f:
+        reference = yaml.safe_load(f)
+    file_names = [path.name for path in REFERENCE_EPISODE_DIR.iterdir()]
+    file_attrs = infer_file_attrs(file_names, REFERENCE_EPISODE_DATE)
+    assert file_attrs == {
+        key: value for key, value in reference.items() if key != "description"
+    }
+
+
+def test_offline_keeps_existing_description(tmp_path, openai_calls):
+    (tmp_path / "GitP.2024.12.04.A.mfpz").write_bytes(b"patch")
+    (tmp_path / "episode.yml").write_text(
+        "episode_title: Solstice\ndescription: Kept.\n"
+    )
+    args = Namespace(no_cache=False, refresh=False, offline=True)
+    data = update_file_attrs.build_episode_publication_data(
+        tmp_path, datetime(2024, 12, 4), args
+    )
+    assert data.episode_title == "Solstice"
+    assert data.description == "Kept."
+    assert data.audio_file == "GitP.2024.12.04.mix.128kbps_CBR.mp3"
+    assert data.patch_files == ["GitP.2024.12.04.A.mfpz"]
+    assert openai_calls == []
+
+
+def test_dir_info_skips_irrelevant_files():
+    dir_info = update_file_attrs.get_episode_dir_ai_info(REFERENCE_EPISODE_DIR)
+    assert [file_info["file_name"] for file_info in dir_info["files"]] == [
+        "GP.2024.12.04.A.mfpz",
+        "GP.2024.12.04.B.mfpz",
+        "GP.2024.12.04.C.mfpz",
+        "GP.2024.12.04.D.mfpz",
+        "GP.2024.12.04.microfreak.mid",
+    ]
+
+
+def test_serialized_listing_fits_token_budget():
+    files = [
+        {"file_name": f"take.{i:03}.wav", "size": 1000, "last_modified": "2024"}
+        for i in range(200)
+    ]
+    files.append(
+        {"file_name": "GitP.2024.12.04.A.mfpz", "size": 1465, "last_modified": "2024"}
+    )
+    dir_info = {"directory_name": "04", "files": files}
+
+    listing = json.loads(update_file_attrs.serialize_episode_dir_ai_info(dir_info))
+    assert len(listing["files"]) == 201
+    assert "omitted_files" not in listing
+
+    serialized = update_file_attrs.serialize_episode_dir_ai_info(dir_info, 200)
+    assert len(serialized) <= 200 * 4
+    listing = json.loads(serialized)
+    assert listing["files"][0][0] == "GitP.2024.12.04.A.mfpz"
+    omitted = listing["omitted_files"]
+    assert omitted["count"] == 201 - len(listing["files"])
+    assert omitted["suffixes"] == {".wav": omitted["count"]}
+
+
+def test_audio_info_is_read_from_the_audio_headers(tmp_path):
+    frame = b"\xff\xfb\x90\x44" + b"\x00" * 413
+    (tmp_path / "GitP.2024.12.04.mp3").write_bytes(frame * 10)
+    (tmp_path / "GitP.2024.12.05.mp3").write_bytes(b"ID3" * 100)
+
+    audio_info = update_file_attrs.read_episode_audio_info(
+        tmp_path, "GitP.2024.12.04.mp3"
+    )
+
+    assert audio_info.bitrate_kbps == 128
+    assert audio_info.byte_length == 4170
+    assert update_file_attrs.read_episode_audio_info(tmp_path, "") is None
+    assert (
+        update_file_attrs.read_episode_audio_info(tmp_path, "GitP.2024.12.05.mp3")
+        is None
+    )
+    assert (
+        update_file_attrs.read_episode_audio_info(tmp_path, "GitP.2024.12.06.mp3")
+        is None
+    )
+
+
+def test_patch_info_is_read_from_the_patch_headers(tmp_path):
+    episode_dir = tmp_path / "episode"
+    episode_dir.mkdir()
+    shutil.copy(
+        REFERENCE_EPISODE_DIR / "GP.2024.12.04.A.mfpz",
+        episode_dir / "GitP.2024.12.04.A.mfpz",
+    )
+    (episode_dir / "GitP.2024.12.04.B.mfpz").write_bytes(b"not a patch")
+    cache = MfpzInfoCache(tmp_path / "cache")
+
+    patch_info = update_file_attrs.read_episode_patch_info(
+        episode_dir,
+        ["GitP.2024.12.04.A.mfpz", "GitP.2024.12.04.B.mfpz", "GitP.2024.12.04.C.mfpz"],
+        Manifest.load(episode_dir),
+        cache,
+    )
+
+    assert list(patch_info) == ["GitP.2024.12.04.A.mfpz"]
+    assert patch_info["GitP.2024.12.04.A.mfpz"].patch_name == "TMF.24.12.04.A"
+    assert patch_info["GitP.2024.12.04.A.mfpz"].filter_type == "LPF"
+    assert len(list(cache.directory.glob("*.json"))) == 1
+
+
+def test_write_episode_yaml_clears_the_info_of_removed_files(tmp_path):
+    (tmp_path / "episode.yml").write_text(
+        yaml.safe_dump(
+            {
+                "episode_title": "Ceremony",
+                "audio_info": {"duration_seconds": 60.0},
+                "midi_info": {"GitP.2024.12.04.mid": {"note_count": 3}},
+                "patch_info": {"GitP.2024.12.04.A.mfpz": {"patch_name": "Old"}},
+                "published": True,
+            }
+        )
+    )
+    data = update_file_attrs.PodcastEpisodePublicationData(
+        episode_title="Ceremony",
+        episode_date="2024-12-04",
+        audio_file="",
+        description="",
+    )
+
+    update_file_attrs.write_episode_yaml(
+        data, tmp_path, Manifest.load(tmp_path), Namespace(reference=False)
+    )
+
+    written = yaml.safe_load((tmp_path / "episode.yml").read_text())
+    assert written["audio_info"] is None
+    assert written["midi_info"] == {}
+    assert written["patch_info"] == {}
+    # fields of other stages are kept
+    assert written["published"] is True
+
+
+def test_episodes_stamped_by_an_older_version_are_not_up_to_date(tmp_path):
+    (tmp_path / "GitP.2024.12.04.A.mfpz").write_bytes(b"patch")
+    args = Namespace(recreate=False, refresh=False)
+    manifest = Manifest.load(tmp_path)
+    fingerprint = update_file_attrs.episode_files_fingerprint(manifest)
+    # stamped before the version was part of the fingerprint
+    manifest.stamp(
+        update_file_attrs.MANIFEST_STAMP,
+        manifest.fingerprint(exclude=("episode.yml",)),
+    )
+    assert not update_file_attrs.is_up_to_date(manifest, fingerprint, args)
+
+    manifest.stamp(update_file_attrs.MANIFEST_STAMP, fingerprint)
+    assert update_file_attrs.is_up_to_date(manifest, fingerprint, args)
+
+
+def test_offline_run_leaves_the_description_to_the_next_online_run(
+    tmp_path, openai_calls, monkeypatch
+):
+    monkeypatch.setattr(
+        update_file_attrs, "MfpzInfoCache", lambda: MfpzInfoCache(tmp_path / "mfpz")
+    )
+    episode_dir = tmp_path / "episode"
+    episode_dir.mkdir()
+    (episode_dir / "GitP.2024.12.04.A.mfpz").write_bytes(b"patch")
+
+    def run(offline):
+        args = Namespace(
+            recreate=False,
+            refresh=False,
+            no_cache=False,
+            offline=offline,
+            reference=False,
+            prompt_token_budget=2000,
+        )
+        update_file_attrs.update_file_attrs(episode_dir, datetime(2024, 12, 4), args)
+        return yaml.safe_load((episode_dir / "episode.yml").read_text())
+
+    assert run(offline=True)["description"] == ""
+    assert run(offline=False)["description"] == EPISODE_DESCRIPTION.description
+    assert len(openai_calls) == 1
+    # now stamped: nothing changed, so the model is not asked again
+    run(offline=False)
+    assert len(openai_calls) == 1
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    update_episode_yaml,
+)
+from gitp_acolyte.ceremonial.spells.episode_page.aggregate_pages import (
+    AggregateSummary,
+    update_aggregate_pages,
+)
+
+
+def make_episode(assets_folder, episode_date, description=""):
+    episode_dir = assets_folder / "Ceremony" / episode_date.strftime("%Y/%m/%d")
+    episode_dir.mkdir(parents=True)
+    update_episode_yaml(
+        episode_dir / "episode.yml",
+        {
+            "episode_title": "Ceremony",
+            "episode_date": episode_date.strftime("%Y-%m-%d"),
+            "audio_file": "",
+            "description": description,
+            "patch_files": [],
+            "midi_files": [],
+        },
+    )
+
+
+def test_update_aggregate_pages_touches_only_affected_pages(tmp_path):
+    assets_folder = tmp_path / "assets"
+    pages_folder = tmp_path / "pages"
+    pages_folder.mkdir()
+    ceremony_page = pages_folder / "Ceremony.md"
+    ceremony_page.write_text("alias:: [[Ceremonies]]\n- written by hand\n")
+    contents_page = pages_folder / "contents.md"
+    contents_page.write_text("- [[Acolyte]]\n")
+    make_episode(assets_folder, datetime(2024, 11, 19))
+    make_episode(assets_folder, datetime(2024, 12, 4))
+
+    def update():
+        return update_aggregate_pages(
+            assets_folder, pages_folder, tmp_path / "catalog.sqlite3"
+        )
+
+    assert update() == AggregateSummary(written=6, unchanged=0)
+    assert update() == AggregateSummary(written=0, unchanged=6)
+    month_page = pages_folder / "Ceremony___2024___11.md"
+    month_mtime_ns = month_page.stat().st_mtime_ns
+
+    make_episode(assets_folder, datetime(2025, 1, 3), "A\nnew ceremony.")
+    assert update() == AggregateSummary(written=5, unchanged=3)
+    assert month_page.stat().st_mtime_ns == month_mtime_ns
+
+    ceremony = ceremony_page.read_text()
+    assert ceremony.startswith("alias:: [[Ceremonies]]\n- written by hand\n")
+    assert ceremony.count("generated:: latest-episode") == 1
+    assert "\t- [[Ceremony/2025]] (1)\n\t- [[Ceremony/2024]] (2)\n" in ceremony
+    assert "\t\t- A new ceremony.\n" in ceremony
+    assert contents_page.read_text() == (
+        "- [[Acolyte]]\n"
+        "- [[Ceremony]]\n"
+        "  generated:: contents-ceremonies\n"
+        "\t- Latest: [[Ceremony/2025/01/03]] Ceremony\n"
+        "\t- [[Ceremony/2025]]\n"
+        "\t- [[Ceremony/2024]]\n"
+    )
+    assert (pages_folder / "Ceremony___2025___01.md").read_text() == (
+        "public:: true\n"
+        "\n"
+        "- ## Ceremonies in January 2025\n"
+        "  generated:: ceremony-episodes\n"
+        "\t- [[Ceremony/2025/01/03]] Ceremony\n"
+    )
@@ -0,0 +1,95 @@
+from datetime import datetime
+
+import pytest
+
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    update_episode_yaml,
+)
+from gitp_acolyte.ceremonial.spells.episode_page import templates
+from gitp_acolyte.ceremonial.spells.episode_page.render_pages import (
+    RenderSummary,
+    page_inputs_fingerprint,
+    render_episode_pages,
+)
+
+
+@pytest.fixture(autouse=True)
+def bytecode_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(templates, "JINJA_BYTECODE_CACHE_DIR", tmp_path / "jinja")
+
+
+def make_episode(assets_folder, episode_date):
+    episode_dir = assets_folder / "Ceremony" / episode_date.strftime("%Y/%m/%d")
+    episode_dir.mkdir(parents=True)
+    date = episode_date.strftime("%Y-%m-%d")
+    update_episode_yaml(
+        episode_dir / "episode.yml",
+        {
+            "episode_title": "Ceremony",
+            "episode_date": date,
+            "audio_file": f"GitP.{date}.mp3",
+            "description": "",
+            "patch_files": [],
+            "midi_files": [],
+        },
+    )
+    return episode_dir
+
+
+def test_render_episode_pages_only_rewrites_changed_pages(tmp_path):
+    assets_folder = tmp_path / "assets"
+    pages_folder = tmp_path / "pages"
+    pages_folder.mkdir()
+    state_path = tmp_path / "episode_pages.json"
+    make_episode(assets_folder, datetime(2024, 11, 19))
+    episode_dir = make_episode(assets_folder, datetime(2024, 12, 4))
+    edited_page = pages_folder / "Ceremony___2024___11___19.md"
+    edited_page.write_text("edited by hand\n")
+    page = pages_folder / "Ceremony___2024___12___04.md"
+
+    def render(**kwargs):
+        return render_episode_pages(assets_folder, pages_folder, state_path, **kwargs)
+
+    assert render() == RenderSummary(rendered=1, unchanged=0, skipped=1)
+    assert "# Ceremony - 2024-12-04" in page.read_text()
+    assert edited_page.read_text() == "edited by hand\n"
+    page_mtime_ns = page.stat().st_mtime_ns
+    state_mtime_ns = state_path.stat().st_mtime_ns
+
+    assert render() == RenderSummary(rendered=0, unchanged=1, skipped=1)
+    assert page.stat().st_mtime_ns == page_mtime_ns
+    assert state_path.stat().st_mtime_ns == state_mtime_ns
+
+    update_episode_yaml(episode_dir / "episode.yml", {"description": "New."})
+    assert render() == RenderSummary(rendered=1, unchanged=0, skipped=1)
+    assert "New." in page.read_text()
+
+    assert render(force=True) == RenderSummary(rendered=1, unchanged=1, skipped=0)
+    assert "# Ceremony - 2024-11-19" in edited_page.read_text()
+
+
+def test_template_changes_change_the_fingerprint(tmp_path):
+    yaml_path = make_episode(tmp_path, datetime(2024, 12, 4)) / "episode.yml"
+    assert page_inputs_fingerprint(yaml_path, "a") == page_inputs_fingerprint(
+        yaml_path, "a"
+    )
+    assert page_inputs_fingerprint(yaml_path, "a") != page_inputs_fingerprint(
+        yaml_path, "b"
+    )
+
+
+def test_one_broken_episode_does_not_stop_the_others(tmp_path):
+    assets_folder = tmp_path / "assets"
+    pages_folder = tmp_path / "pages"
+    pages_folder.mkdir()
+    broken_dir = make_episode(assets_folder, datetime(2024, 11, 19))
+    (broken_dir / "episode.yml").write_text("episode_title: No date\n")
+    make_episode(assets_folder, datetime(2024, 12, 4))
+
+    summary = render_episode_pages(
+        assets_folder, pages_folder, tmp_path / "episode_pages.json"
+    )
+
+    assert summary == RenderSummary(rendered=1, unchanged=0, skipped=0, failed=1)
+    assert (pages_folder / "Ceremony___2024___12___04.md").exists()
+    assert not (pages_folder / "Ceremony___2024___11___19.md").exists()
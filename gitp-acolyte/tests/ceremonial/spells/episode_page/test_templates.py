@@ -0,0 +1,153 @@
+import shutil
+import subprocess
+import sys
+
+from jinja2 import FileSystemLoader, ModuleLoader
+
+from gitp_acolyte.ceremonial.spells.episode_page import templates
+from gitp_acolyte.ceremonial.spells.episode_page.templates import (
+    EPISODE_TEMPLATE_NAME,
+    TEMPLATE_DIR,
+    compile_templates,
+    compiled_templates_are_current,
+    get_jinja_environment,
+)
+from gitp_acolyte.constants import ACOLYTE_DIR
+
+CONTEXT = {
+    "episode_title": "Ceremony",
+    "episode_date": "2024-12-04",
+    "date_created": "2024-12-04 Wed",
+    "audio_file": "GitP.2024.12.04.mp3",
+    "description": "A ceremony.",
+    "patch_files": ["GitP.2024.12.04.A.mfpz"],
+    "midi_files": ["GitP.2024.12.04.microfreak.mid"],
+    "assets_base_url": "https://example.com/assets/Ceremony/",
+}
+
+
+def render(env):
+    return env.get_template(EPISODE_TEMPLATE_NAME).render(**CONTEXT)
+
+
+def test_compiled_templates_render_like_the_sources(tmp_path, monkeypatch):
+    monkeypatch.setattr(templates, "JINJA_BYTECODE_CACHE_DIR", tmp_path / "jinja")
+    template_dir = tmp_path / "templates"
+    template_dir.mkdir()
+    shutil.copy(TEMPLATE_DIR / EPISODE_TEMPLATE_NAME, template_dir)
+    compiled_dir = tmp_path / "compiled"
+
+    source_env = get_jinja_environment(template_dir, compiled_dir)
+    assert isinstance(source_env.loader, FileSystemLoader)
+
+    assert compile_templates(template_dir, compiled_dir)
+    assert not compile_templates(template_dir, compiled_dir)
+    compiled_env = get_jinja_environment(template_dir, compiled_dir)
+    assert isinstance(compiled_env.loader, ModuleLoader)
+    assert render(compiled_env) == render(source_env)
+
+    (template_dir / EPISODE_TEMPLATE_NAME).write_text("edited")
+    assert not compiled_templates_are_current(template_dir, compiled_dir)
+    assert render(get_jinja_environment(template_dir, compiled_dir)) == "edited"
+
+
+def test_create_episode_page_defers_importing_jinja():
+    code = (
+        "import sys\n"
+        "import gitp_acolyte.ceremonial.spells.episode_page.create_episode_page\n"
+        "print('jinja2' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ACOLYTE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_episode_page_summarizes_midi_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(templates, "JINJA_BYTECODE_CACHE_DIR", tmp_path / "jinja")
+    env = get_jinja_environment(TEMPLATE_DIR, tmp_path / "compiled")
+    midi_info = {
+        "note_count": 2,
+        "lowest_note": "C2",
+        "highest_note": "G4",
+        "tempo_map": [{"tick": 0, "bpm": 120.0}, {"tick": 1920, "bpm": 60.0}],
+        "time_signatures": [{"tick": 0, "time_signature": "3/4"}],
+        "duration_seconds": 64.4,
+    }
+
+    page = env.get_template(EPISODE_TEMPLATE_NAME).render(
+        **CONTEXT, midi_info={"GitP.2024.12.04.microfreak.mid": midi_info}
+    )
+
+    assert (
+        "GitP.2024.12.04.microfreak.mid)\n"
+        "\t\t\t- 2 notes from C2 to G4, 120.0 BPM at first in 3/4, 1:04 long\n"
+    ) in page + "\n"
+    assert "notes" not in render(env)
+
+
+def test_episode_page_summarizes_patch_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(templates, "JINJA_BYTECODE_CACHE_DIR", tmp_path / "jinja")
+    env = get_jinja_environment(TEMPLATE_DIR, tmp_path / "compiled")
+    patch_file = CONTEXT["patch_files"][0]
+    patch_info = {
+        "patch_name": "TMF.24.12.04.A",
+        "oscillator_type_index": 1,
+        "filter_type": "LPF",
+        "modified": "2024-12-05T12:33:02",
+    }
+
+    page = env.get_template(EPISODE_TEMPLATE_NAME).render(
+        **CONTEXT, patch_info={patch_file: patch_info}
+    )
+
+    assert (
+        f"{patch_file})\n"
+        "\t\t\t- TMF.24.12.04.A, oscillator type 2, LPF filter, saved 2024-12-05\n"
+    ) in page + "\n"
+    assert "saved" not in render(env)
+
+
+def test_episode_page_shows_the_audio_duration(tmp_path, monkeypatch):
+    monkeypatch.setattr(templates, "JINJA_BYTECODE_CACHE_DIR", tmp_path / "jinja")
+    env = get_jinja_environment(TEMPLATE_DIR, tmp_path / "compiled")
+
+    page = env.get_template(EPISODE_TEMPLATE_NAME).render(
+        **CONTEXT, audio_info={"duration_seconds": 3725.4}
+    )
+
+    assert "GitP.2024.12.04.mp3)\n\t\t- 62:05 long\n- ## Description\n" in page
+    assert "long" not in render(env)
+    assert "long" not in env.get_template(EPISODE_TEMPLATE_NAME).render(
+        **CONTEXT, audio_info=None
+    )
+
+
+def test_episode_page_links_the_waveform_peaks(tmp_path, monkeypatch):
+    monkeypatch.setattr(templates, "JINJA_BYTECODE_CACHE_DIR", tmp_path / "jinja")
+    env = get_jinja_environment(TEMPLATE_DIR, tmp_path / "compiled")
+    waveform = {
+        "peaks_file": "GitP.2024.12.04.peaks.json",
+        "peak_dbfs": -1.5,
+        "rms_dbfs": -20.25,
+        "integrated_loudness_db": None,
+    }
+
+    page = env.get_template(EPISODE_TEMPLATE_NAME).render(**CONTEXT, waveform=waveform)
+
+    assert (
+        "GitP.2024.12.04.mp3)\n"
+        "\t\t- Levels: peak -1.5 dBFS, RMS -20.25 dBFS\n"
+        "\t\t- [Download GitP.2024.12.04.peaks.json]"
+        "(https://example.com/assets/Ceremony/2024/12/04/GitP.2024.12.04.peaks.json)\n"
+    ) in page
+    silent = env.get_template(EPISODE_TEMPLATE_NAME).render(
+        **CONTEXT, waveform={**waveform, "peak_dbfs": None, "rms_dbfs": None}
+    )
+    assert "Levels" not in silent
+    assert "peaks.json" in silent
+    assert "peaks.json" not in render(env)
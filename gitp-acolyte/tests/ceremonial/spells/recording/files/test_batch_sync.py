@@ -0,0 +1,107 @@
+from argparse import Namespace
+from datetime import datetime
+
+from gitp_acolyte.ceremonial.spells.episode_data.create import (
+    construct_episode_recording_dir_name,
+    parse_episode_recording_dir_name,
+)
+from gitp_acolyte.ceremonial.spells.recording.files import batch_sync, copy_engine
+from gitp_acolyte.ceremonial.spells.recording.files.batch_sync import (
+    select_episode_recording_dirs,
+    sync_episodes,
+)
+from gitp_acolyte.ceremonial.spells.recording.files.copy_engine import (
+    TransferVerificationError,
+)
+
+
+def make_recording_dir(recordings_root, episode_date):
+    recording_dir = recordings_root / construct_episode_recording_dir_name(episode_date)
+    (recording_dir / "Gdrive").mkdir(parents=True)
+    date = episode_date.strftime("%Y.%m.%d")
+    (recording_dir / f"GitP.{date}.microfreak.mid").write_bytes(b"MThd" + date.encode())
+    (recording_dir / "Gdrive" / f"GitP.{date}.A.mfpz").write_bytes(
+        b"PK" + date.encode()
+    )
+    return recording_dir
+
+
+def test_parse_episode_recording_dir_name_round_trips():
+    episode_date = datetime(2024, 12, 4)
+    name = construct_episode_recording_dir_name(episode_date)
+    assert name == "GitP.24.12.04 Project"
+    assert parse_episode_recording_dir_name(name) == episode_date
+    assert parse_episode_recording_dir_name("GitP.24.12.04 Project Backup") is None
+    assert parse_episode_recording_dir_name("Samples") is None
+
+
+def test_select_episode_recording_dirs(tmp_path):
+    dates = [datetime(2024, 11, 19), datetime(2024, 12, 4), datetime(2025, 1, 3)]
+    for episode_date in dates:
+        make_recording_dir(tmp_path, episode_date)
+    (tmp_path / "Templates").mkdir()
+
+    selected = select_episode_recording_dirs(recordings_root=tmp_path)
+    assert [episode_date for episode_date, _ in selected] == dates
+
+    selected = select_episode_recording_dirs(
+        since=datetime(2024, 12, 1),
+        until=datetime(2024, 12, 31),
+        recordings_root=tmp_path,
+    )
+    assert [episode_date for episode_date, _ in selected] == [datetime(2024, 12, 4)]
+
+
+def test_sync_episodes(tmp_path, monkeypatch):
+    recordings_root = tmp_path / "recordings"
+    assets = tmp_path / "assets"
+    dates = [datetime(2024, 11, 19), datetime(2024, 12, 4)]
+    for episode_date in dates:
+        make_recording_dir(recordings_root, episode_date)
+    monkeypatch.setattr(
+        batch_sync,
+        "construct_path_to_episode_publishing_dir",
+        lambda episode_date, args: assets / episode_date.strftime("%Y/%m/%d"),
+    )
+
+    results = sync_episodes(
+        select_episode_recording_dirs(recordings_root=recordings_root),
+        Namespace(reference=False),
+        dry_run=False,
+        processes=2,
+    )
+    assert [result.error for result in results] == [None, None]
+    assert [len(result.summary.copied) for result in results] == [2, 2]
+    assert (
+        assets / "2024/12/04/GitP.2024.12.04.A.mfpz"
+    ).read_bytes() == b"PK2024.12.04"
+
+
+def test_sync_episodes_reports_failed_copies(tmp_path, monkeypatch):
+    recordings_root = tmp_path / "recordings"
+    assets = tmp_path / "assets"
+    make_recording_dir(recordings_root, datetime(2024, 12, 4))
+    monkeypatch.setattr(
+        batch_sync,
+        "construct_path_to_episode_publishing_dir",
+        lambda episode_date, args: assets / episode_date.strftime("%Y/%m/%d"),
+    )
+    copy_file_atomic = copy_engine.copy_file_atomic
+
+    def fail_midi(src, dest, expected_digest=None):
+        if src.suffix == ".mid":
+            raise TransferVerificationError(f"Copy of '{src}' does not match")
+        return copy_file_atomic(src, dest, expected_digest)
+
+    monkeypatch.setattr(copy_engine, "copy_file_atomic", fail_midi)
+
+    (result,) = sync_episodes(
+        select_episode_recording_dirs(recordings_root=recordings_root),
+        Namespace(reference=False),
+        dry_run=False,
+        processes=1,
+    )
+    assert result.error == "1 file(s) failed to copy: GitP.2024.12.04.microfreak.mid"
+    assert [copied.dest.name for copied in result.summary.copied] == [
+        "GitP.2024.12.04.A.mfpz"
+    ]
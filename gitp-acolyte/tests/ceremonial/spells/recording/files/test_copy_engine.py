@@ -0,0 +1,234 @@
+import os
+from argparse import Namespace
+from datetime import datetime
+
+import pytest
+from gitp_acolyte.ceremonial.spells.recording.files import copy_engine, pub_rec_files
+from gitp_acolyte.ceremonial.spells.recording.files.copy_engine import (
+    TransferVerificationError,
+    copy_file_atomic,
+    copy_files,
+    partial_path_for,
+)
+from gitp_acolyte.ceremonial.spells.recording.files.pub_rec_files import sync_files
+from gitp_acolyte.ceremonial.spells.recording.files.rec_file_constants import (
+    EPISODE_PUBLISHING_MP3_FILE_EXTENSION,
+)
+from gitp_acolyte.utils.hashing import hash_file
+
+
+@pytest.fixture
+def src_file(tmp_path):
+    src = tmp_path / "src" / f"GitP.2024.12.04{EPISODE_PUBLISHING_MP3_FILE_EXTENSION}"
+    src.parent.mkdir()
+    src.write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+    return src
+
+
+@pytest.fixture
+def dest_dir(tmp_path):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    return dest
+
+
+def test_copy_file_atomic_keeps_source(src_file, dest_dir):
+    dest = dest_dir / src_file.name
+    result = copy_file_atomic(src_file, dest)
+    assert src_file.exists()
+    assert dest.read_bytes() == src_file.read_bytes()
+    assert result.bytes_copied == src_file.stat().st_size
+    assert dest.stat().st_mtime_ns == src_file.stat().st_mtime_ns
+    assert list(dest_dir.iterdir()) == [dest]
+
+
+@pytest.mark.parametrize(
+    "unavailable", [["copy_file_range"], ["copy_file_range", "sendfile"]]
+)
+def test_copy_file_atomic_falls_back(src_file, dest_dir, monkeypatch, unavailable):
+    def fail(*args):
+        raise OSError("not supported")
+
+    methods = [
+        (name, fail if name in unavailable else method)
+        for name, method in copy_engine._COPY_METHODS
+    ]
+    monkeypatch.setattr(copy_engine, "_COPY_METHODS", methods)
+    dest = dest_dir / src_file.name
+    result = copy_file_atomic(src_file, dest)
+    assert result.method not in unavailable
+    assert dest.read_bytes() == src_file.read_bytes()
+
+
+def test_copy_files_parallel(tmp_path, dest_dir):
+    pairs = []
+    for i in range(8):
+        src = tmp_path / f"file{i}.mfpz"
+        src.write_bytes(os.urandom(1024 + i))
+        pairs.append((src, dest_dir / src.name))
+    results, failures = copy_files(pairs, max_workers=4)
+    assert [result.dest for result in results] == [dest for _, dest in pairs]
+    assert failures == []
+    for src, dest in pairs:
+        assert dest.read_bytes() == src.read_bytes()
+
+
+def test_copy_files_returns_failures_with_the_other_results(tmp_path, dest_dir):
+    pairs = []
+    for i in range(3):
+        src = tmp_path / f"file{i}.mfpz"
+        src.write_bytes(os.urandom(1024 + i))
+        pairs.append((src, dest_dir / src.name))
+    bad_src, bad_dest = pairs[1]
+
+    results, failures = copy_files(pairs, expected_digests={bad_src: "0" * 64})
+    assert [result.src for result in results] == [pairs[0][0], pairs[2][0]]
+    assert [(failure.src, failure.dest) for failure in failures] == [
+        (bad_src, bad_dest)
+    ]
+    assert isinstance(failures[0].error, TransferVerificationError)
+    assert not bad_dest.exists()
+    assert pairs[2][1].read_bytes() == pairs[2][0].read_bytes()
+
+
+def test_sync_files_copies_and_skips_unchanged(src_file, dest_dir):
+    summary = sync_files(src_file.parent, dest_dir, dry_run=False)
+    assert len(summary.copied) == 1
+    assert src_file.exists()
+    assert (dest_dir / src_file.name).read_bytes() == src_file.read_bytes()
+
+    summary = sync_files(src_file.parent, dest_dir, dry_run=False)
+    assert summary.copied == []
+    assert summary.skipped == 1
+
+
+def test_sync_files_ignores_touched_but_unchanged_files(src_file, dest_dir):
+    sync_files(src_file.parent, dest_dir, dry_run=False)
+    os.utime(src_file, ns=(0, 0))
+    os.utime(dest_dir / src_file.name, ns=(0, 0))
+    summary = sync_files(src_file.parent, dest_dir, dry_run=False)
+    assert summary.copied == []
+
+    src_file.write_bytes(b"re-rendered")
+    os.utime(src_file, ns=(0, 0))
+    summary = sync_files(src_file.parent, dest_dir, dry_run=False)
+    assert len(summary.copied) == 1
+    assert (dest_dir / src_file.name).read_bytes() == b"re-rendered"
+
+
+@pytest.fixture
+def fail_mp3_copies(monkeypatch):
+    copy_file_atomic = copy_engine.copy_file_atomic
+
+    def fail_mp3(src, dest, expected_digest=None):
+        if src.suffix == ".mp3":
+            raise TransferVerificationError(f"Copy of '{src}' does not match")
+        return copy_file_atomic(src, dest, expected_digest)
+
+    monkeypatch.setattr(copy_engine, "copy_file_atomic", fail_mp3)
+
+
+def test_sync_files_records_copies_that_succeeded_alongside_a_failure(
+    src_file, dest_dir, monkeypatch, fail_mp3_copies
+):
+    patch = src_file.parent / "GitP.2024.12.04.A.mfpz"
+    patch.write_bytes(b"patch")
+
+    summary = sync_files(src_file.parent, dest_dir, dry_run=False)
+    assert [result.src for result in summary.copied] == [patch]
+    assert [failure.src for failure in summary.failed] == [src_file]
+
+    monkeypatch.undo()
+    summary = sync_files(src_file.parent, dest_dir, dry_run=False)
+    assert [result.src for result in summary.copied] == [src_file]
+    assert summary.skipped == 1
+
+
+def test_main_exits_when_a_copy_fails(src_file, dest_dir, monkeypatch, fail_mp3_copies):
+    args = Namespace(
+        all=False,
+        since=None,
+        until=None,
+        dry_run=False,
+        workers=2,
+        rehash=False,
+        search_depth=0,
+        watch=False,
+    )
+    monkeypatch.setattr(pub_rec_files, "define_args", lambda: args)
+    monkeypatch.setattr(
+        pub_rec_files, "get_episode_date", lambda args: datetime(2024, 12, 4)
+    )
+    monkeypatch.setattr(
+        pub_rec_files,
+        "recording_dir_exists",
+        lambda episode_date, args: (src_file.parent, True),
+    )
+    monkeypatch.setattr(
+        pub_rec_files,
+        "episode_publishing_dir_exists",
+        lambda episode_date, args: (dest_dir, True),
+    )
+
+    with pytest.raises(SystemExit) as exit_info:
+        pub_rec_files.main()
+    assert exit_info.value.code == 1
+
+
+def test_copy_file_atomic_resumes_partial_transfer(src_file, dest_dir, monkeypatch):
+    monkeypatch.setattr(copy_engine, "TRANSFER_CHUNK_SIZE", 1024 * 1024)
+    dest = dest_dir / src_file.name
+    data = src_file.read_bytes()
+    # two good chunks followed by a chunk that was corrupted mid-write
+    partial_path_for(dest).write_bytes(data[: 2 * 1024 * 1024] + b"garbage")
+
+    result = copy_file_atomic(src_file, dest)
+    assert result.resumed_from == 2 * 1024 * 1024
+    assert result.bytes_copied == len(data) - 2 * 1024 * 1024
+    assert dest.read_bytes() == data
+    assert not partial_path_for(dest).exists()
+
+
+def test_copy_file_atomic_rejects_mismatched_digest(src_file, dest_dir):
+    dest = dest_dir / src_file.name
+    with pytest.raises(TransferVerificationError):
+        copy_file_atomic(src_file, dest, expected_digest="0" * 64)
+    assert not dest.exists()
+    assert not partial_path_for(dest).exists()
+
+    result = copy_file_atomic(src_file, dest, expected_digest=hash_file(src_file))
+    assert result.resumed_from == 0
+    assert dest.read_bytes() == src_file.read_bytes()
+
+
+def test_copy_files_rejects_shared_destinations(tmp_path, dest_dir):
+    src = tmp_path / "file.mfpz"
+    src.write_bytes(b"patch")
+    with pytest.raises(ValueError):
+        copy_files([(src, dest_dir / src.name), (src, dest_dir / src.name)])
+
+
+def test_sync_files_publishes_one_file_per_destination(tmp_path, dest_dir):
+    src_dir = tmp_path / "recording"
+    (src_dir / "Gdrive").mkdir(parents=True)
+    (src_dir / "GitP 2024.12.04.A.mfpz").write_bytes(b"root")
+    (src_dir / "Gdrive" / "GitP_2024.12.04.A.mfpz").write_bytes(b"drive")
+
+    summary = sync_files(src_dir, dest_dir, dry_run=False)
+
+    assert len(summary.copied) == 1
+    assert (dest_dir / "GitP_2024.12.04.A.mfpz").read_bytes() == b"root"
+
+
+def test_sync_files_recopies_deleted_or_truncated_files(src_file, dest_dir):
+    sync_files(src_file.parent, dest_dir, dry_run=False)
+    dest = dest_dir / src_file.name
+
+    dest.unlink()
+    assert len(sync_files(src_file.parent, dest_dir, dry_run=False).copied) == 1
+    assert dest.read_bytes() == src_file.read_bytes()
+
+    with dest.open("r+b") as f:
+        f.truncate(1024)
+    assert len(sync_files(src_file.parent, dest_dir, dry_run=False).copied) == 1
+    assert dest.read_bytes() == src_file.read_bytes()
@@ -2,7 +2,10 @@ from pathlib import Path
 
 import pytest
 from gitp_acolyte.ceremonial.spells.recording.files.pub_rec_files import (
+    build_suffix_table,
+    discover_files_to_publish,
     filter_files_to_publish,
+    has_suffix_to_sync,
 )
 from gitp_acolyte.ceremonial.spells.recording.files.rec_file_constants import (
     FILE_SUFFIXES_TO_SYNC,
@@ -86,3 +89,37 @@ def test_filter_files_to_publish_empty_list(tmp_path):
         (tmp_path / subdir).mkdir(parents=True, exist_ok=True)
     valid_files = filter_files_to_publish(tmp_path)
     assert valid_files == []
+
+
+def test_filter_files_to_publish_search_depth(tmp_path):
+    create_mock_files(tmp_path, ["", "Samples/Recorded", "Gdrive/exports"])
+    shallow = filter_files_to_publish(tmp_path)
+    assert sorted(shallow, key=str) == sorted(
+        (
+            tmp_path / f"file{i}{suffix}"
+            for i, suffix in enumerate(FILE_SUFFIXES_TO_SYNC)
+        ),
+        key=str,
+    )
+
+    deep = filter_files_to_publish(tmp_path, search_depth=2)
+    expected_files = [
+        tmp_path / subdir / f"file{i}{suffix}"
+        for subdir in ["", "Samples/Recorded", "Gdrive/exports"]
+        for i, suffix in enumerate(FILE_SUFFIXES_TO_SYNC)
+    ]
+    assert sorted(deep, key=str) == sorted(expected_files, key=str)
+
+
+def test_discover_files_to_publish_carries_stat(mock_src_dir_subdirs):
+    for recording_file in discover_files_to_publish(mock_src_dir_subdirs):
+        assert recording_file.stat.st_ino == recording_file.path.stat().st_ino
+
+
+def test_suffix_table():
+    table = build_suffix_table(FILE_SUFFIXES_TO_SYNC)
+    assert table[".mp3"] == (".mix.128kbps_CBR.mp3",)
+    assert has_suffix_to_sync("GitP.2024.12.04.mix.128kbps_CBR.mp3")
+    assert has_suffix_to_sync("GitP.2024.12.04.microfreak.mid")
+    assert not has_suffix_to_sync("GitP.2024.12.04.mp3")
+    assert not has_suffix_to_sync("README")
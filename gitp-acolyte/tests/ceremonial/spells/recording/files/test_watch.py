@@ -0,0 +1,135 @@
+import sys
+import threading
+import time
+
+import pytest
+from gitp_acolyte.ceremonial.spells.recording.files import copy_engine
+from gitp_acolyte.ceremonial.spells.recording.files.copy_engine import (
+    TransferVerificationError,
+)
+from gitp_acolyte.ceremonial.spells.recording.files.watch import (
+    InotifyWatcher,
+    PollingWatcher,
+    SizeStabilityTracker,
+    watch_and_sync,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_size_stability_tracker_waits_for_size_to_settle(tmp_path):
+    clock = FakeClock()
+    tracker = SizeStabilityTracker(settle_seconds=2, clock=clock)
+    export = tmp_path / "GitP.2024.12.04.mix.128kbps_CBR.mp3"
+    export.write_bytes(b"a" * 10)
+    tracker.observe(export)
+
+    clock.now = 1
+    assert tracker.settled() == []
+
+    export.write_bytes(b"a" * 20)
+    clock.now = 2
+    assert tracker.settled() == []
+
+    clock.now = 4
+    settled = tracker.settled()
+    assert [recording_file.path for recording_file in settled] == [export]
+    assert settled[0].stat.st_size == 20
+    assert len(tracker) == 0
+
+
+def test_polling_watcher_reports_changes(tmp_path):
+    (tmp_path / "Gdrive").mkdir()
+    watcher = PollingWatcher(tmp_path, interval=0.01)
+    assert watcher.wait(1) == set()
+    (tmp_path / "Gdrive" / "GitP.2024.12.04.A.mfpz").write_bytes(b"patch")
+    assert watcher.wait(1) == {tmp_path / "Gdrive" / "GitP.2024.12.04.A.mfpz"}
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="inotify is Linux-only")
+def test_inotify_watcher_reports_changes(tmp_path):
+    watcher = InotifyWatcher(tmp_path)
+    try:
+        (tmp_path / "Gdrive").mkdir()
+        assert watcher.wait(1) == set()
+        (tmp_path / "Gdrive" / "GitP.2024.12.04.A.mfpz").write_bytes(b"patch")
+        assert tmp_path / "Gdrive" / "GitP.2024.12.04.A.mfpz" in watcher.wait(1)
+    finally:
+        watcher.close()
+
+
+@pytest.mark.parametrize("force_polling", [True, False])
+def test_watch_and_sync_copies_settled_exports(tmp_path, force_polling):
+    src_dir = tmp_path / "GitP.24.12.04 Project"
+    dest_dir = tmp_path / "dest"
+    src_dir.mkdir()
+    dest_dir.mkdir()
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=watch_and_sync,
+        args=(src_dir, dest_dir, False),
+        kwargs=dict(
+            settle_seconds=0.1,
+            poll_interval=0.02,
+            force_polling=force_polling,
+            stop=stop,
+        ),
+    )
+    thread.start()
+    try:
+        time.sleep(0.1)
+        (src_dir / "GitP.2024.12.04.microfreak.mid").write_bytes(b"MThd")
+        (src_dir / "notes.txt").write_text("ignored")
+        deadline = time.monotonic() + 5
+        while not (dest_dir / "GitP.2024.12.04.microfreak.mid").exists():
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+    finally:
+        stop.set()
+        thread.join()
+    assert not (dest_dir / "notes.txt").exists()
+    assert (src_dir / "GitP.2024.12.04.microfreak.mid").exists()
+
+
+def test_watch_and_sync_retries_failed_copies(tmp_path, monkeypatch):
+    src_dir = tmp_path / "GitP.24.12.04 Project"
+    dest_dir = tmp_path / "dest"
+    src_dir.mkdir()
+    dest_dir.mkdir()
+    copy_file_atomic = copy_engine.copy_file_atomic
+    attempts = []
+
+    def fail_once(src, dest, expected_digest=None):
+        attempts.append(src)
+        if len(attempts) == 1:
+            raise TransferVerificationError(f"Copy of '{src}' does not match")
+        return copy_file_atomic(src, dest, expected_digest)
+
+    monkeypatch.setattr(copy_engine, "copy_file_atomic", fail_once)
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=watch_and_sync,
+        args=(src_dir, dest_dir, False),
+        kwargs=dict(
+            settle_seconds=0.1, poll_interval=0.02, force_polling=True, stop=stop
+        ),
+    )
+    thread.start()
+    try:
+        time.sleep(0.1)
+        (src_dir / "GitP.2024.12.04.microfreak.mid").write_bytes(b"MThd")
+        deadline = time.monotonic() + 5
+        while not (dest_dir / "GitP.2024.12.04.microfreak.mid").exists():
+            assert thread.is_alive()
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+    finally:
+        stop.set()
+        thread.join()
+    assert len(attempts) == 2
@@ -0,0 +1,48 @@
+import os
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gitp_acolyte.ceremonial.spells.episode_data.episode_yaml import (
+    read_episode_yaml,
+)
+from gitp_acolyte.ceremonial.spells.recording.files.waveform_peaks import (
+    find_wav_render,
+    update_waveform_peaks,
+)
+
+
+def write_square_wav(path, seconds):
+    """
+    A 16-bit stereo square wave at half of full scale.
+    """
+    frames = np.tile(np.array([16384, 16384, -16384, -16384], "<i2"), 12000 * seconds)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(24000)
+        f.writeframes(frames.tobytes())
+
+
+def test_update_waveform_peaks_skips_unchanged_render(tmp_path):
+    src_dir = tmp_path / "GitP.24.12.04 Project"
+    (src_dir / "Gdrive").mkdir(parents=True)
+    write_square_wav(src_dir / "short.wav", 1)
+    write_square_wav(src_dir / "Gdrive" / "GitP 2024.12.04 mix.wav", 2)
+    dest_dir = tmp_path / "04"
+    dest_dir.mkdir()
+
+    render = find_wav_render(src_dir)
+    assert render.name == "GitP 2024.12.04 mix.wav"
+    assert update_waveform_peaks(render, dest_dir)
+    assert not update_waveform_peaks(find_wav_render(src_dir), dest_dir)
+
+    waveform = read_episode_yaml(dest_dir / "episode.yml")["waveform"]
+    assert waveform["peaks_file"] == "GitP_2024.12.04_mix.peaks.json"
+    assert (dest_dir / waveform["peaks_file"]).exists()
+    assert waveform["peak_dbfs"] == -6.02
+
+    os.utime(render.path, ns=(0, 0))
+    assert update_waveform_peaks(find_wav_render(src_dir), dest_dir)
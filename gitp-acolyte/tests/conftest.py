@@ -0,0 +1,95 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from gitp_acolyte.utils.ai import client
+
+
+class StubChatCompletions(BaseHTTPRequestHandler):
+    """
+    Answers chat completion requests with a description, or with one
+    description per episode date in a batch request, failing some requests
+    according to the server's failures table.
+    """
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        user_prompt = body["messages"][-1]["content"]
+        self.server.requests.append(user_prompt)
+        for marker, statuses in self.server.failures.items():
+            if marker in user_prompt and statuses:
+                self.send_json(statuses.pop(0), {"error": {"message": "stub"}})
+                return
+        content = json.dumps(self.describe(body, user_prompt))
+        self.send_json(
+            200,
+            {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": content},
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 100,
+                    "completion_tokens": 10,
+                    "total_tokens": 110,
+                },
+            },
+        )
+
+    def describe(self, body, user_prompt):
+        schema_name = body["response_format"]["json_schema"]["name"]
+        if schema_name != "EpisodeDescriptionBatch":
+            return {"description": "A ceremony."}
+        episode_dates = re.findall(r'episode_date="([0-9-]+)"', user_prompt)
+        return {
+            "episodes": [
+                {
+                    "episode_date": episode_date,
+                    "description": f"Ceremony {episode_date}.",
+                }
+                for episode_date in episode_dates
+                if episode_date not in self.server.omitted_dates
+            ]
+        }
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubChatCompletions)
+    server.requests = []
+    server.failures = {}
+    server.omitted_dates = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def telemetry_log(tmp_path, monkeypatch):
+    log_path = tmp_path / "ai_telemetry.jsonl"
+    monkeypatch.setattr(client, "AI_TELEMETRY_LOG", log_path)
+    return log_path
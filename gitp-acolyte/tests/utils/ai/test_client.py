@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from gitp_acolyte.utils.ai import client
+from openai import InternalServerError
+from pydantic import BaseModel
+
+
+class Answer(BaseModel):
+    description: str
+
+
+@pytest.fixture
+def stub_client(stub_server, monkeypatch):
+    monkeypatch.setattr(client, "BACKOFF_BASE_SECONDS", 0)
+    monkeypatch.setattr(client, "_clients", {})
+    monkeypatch.setenv(
+        "OPENAI_BASE_URL", f"http://127.0.0.1:{stub_server.server_port}/v1"
+    )
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return client.get_client()
+
+
+def test_get_client_is_shared(stub_client):
+    assert client.get_client() is stub_client
+
+
+def test_parse_completion_retries_and_records_telemetry(
+    stub_client, stub_server, telemetry_log
+):
+    messages = [{"role": "user", "content": "first"}]
+    stub_server.failures = {"first": [503]}
+    completion = client.parse_completion(messages, "gpt-4o-mini", Answer, name="first")
+    assert completion.choices[0].message.parsed == Answer(description="A ceremony.")
+
+    stub_server.failures = {"second": [500, 500]}
+    with pytest.raises(InternalServerError):
+        client.parse_completion(
+            [{"role": "user", "content": "second"}],
+            "gpt-4o-mini",
+            Answer,
+            name="second",
+            max_retries=1,
+        )
+
+    first, second = [
+        json.loads(line) for line in telemetry_log.read_text().splitlines()
+    ]
+    assert first["name"] == "first"
+    assert first["retries"] == 1
+    assert first["prompt_tokens"] == 100
+    assert first["completion_tokens"] == 10
+    assert first["error"] is None
+    assert second["retries"] == 1
+    assert second["error"].startswith("InternalServerError")
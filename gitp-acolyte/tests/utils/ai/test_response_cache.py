@@ -0,0 +1,68 @@
+import os
+import time
+
+from pydantic import BaseModel
+
+from gitp_acolyte.utils.ai.response_cache import (
+    ResponseCache,
+    make_cache_key,
+    remove_if_unchanged,
+)
+
+
+class Answer(BaseModel):
+    text: str
+
+
+def test_make_cache_key_is_order_sensitive_and_stable():
+    assert make_cache_key({"b": 1, "a": 2}, "x") == make_cache_key(
+        {"a": 2, "b": 1}, "x"
+    )
+    assert make_cache_key("x", "y") != make_cache_key("y", "x")
+
+
+def test_get_put(tmp_path):
+    cache = ResponseCache(tmp_path)
+    assert cache.get("key", Answer) is None
+    cache.put("key", Answer(text="hello"))
+    assert cache.get("key", Answer) == Answer(text="hello")
+
+
+def test_evicts_least_recently_used_over_size(tmp_path):
+    cache = ResponseCache(
+        tmp_path, max_bytes=2 * len(Answer(text="x" * 100).model_dump_json())
+    )
+    for i, key in enumerate(["a", "b"]):
+        cache.put(key, Answer(text=str(i) * 100))
+        os.utime(tmp_path / f"{key}.json", (i, i + time.time() - 100))
+    cache.get("a", Answer)  # a is now the most recently used
+    cache.put("c", Answer(text="2" * 100))
+    assert cache.get("b", Answer) is None
+    assert cache.get("a", Answer) is not None
+    assert cache.get("c", Answer) is not None
+
+
+def test_expires_unused_entries(tmp_path):
+    cache = ResponseCache(tmp_path, max_age_seconds=60)
+    cache.put("old", Answer(text="old"))
+    old = time.time() - 120
+    os.utime(tmp_path / "old.json", (old, old))
+    assert cache.get("old", Answer) is None
+    assert not (tmp_path / "old.json").exists()
+
+
+def test_evict_skips_entries_removed_or_rewritten_meanwhile(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=0)
+    cache.put("kept", Answer(text="kept"))
+    # put never evicts the entry it just wrote
+    assert cache.get("kept", Answer) == Answer(text="kept")
+
+    path = tmp_path / "kept.json"
+    scanned_mtime_ns = path.stat().st_mtime_ns
+    os.utime(path, ns=(scanned_mtime_ns, scanned_mtime_ns + 1))
+    remove_if_unchanged(path, scanned_mtime_ns)
+    assert path.exists()
+
+    remove_if_unchanged(tmp_path / "gone.json", scanned_mtime_ns)
+    remove_if_unchanged(path, path.stat().st_mtime_ns)
+    assert not path.exists()
@@ -0,0 +1,99 @@
+import random
+import zipfile
+
+import pytest
+
+from gitp_acolyte.utils.media.mfpz_info import (
+    HEADER_READ_SIZE,
+    MfpzFormatError,
+    MfpzInfoCache,
+    read_mfpz_info,
+)
+
+
+def choice_param(name, highest_choice, index):
+    value = round(index * 0x7FFF / highest_choice)
+    return (
+        bytes([0x40 + len(name)])
+        + name.encode()
+        + b"c"
+        + bytes([highest_choice])
+        + value.to_bytes(2, "little")
+    )
+
+
+def pack_7bit(data):
+    values = []
+    for start in range(0, len(data), 7):
+        group = data[start : start + 7]
+        values.append(sum(1 << i for i, byte in enumerate(group) if byte & 0x80))
+        values.extend(byte & 0x7F for byte in group)
+    return values
+
+
+def write_mfpz(path, patch_name="TMF.24.12.04.A", preset_tail=b""):
+    preset = (
+        b"#VCO"
+        + choice_param("Type", 22, 1)
+        + b"@"
+        + b"#VCF"
+        + choice_param("Type", 2, 2)
+        + b"@"
+        + preset_tail
+    )
+    values = pack_7bit(preset)
+    archive = (
+        f"22 serialization::archive 10 0 4 3 247 {len(patch_name)} {patch_name} "
+        f"7 0 0 18 000000000000000000 0 0 51 {len(values)} "
+        + " ".join(map(str, values))
+        + " "
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        info = zipfile.ZipInfo(f"0_{patch_name}", date_time=(2024, 12, 5, 12, 33, 2))
+        zf.writestr(info, archive, compress_type=zipfile.ZIP_DEFLATED)
+
+
+def test_read_mfpz_info_reads_only_the_head(tmp_path):
+    patch_path = tmp_path / "GitP.2024.12.04.A.mfpz"
+    # enough incompressible parameters that the head is a small part of the file
+    tail = random.Random(0).randbytes(4000)
+    write_mfpz(patch_path, preset_tail=tail)
+    assert patch_path.stat().st_size > 4 * HEADER_READ_SIZE
+
+    info = read_mfpz_info(patch_path)
+
+    assert info.patch_name == "TMF.24.12.04.A"
+    assert info.member_name == "0_TMF.24.12.04.A"
+    assert info.modified == "2024-12-05T12:33:02"
+    assert info.oscillator_type_index == 1
+    assert info.filter_type == "HPF"
+    with zipfile.ZipFile(patch_path) as zf:
+        [member] = zf.infolist()
+    assert info.size == member.file_size
+    assert info.crc32 == f"{member.CRC:08x}"
+
+
+def test_read_mfpz_info_rejects_other_files(tmp_path):
+    not_a_zip = tmp_path / "not_a_zip.mfpz"
+    not_a_zip.write_bytes(b"MThd" * 100)
+    with pytest.raises(MfpzFormatError):
+        read_mfpz_info(not_a_zip)
+
+    other_zip = tmp_path / "other.mfpz"
+    with zipfile.ZipFile(other_zip, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("readme.txt", "not a preset " * 10)
+    with pytest.raises(MfpzFormatError):
+        read_mfpz_info(other_zip)
+
+
+def test_cache_is_keyed_by_digest(tmp_path):
+    patch_path = tmp_path / "GitP.2024.12.04.A.mfpz"
+    write_mfpz(patch_path)
+    cache = MfpzInfoCache(tmp_path / "cache")
+
+    info = cache.read(patch_path, "digest-a")
+    # a hit never opens the patch
+    patch_path.unlink()
+    assert cache.read(patch_path, "digest-a") == info
+    with pytest.raises(FileNotFoundError):
+        cache.read(patch_path, "digest-b")
@@ -0,0 +1,101 @@
+import pytest
+
+from gitp_acolyte.constants import REFERENCE_EPISODE_DIR
+from gitp_acolyte.utils.media.midi_info import (
+    MidiFormatError,
+    TempoChange,
+    TimeSignatureChange,
+    read_midi_info,
+    read_midi_infos,
+)
+
+
+def vlq(value):
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(out))
+
+
+def chunk(chunk_id, data):
+    return chunk_id + len(data).to_bytes(4, "big") + data
+
+
+def smf(*tracks, smf_format=1, division=480):
+    header = chunk(
+        b"MThd",
+        smf_format.to_bytes(2, "big")
+        + len(tracks).to_bytes(2, "big")
+        + division.to_bytes(2, "big"),
+    )
+    return header + b"".join(chunk(b"MTrk", track) for track in tracks)
+
+
+END_OF_TRACK = b"\x00\xff\x2f\x00"
+CONDUCTOR_TRACK = (
+    b"\x00\xff\x58\x04\x03\x02\x18\x08"  # 3/4
+    + b"\x00\xff\x51\x03\x07\xa1\x20"  # 120 BPM
+    + vlq(1920)
+    + b"\xff\x51\x03\x0f\x42\x40"  # 60 BPM after 4 beats
+    + END_OF_TRACK
+)
+NOTES_TRACK = (
+    b"\x00\x90\x24\x64"  # C2 on
+    + vlq(480)
+    + b"\x43\x64"  # G4 on, running status
+    + b"\x00\x24\x00"  # C2 off as a zero-velocity note-on
+    + vlq(2400)
+    + b"\x80\x43\x40"  # G4 off after 5 more beats
+    + END_OF_TRACK
+)
+
+
+def test_read_midi_infos(tmp_path):
+    midi_path = tmp_path / "GitP.2024.12.04.microfreak.mid"
+    midi_path.write_bytes(smf(CONDUCTOR_TRACK, NOTES_TRACK))
+    garbage_path = tmp_path / "garbage.mid"
+    garbage_path.write_bytes(b"MThd" + b"\x00" * 3)
+    truncated_path = tmp_path / "truncated.mid"
+    truncated_path.write_bytes(smf(NOTES_TRACK[:-6]))
+
+    infos = read_midi_infos([midi_path, garbage_path, truncated_path])
+
+    info = infos[midi_path]
+    assert info.tempo_map == [TempoChange(0, 120.0), TempoChange(1920, 60.0)]
+    assert info.time_signatures == [TimeSignatureChange(0, "3/4")]
+    assert info.note_count == 2
+    assert (info.lowest_note, info.highest_note) == ("C2", "G4")
+    # 4 beats at 120 BPM, then 2 at 60 BPM
+    assert info.duration_seconds == 4.0
+    assert isinstance(infos[garbage_path], MidiFormatError)
+    assert isinstance(infos[truncated_path], MidiFormatError)
+
+
+def test_tempo_defaults_to_120_bpm(tmp_path):
+    midi_path = tmp_path / "notes.mid"
+    midi_path.write_bytes(smf(NOTES_TRACK, smf_format=0, division=96))
+
+    [info] = read_midi_infos([midi_path]).values()
+
+    assert info.tempo_map == [TempoChange(0, 120.0)]
+    assert info.time_signatures == []
+    assert info.duration_seconds == pytest.approx(2880 / 96 / 2)
+
+
+def test_time_signatures_repeated_across_tracks_are_listed_once(tmp_path):
+    midi_path = tmp_path / "GitP.2024.12.04.microfreak.mid"
+    midi_path.write_bytes(
+        smf(CONDUCTOR_TRACK, b"\x00\xff\x58\x04\x03\x02\x18\x08" + NOTES_TRACK)
+    )
+
+    [info] = read_midi_infos([midi_path]).values()
+
+    assert info.time_signatures == [TimeSignatureChange(0, "3/4")]
+
+
+def test_reference_midi_file_time_signatures():
+    info = read_midi_info(REFERENCE_EPISODE_DIR / "GP.2024.12.04.microfreak.mid")
+
+    assert info.time_signatures == [TimeSignatureChange(0, "4/4")]
@@ -0,0 +1,58 @@
+import pytest
+
+from gitp_acolyte.utils.media.mp3_info import Mp3FormatError, read_mp3_info
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, joint stereo: 417-byte frames
+CBR_FRAME_HEADER = b"\xff\xfb\x90\x44"
+FRAME_LENGTH = 417
+SIDE_INFO_LENGTH = 32
+
+
+def id3v2_tag(size: int) -> bytes:
+    syncsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b"ID3\x04\x00\x00" + syncsafe + b"\x00" * size
+
+
+def frames(count: int, first_frame_payload: bytes = b"") -> bytes:
+    first = CBR_FRAME_HEADER + first_frame_payload
+    first += b"\x00" * (FRAME_LENGTH - len(first))
+    rest = CBR_FRAME_HEADER + b"\x00" * (FRAME_LENGTH - 4)
+    return first + rest * (count - 1)
+
+
+def test_cbr_duration_from_audio_bytes(tmp_path):
+    path = tmp_path / "cbr.mp3"
+    id3v1_tag = b"TAG" + b"\x00" * 125
+    path.write_bytes(id3v2_tag(1000) + frames(100) + id3v1_tag)
+
+    info = read_mp3_info(path)
+
+    assert info.bitrate_kbps == 128
+    assert info.sample_rate == 44100
+    assert info.channels == 2
+    assert not info.vbr
+    assert info.byte_length == path.stat().st_size
+    assert info.duration_seconds == round(100 * FRAME_LENGTH * 8 / 128000, 3)
+
+
+def test_vbr_duration_from_xing_frame_count(tmp_path):
+    path = tmp_path / "vbr.mp3"
+    xing = b"\x00" * SIDE_INFO_LENGTH + b"Xing" + (1).to_bytes(4, "big")
+    xing += (1000).to_bytes(4, "big")
+    path.write_bytes(id3v2_tag(10) + frames(50, xing))
+
+    info = read_mp3_info(path)
+
+    assert info.vbr
+    assert info.duration_seconds == round(1000 * 1152 / 44100, 3)
+    assert info.bitrate_kbps == round(
+        50 * FRAME_LENGTH * 8 / (1000 * 1152 / 44100) / 1000
+    )
+
+
+def test_not_an_mp3(tmp_path):
+    path = tmp_path / "noise.mp3"
+    path.write_bytes(b"ID3" * 100)
+
+    with pytest.raises(Mp3FormatError):
+        read_mp3_info(path)
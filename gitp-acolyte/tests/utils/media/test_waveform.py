@@ -0,0 +1,70 @@
+import json
+import math
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gitp_acolyte.utils.media.waveform import (
+    WavFormatError,
+    analyze_wav,
+    write_peaks_file,
+)
+
+SAMPLE_RATE = 48000
+
+
+def write_sine_wav(path, seconds, amplitude, sample_width=3, channels=2):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    full_scale = 2 ** (8 * sample_width - 1) - 1
+    sine = np.rint(amplitude * full_scale * np.sin(2 * np.pi * 440 * t))
+    samples = np.repeat(sine.astype("<i4")[:, np.newaxis], channels, axis=1)
+    frames = samples.view(np.uint8).reshape(len(t), channels, 4)[:, :, :sample_width]
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(sample_width)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(frames.tobytes())
+
+
+@pytest.mark.parametrize("sample_width", [2, 3])
+def test_sine_levels(tmp_path, sample_width):
+    path = tmp_path / "render.wav"
+    # 2.05 s, so the last sub-block is short
+    write_sine_wav(path, 2.05, 0.5, sample_width)
+
+    analysis = analyze_wav(path, peak_count=10)
+
+    assert analysis.duration_seconds == 2.05
+    assert analysis.seconds_per_peak == 0.3
+    assert analysis.peaks.shape == (7, 2)
+    assert (analysis.peaks == [-64, 64]).all()
+    assert analysis.peak_dbfs == pytest.approx(20 * math.log10(0.5), abs=0.01)
+    assert analysis.rms_dbfs == pytest.approx(20 * math.log10(0.5 / 2**0.5), abs=0.01)
+    # two channels, each at half the power of the amplitude squared
+    assert analysis.integrated_loudness_db == pytest.approx(
+        -0.691 + 10 * math.log10(0.25), abs=0.01
+    )
+
+
+def test_silence_has_no_loudness(tmp_path):
+    path = tmp_path / "silence.wav"
+    write_sine_wav(path, 1, 0.0)
+    peaks_path = tmp_path / "silence.peaks.json"
+
+    analysis = analyze_wav(path)
+    write_peaks_file(peaks_path, analysis)
+
+    peaks = json.loads(peaks_path.read_text())
+    assert peaks["integrated_loudness_db"] is None
+    assert peaks["peak_dbfs"] is None
+    assert set(peaks["peaks"]) == {0}
+
+
+def test_not_a_wav(tmp_path):
+    path = tmp_path / "render.wav"
+    path.write_bytes(b"ID3" * 100)
+
+    with pytest.raises(WavFormatError):
+        analyze_wav(path)
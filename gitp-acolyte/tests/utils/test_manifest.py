@@ -0,0 +1,52 @@
+import os
+
+from gitp_acolyte.utils import manifest as manifest_module
+from gitp_acolyte.utils.manifest import Manifest
+
+
+def test_manifest_round_trip(tmp_path):
+    (tmp_path / "a.mfpz").write_bytes(b"patch")
+    manifest = Manifest.load(tmp_path)
+    assert manifest.refresh() == ["a.mfpz"]
+    manifest.stamp("spell", manifest.fingerprint())
+    assert manifest.save()
+    assert not manifest.save()
+
+    loaded = Manifest.load(tmp_path)
+    assert loaded.entries == manifest.entries
+    assert loaded.stamps == {"spell": manifest.fingerprint()}
+    assert loaded.refresh() == []
+
+
+def test_manifest_only_rehashes_changed_files(tmp_path, monkeypatch):
+    (tmp_path / "a.mfpz").write_bytes(b"patch")
+    (tmp_path / "b.mid").write_bytes(b"midi")
+    manifest = Manifest.load(tmp_path)
+    manifest.refresh()
+
+    hashed = []
+    original_hash_file = manifest_module.hash_file
+    monkeypatch.setattr(
+        manifest_module,
+        "hash_file",
+        lambda path: hashed.append(path.name) or original_hash_file(path),
+    )
+    os.utime(tmp_path / "a.mfpz", ns=(0, 0))
+    assert manifest.refresh() == []
+    assert hashed == ["a.mfpz"]
+
+    (tmp_path / "b.mid").write_bytes(b"changed midi")
+    (tmp_path / "a.mfpz").unlink()
+    assert manifest.refresh() == ["a.mfpz", "b.mid"]
+
+
+def test_fingerprint_excludes(tmp_path):
+    (tmp_path / "a.mfpz").write_bytes(b"patch")
+    (tmp_path / "episode.yml").write_text("episode_date: '2024-12-04'\n")
+    manifest = Manifest.load(tmp_path)
+    manifest.refresh()
+    before = manifest.fingerprint(exclude=("episode.yml",))
+    (tmp_path / "episode.yml").write_text("episode_date: '2024-12-05'\n")
+    manifest.refresh()
+    assert manifest.fingerprint(exclude=("episode.yml",)) == before
+    assert manifest.fingerprint() != before